@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.views import View
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .decorators import json_response
+from .jwt_auth import CachedJWTAuthentication, aauthenticate
+
+DEFAULT_ASYNC_VIEWS_SETTINGS = {
+    'ROUTES': [],
+}
+
+
+def get_async_views_settings():
+    return {**DEFAULT_ASYNC_VIEWS_SETTINGS, **getattr(settings, 'ASYNC_VIEWS', {})}
+
+
+class AsyncReadView(View):
+    """
+    Base for async-native versions of read endpoints.
+
+    GET runs on the event loop with the same JWT authentication as the DRF views
+    (user cache hits need no thread) and Django's async ORM, so a request waiting
+    on the database doesn't hold a worker thread for the whole request. Responses
+    use the `return_class` envelope. Other methods are handed to `sync_view`, the
+    route's existing DRF view, so writes behave exactly as before.
+
+    Subclasses implement `get`. DRF exceptions raised from it (e.g. NotFound), and
+    authentication failures, are answered with the body, status and headers DRF's
+    exception handler would give them, so clients see the same errors as from the
+    DRF views.
+    """
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Like DRF views: token authenticated, no session cookies, so no CSRF
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            if self.sync_view is None:
+                return self.error_response(MethodNotAllowed(request.method))
+            response = await sync_to_async(self.sync_view)(request, *args, **kwargs)
+            return response
+
+        handler = getattr(self, 'get', None)
+        if handler is None:
+            return self.error_response(MethodNotAllowed(request.method))
+        try:
+            user = await aauthenticate(request)
+            if user is None:
+                raise NotAuthenticated()
+            request.user = user
+            # Keep DRF-style helpers (e.g. wants_summary) working on a plain HttpRequest
+            request.query_params = request.GET
+            return await handler(request, *args, **kwargs)
+        except TokenError as e:
+            return self.error_response(InvalidToken(e.args[0]))
+        except APIException as e:
+            return self.error_response(e)
+
+    def error_response(self, exc):
+        """
+        The response DRF's default exception handler gives `exc`.
+        """
+        data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+        response = json_response(data, status=exc.status_code)
+        if exc.status_code == 401:
+            response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(self.request)
+        return response
+
+
+def read_view(name, sync_view, async_view):
+    """
+    Picks the view for a route: `async_view` (an AsyncReadView subclass) if `name` is listed in
+    ASYNC_VIEWS['ROUTES'], otherwise the existing `sync_view`.
+    """
+    if name in get_async_views_settings()['ROUTES']:
+        return async_view.as_view(sync_view=sync_view)
+    return sync_view
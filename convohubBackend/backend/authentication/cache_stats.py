@@ -0,0 +1,23 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from .user_cache import user_cache
+from .constants import SUCCESS_RESPONSE_CODE, FORBIDDEN_CODE
+from .decorators import return_class
+
+
+class UserCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return return_class({
+                "data": {},
+                "message": "You do not have permission to access this resource.",
+                "status": FORBIDDEN_CODE
+            })
+
+        return return_class({
+            "data": user_cache.stats(),
+            "message": "User cache statistics retrieved successfully.",
+            "status": SUCCESS_RESPONSE_CODE
+        })
@@ -1,9 +1,11 @@
 SUCCESS_RESPONSE_CODE = 200
 SUCCESS_LOCATION_CODE = 205
+NOT_MODIFIED_CODE = 304
 BAD_REQUEST_CODE = 400
 METHOD_NOT_ALLOWED = 405
 UNAUTHORIZED = 401
 FORBIDDEN_CODE = 403
 INTERNAL_SERVER_ERROR_CODE = 500
+SERVICE_UNAVAILABLE_CODE = 503
 AUTHENTICATION_ERROR_CODE = 2
 SUPER_ADMIN = 0
\ No newline at end of file
@@ -1,4 +1,6 @@
+from django.http import JsonResponse
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 def return_class(dictionary):
     """
@@ -17,3 +19,23 @@ def return_class(dictionary):
 
     response_data = {'data': data, 'meta': meta}
     return Response(response_data, status=status_code)
+
+
+def json_response(payload, status=200):
+    """
+    A JsonResponse encoded like DRF's JSONRenderer (compact, unicode, same date/decimal handling),
+    for async views that run outside DRF.
+    """
+    return JsonResponse(
+        payload, status=status, encoder=JSONEncoder, safe=False,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def json_return_class(dictionary):
+    """
+    `return_class` for async views: the same {"data", "meta"} envelope as a JsonResponse.
+    """
+    status_code = dictionary.get('status', 200)
+    meta = {'message': dictionary.get('message', ''), 'status': status_code}
+    return json_response({'data': dictionary.get('data', {}), 'meta': meta}, status=status_code)
@@ -0,0 +1,78 @@
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from .revocation import revocation_filter
+from .user_cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through `user_cache`, after checking
+    the token against `revocation_filter` (tokens issued before the user's last logout).
+    """
+
+    def get_user(self, validated_token):
+        if revocation_filter.is_stale():
+            revocation_filter.refresh()
+        revocation_filter.check(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if user_id is not None and jti is not None:
+            user = user_cache.get(user_id, jti)
+            if user is not None:
+                return user
+        return self.load_user(validated_token)
+
+    def load_user(self, validated_token):
+        """
+        Reads the token's user from the database and caches it; the cache is not consulted.
+        """
+        user = super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if user_id is not None and jti is not None:
+            user_cache.set(user_id, jti, user)
+        return user
+
+
+async def aget_user_for_token(validated_token):
+    """
+    Resolves the user of a validated access token for async callers (WebSocket consumers).
+
+    Cache hits are served on the event loop; only misses take a thread hop to the DB.
+
+    Raises:
+        AuthenticationFailed: If the token has been revoked by a logout.
+    """
+    if revocation_filter.is_stale():
+        await revocation_filter.arefresh()
+    revocation_filter.check(validated_token)
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    jti = validated_token.get(api_settings.JTI_CLAIM)
+    user = None
+    if user_id is not None and jti is not None:
+        user = user_cache.get(user_id, jti)
+    if user is None:
+        # Straight to the database: going through get_user would look the cache up (and count the miss) again
+        user = await sync_to_async(CachedJWTAuthentication().load_user)(validated_token)
+    return user
+
+
+async def aauthenticate(request):
+    """
+    `CachedJWTAuthentication.authenticate` for async views, on the event loop for cache hits.
+
+    Returns:
+        User or None: None when the request carries no bearer token.
+
+    Raises:
+        InvalidToken / AuthenticationFailed: As the DRF authentication class does.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    return await aget_user_for_token(authentication.get_validated_token(raw_token))
@@ -1,10 +1,10 @@
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
-from django.contrib.auth import authenticate
 from .models import User
-from .constants import BAD_REQUEST_CODE, SUCCESS_RESPONSE_CODE
-from .decorators import return_class  
+from .constants import BAD_REQUEST_CODE, SUCCESS_RESPONSE_CODE, SERVICE_UNAVAILABLE_CODE
+from .decorators import return_class
+from .password_hashing import PasswordHasherBusy, verify_password
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
@@ -24,9 +24,10 @@ class LoginView(APIView):
                 }
                 return return_class(response_)
 
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
+            # One query; the password is then checked on the hashing pool instead of
+            # authenticate(), which would look the user up again and hash on this thread
+            user = User.objects.filter(username=username).first()
+            if user is None:
                 response_ = {
                     "message": "Not Registered",
                     "status": BAD_REQUEST_CODE,
@@ -35,9 +36,18 @@ class LoginView(APIView):
                 }
                 return return_class(response_)
 
-            # Authenticate user
-            user = authenticate(username=username, password=password)
-            if user:
+            try:
+                authenticated = verify_password(user, password) and user.is_active
+            except PasswordHasherBusy:
+                response_ = {
+                    "message": "Server is busy, please try again shortly",
+                    "status": SERVICE_UNAVAILABLE_CODE,
+                    "success": False,
+                    "data": {}
+                }
+                return return_class(response_)
+
+            if authenticated:
                 # Generate tokens using SimpleJWT
                 refresh = RefreshToken.for_user(user)
                 data = {
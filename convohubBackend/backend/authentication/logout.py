@@ -1,9 +1,10 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
 from .constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE
 from .decorators import return_class
+from .revocation import revoke_user_tokens
+from .user_cache import user_cache
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
@@ -22,12 +23,8 @@ class LogoutView(APIView):
                     "data": {}
                 })
 
-            for token in outstanding_tokens:
-                try:
-                    refresh_token = RefreshToken(token.token)
-                    refresh_token.blacklist()
-                except Exception:
-                    continue 
+            revoke_user_tokens(user.id)
+            user_cache.invalidate_user(user.id)
 
             return return_class({
                 "message": "Successfully logged out.",
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from authentication.revocation import compact_tokens, get_token_revocation_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding refresh tokens with their blacklist entries, and logout "
+        "revocations older than the access token lifetime. Run it periodically (e.g. daily from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=get_token_revocation_settings()['COMPACT_BATCH_SIZE'])
+
+    def handle(self, *args, **options):
+        deleted = compact_tokens(options['batch_size'])
+        self.stdout.write(
+            f"Deleted {deleted['outstanding']} expired token(s), {deleted['blacklisted']} blacklist "
+            f"entr{'y' if deleted['blacklisted'] == 1 else 'ies'} and {deleted['revocations']} revocation(s)."
+        )
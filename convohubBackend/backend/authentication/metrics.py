@@ -0,0 +1,18 @@
+from monitoring.registry import registry
+
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+hash_workers = registry.gauge(
+    'convohub_password_hash_workers', 'Processes in the password hashing pool.')
+hash_pending = registry.gauge(
+    'convohub_password_hash_pending', 'Password hash/verify calls queued or running in the pool.')
+hash_abandoned = registry.gauge(
+    'convohub_password_hash_abandoned', 'Timed-out password hash/verify calls still occupying a pool slot.')
+hash_rejected = registry.counter(
+    'convohub_password_hash_rejected_total', 'Password hash/verify calls refused, by reason.', ('reason',))
+hash_wait = registry.histogram(
+    'convohub_password_hash_wait_seconds', 'Time a password hash/verify call waits for a pool process.',
+    ('operation',), buckets=HASH_BUCKETS)
+hash_duration = registry.histogram(
+    'convohub_password_hash_seconds', 'Time a password hash/verify call runs in a pool process.',
+    ('operation',), buckets=HASH_BUCKETS)
@@ -5,4 +5,15 @@ from django.contrib.auth.models import User
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.CharField(max_length=500,default='')
-    profile_image = models.ImageField(upload_to='profile_images', null=True, blank=True)
\ No newline at end of file
+    profile_image = models.ImageField(upload_to='profile_images', null=True, blank=True)
+
+class TokenRevocation(models.Model):
+    """
+    Latest logout per user: access tokens the user was issued before `revoked_at` are rejected.
+
+    Refresh tokens are blacklisted in simplejwt's tables; access tokens are never stored, so
+    they are revoked by issue time instead. Rows older than ACCESS_TOKEN_LIFETIME can no
+    longer match a live token and are removed by `compact_tokens`.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='token_revocation')
+    revoked_at = models.DateTimeField(db_index=True)
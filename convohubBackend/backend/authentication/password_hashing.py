@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from . import metrics
+
+DEFAULT_PASSWORD_HASHING_SETTINGS = {
+    'ENABLED': True,
+    'WORKERS': None,
+    'MAX_PENDING': None,
+    'TIMEOUT': 10,
+    'STARTUP_TIMEOUT': 60,
+    'PREWARM': True,
+}
+
+
+def get_password_hashing_settings():
+    return {**DEFAULT_PASSWORD_HASHING_SETTINGS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing pool is full or a call did not finish within TIMEOUT seconds.
+    """
+
+
+def _init_worker():
+    # Spawned processes start empty; hashers are read from the project's settings
+    import django
+    django.setup()
+
+
+def _ready():
+    return True
+
+
+def _timed(operation, args):
+    started = time.time()
+    result = operation(*args)
+    return result, started, time.time() - started
+
+
+def _hash(password):
+    return make_password(password)
+
+
+def _verify(password, encoded):
+    upgraded = []
+    # The setter is only called for a correct password stored with outdated hasher settings
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(True))
+    return valid, bool(upgraded)
+
+
+class PasswordHashingPool:
+    """
+    Bounded process pool for password hashing and verification.
+
+    PBKDF2 is CPU-bound and holds the GIL, so hashing on a request thread stalls every other
+    request the process is serving. Here up to WORKERS hashes (default: CPU count) run in
+    separate processes. At most MAX_PENDING calls (default: 8 per worker) may be queued or
+    running; beyond that, or when a call waits longer than TIMEOUT seconds, PasswordHasherBusy
+    is raised so callers can answer 503 instead of piling up. A call that timed out keeps its
+    slot until the worker is done with it, so abandoned work still counts against MAX_PENDING.
+    With ENABLED set to False hashing runs inline again.
+
+    Starting the workers (spawn plus `django.setup()`) takes about a second; `start()` does it
+    ahead of the first login (the ASGI/WSGI entry points call it when PREWARM is set), and
+    calls made while the workers are still starting wait up to STARTUP_TIMEOUT outside TIMEOUT.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._ready = ()
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.abandoned = 0
+        self.workers = None
+        self.max_pending = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                config = get_password_hashing_settings()
+                self.workers = config['WORKERS'] or os.cpu_count() or 1
+                self.max_pending = config['MAX_PENDING'] or self.workers * 8
+                # Spawn rather than fork: the server process has threads (and DB connections) of its own
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker
+                )
+                # Submitting starts the worker processes; these finish once they are initialised
+                self._ready = [self._pool.submit(_ready) for _ in range(self.workers)]
+                metrics.hash_workers.set(self.workers)
+            return self._pool, self._ready
+
+    def start(self):
+        """
+        Starts the worker processes without waiting for them, if ENABLED and PREWARM are set.
+        """
+        config = get_password_hashing_settings()
+        if config['ENABLED'] and config['PREWARM']:
+            self._get_pool()
+
+    def _admit(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                return False
+            self.pending += 1
+        metrics.hash_pending.inc()
+        return True
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+        metrics.hash_pending.dec()
+
+    def _abandon(self, future):
+        with self._lock:
+            self.abandoned += 1
+        metrics.hash_abandoned.inc()
+        future.add_done_callback(self._forget)
+        # Only succeeds if the job has not started; a running job keeps its slot until it ends
+        future.cancel()
+
+    def _forget(self, future):
+        with self._lock:
+            self.abandoned -= 1
+        metrics.hash_abandoned.dec()
+
+    def run(self, name, operation, *args):
+        config = get_password_hashing_settings()
+        if not config['ENABLED']:
+            return operation(*args)
+        pool, ready = self._get_pool()
+        if not self._admit():
+            metrics.hash_rejected.inc(reason='queue_full')
+            raise PasswordHasherBusy("Password hashing queue is full.")
+        try:
+            # Worker start-up is not the caller's fault, so it is kept out of TIMEOUT
+            if not all(f.done() for f in ready):
+                wait(ready, timeout=config['STARTUP_TIMEOUT'])
+            submitted = time.time()
+            future = pool.submit(_timed, operation, args)
+        except BrokenProcessPool:
+            self._release()
+            raise self._restart(pool)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the worker is done with the job, not until this caller gives up
+        future.add_done_callback(self._release)
+
+        try:
+            result, started, duration = future.result(timeout=config['TIMEOUT'])
+        except TimeoutError:
+            metrics.hash_rejected.inc(reason='timeout')
+            self._abandon(future)
+            raise PasswordHasherBusy("Password hashing timed out.")
+        except BrokenProcessPool:
+            raise self._restart(pool)
+        metrics.hash_wait.observe(max(started - submitted, 0), operation=name)
+        metrics.hash_duration.observe(duration, operation=name)
+        return result
+
+    def _restart(self, pool):
+        # A worker died (e.g. killed for memory); start a fresh pool on the next call
+        self._discard(pool)
+        metrics.hash_rejected.inc(reason='broken_pool')
+        return PasswordHasherBusy("Password hashing pool restarted.")
+
+    def _discard(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+hashing_pool = PasswordHashingPool()
+
+
+def hash_password(password):
+    """
+    Hashes a raw password on the hashing pool.
+
+    Returns:
+        str: The encoded password, ready for `User.password`.
+
+    Raises:
+        PasswordHasherBusy: If the pool is saturated.
+    """
+    return hashing_pool.run('hash', _hash, password)
+
+
+def verify_password(user, password):
+    """
+    Checks a raw password against `user.password` on the hashing pool, like `User.check_password`:
+    a correct password stored with outdated hasher settings is re-hashed and saved.
+
+    Returns:
+        bool: Whether the password is correct.
+
+    Raises:
+        PasswordHasherBusy: If the pool is saturated.
+    """
+    valid, upgrade = hashing_pool.run('verify', _verify, password, user.password)
+    if upgrade:
+        try:
+            user.password = hash_password(password)
+        except PasswordHasherBusy:
+            # Upgrading is optional; try again on the next login
+            return valid
+        user.save(update_fields=['password'])
+    return valid
@@ -0,0 +1,184 @@
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .models import TokenRevocation
+
+DEFAULT_TOKEN_REVOCATION_SETTINGS = {
+    'REFRESH_INTERVAL': 5,
+    'COMPACT_BATCH_SIZE': 1000,
+}
+
+
+def get_token_revocation_settings():
+    return {**DEFAULT_TOKEN_REVOCATION_SETTINGS, **getattr(settings, 'TOKEN_REVOCATION', {})}
+
+
+class RevocationFilter:
+    """
+    In-memory copy of `TokenRevocation`: user id -> issue time (epoch seconds) before which the
+    user's access tokens are revoked.
+
+    Authentication checks tokens against it without a query. Logouts in this process are
+    applied immediately; logouts in other processes are picked up by re-reading the rows
+    changed since the last read, at most once every REFRESH_INTERVAL seconds. `generation`
+    goes up whenever the set changes. Only revocations younger than ACCESS_TOKEN_LIFETIME
+    are kept, as older ones cannot match an unexpired token.
+    """
+
+    # Re-read a little before the last read, so rows committed late (or stamped by a
+    # slightly slower clock) are not missed
+    OVERLAP = timedelta(seconds=30)
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self._read_since = None
+        self._refreshed_at = None
+        self.generation = 0
+        self.checks = 0
+        self.rejections = 0
+        self.refreshes = 0
+
+    def is_stale(self):
+        interval = get_token_revocation_settings()['REFRESH_INTERVAL']
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= interval
+
+    def _pending_rows(self):
+        now = timezone.now()
+        since = now - api_settings.ACCESS_TOKEN_LIFETIME
+        if self._read_since is not None:
+            since = max(since, self._read_since - self.OVERLAP)
+        return now, TokenRevocation.objects.filter(revoked_at__gte=since).values_list('user_id', 'revoked_at')
+
+    def refresh(self):
+        now, rows = self._pending_rows()
+        self._apply(now, list(rows))
+
+    async def arefresh(self):
+        now, rows = self._pending_rows()
+        self._apply(now, [row async for row in rows])
+
+    def _apply(self, now, rows):
+        expired = int((now - api_settings.ACCESS_TOKEN_LIFETIME).timestamp())
+        with self._lock:
+            changed = False
+            for user_id, revoked_at in rows:
+                changed = self._add(str(user_id), int(revoked_at.timestamp())) or changed
+            for user_id in [user_id for user_id, before in self._revoked.items() if before < expired]:
+                del self._revoked[user_id]
+                changed = True
+            if changed:
+                self.generation += 1
+            self._read_since = now
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+
+    def _add(self, user_id, before):
+        if self._revoked.get(user_id, 0) >= before:
+            return False
+        self._revoked[user_id] = before
+        return True
+
+    def add(self, user_id, revoked_at):
+        with self._lock:
+            if self._add(str(user_id), int(revoked_at.timestamp())):
+                self.generation += 1
+
+    def is_revoked(self, user_id, issued_at):
+        """
+        Issue times are whole seconds, so a token issued in the same second as the logout
+        stays valid; a login right after a logout must not get a token that is already revoked.
+        """
+        before = self._revoked.get(str(user_id))
+        return before is not None and issued_at is not None and issued_at < before
+
+    def check(self, validated_token):
+        """
+        Raises:
+            AuthenticationFailed: If the token was issued before its user's last logout.
+        """
+        self.checks += 1
+        if self.is_revoked(validated_token.get(api_settings.USER_ID_CLAIM), validated_token.get('iat')):
+            self.rejections += 1
+            raise AuthenticationFailed("Token has been revoked.", code='token_revoked')
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._read_since = None
+            self._refreshed_at = None
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._revoked),
+                'generation': self.generation,
+                'checks': self.checks,
+                'rejections': self.rejections,
+                'refreshes': self.refreshes,
+            }
+
+
+revocation_filter = RevocationFilter()
+
+
+def revoke_user_tokens(user_id):
+    """
+    Logs a user out everywhere: blacklists every unexpired refresh token they hold with a
+    single INSERT ... SELECT and revokes the access tokens issued to them so far.
+
+    Args:
+        user_id (int): The user to log out.
+
+    Returns:
+        int: Refresh tokens newly blacklisted.
+    """
+    now = timezone.now()
+    blacklisted = BlacklistedToken._meta.db_table
+    outstanding = OutstandingToken._meta.db_table
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(blacklisted)} (token_id, blacklisted_at) "
+                f"SELECT o.id, %s FROM {quote(outstanding)} o "
+                f"WHERE o.user_id = %s AND o.expires_at > %s "
+                f"AND NOT EXISTS (SELECT 1 FROM {quote(blacklisted)} b WHERE b.token_id = o.id)",
+                [now, user_id, now],
+            )
+            count = cursor.rowcount
+        TokenRevocation.objects.update_or_create(user_id=user_id, defaults={'revoked_at': now})
+    revocation_filter.add(user_id, now)
+    return count
+
+
+def compact_tokens(batch_size=None):
+    """
+    Deletes expired outstanding tokens (with their blacklist entries) in batches, and
+    revocations no access token can still predate.
+
+    Returns:
+        dict: Rows deleted per table.
+    """
+    batch_size = batch_size or get_token_revocation_settings()['COMPACT_BATCH_SIZE']
+    now = timezone.now()
+    deleted = {'outstanding': 0, 'blacklisted': 0, 'revocations': 0}
+    expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)
+    while True:
+        ids = list(expired[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted['blacklisted'] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            deleted['outstanding'] += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+    deleted['revocations'] = TokenRevocation.objects.filter(
+        revoked_at__lt=now - api_settings.ACCESS_TOKEN_LIFETIME
+    ).delete()[0]
+    return deleted
@@ -0,0 +1,10 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .user_cache import user_cache
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Cached users must not outlive changes to is_active, password, permissions, etc.
+    user_cache.invalidate_user(instance.pk)
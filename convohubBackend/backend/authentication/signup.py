@@ -1,10 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from .models import User, UserProfile
-from .constants import BAD_REQUEST_CODE, SUCCESS_RESPONSE_CODE
+from .constants import BAD_REQUEST_CODE, SUCCESS_RESPONSE_CODE, SERVICE_UNAVAILABLE_CODE
 from .validate_email import validate_email
-from .decorators import return_class 
+from .decorators import return_class
+from .password_hashing import PasswordHasherBusy, hash_password
 
 class SignupView(APIView):
     permission_classes = [AllowAny]
@@ -16,8 +19,14 @@ class SignupView(APIView):
             password = data.get('password', '').strip()
             response_ = {}
 
+            # Username and email are checked in one query
+            taken = []
+            if username:
+                lookup = Q(username=username) | Q(email=email) if email else Q(username=username)
+                taken = list(User.objects.filter(lookup).values_list('username', 'email'))
+
             # Validate username
-            if not username or User.objects.filter(username=username).exists():
+            if not username or any(row[0] == username for row in taken):
                 response_ = {
                     "message": "Username already exists!",
                     "status": BAD_REQUEST_CODE,
@@ -27,7 +36,7 @@ class SignupView(APIView):
                 return return_class(response_)
 
             # Validate email
-            if not email or User.objects.filter(email=email).exists():
+            if not email or any(row[1] == email for row in taken):
                 response_ = {
                     "message": "Email already exists!",
                     "status": BAD_REQUEST_CODE,
@@ -45,12 +54,31 @@ class SignupView(APIView):
                 }
                 return return_class(response_)
 
-            # Create user and profile
+            # Create user and profile; the password is hashed on the hashing pool, not this thread
+            try:
+                encoded = hash_password(password)
+            except PasswordHasherBusy:
+                response_ = {
+                    "message": "Server is busy, please try again shortly",
+                    "status": SERVICE_UNAVAILABLE_CODE,
+                    "success": False,
+                    "data": {}
+                }
+                return return_class(response_)
+
             try:
-                user, created = User.objects.get_or_create(username=username, email=email)
-                user.set_password(password)
-                user.save()
-                UserProfile.objects.get_or_create(user=user)
+                with transaction.atomic():
+                    user = User.objects.create(username=username, email=email, password=encoded)
+                    UserProfile.objects.create(user=user)
+            except IntegrityError:
+                # Another signup took the username between the check and the insert
+                response_ = {
+                    "message": "Username already exists!",
+                    "status": BAD_REQUEST_CODE,
+                    "success": False,
+                    "data": {}
+                }
+                return return_class(response_)
             except Exception as e:
                 print(e)
                 response_ = {
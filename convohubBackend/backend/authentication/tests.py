@@ -1,3 +1,202 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .models import TokenRevocation
+from .password_hashing import PasswordHasherBusy, PasswordHashingPool
+from .revocation import RevocationFilter, compact_tokens, revocation_filter, revoke_user_tokens
+from .user_cache import UserCache
 
-# Create your tests here.
+
+class UserCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.user = User(id=1, username='alice')
+
+    def test_hit_returns_a_copy(self):
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set(1, 'jti-a', self.user)
+        cached = cache.get(1, 'jti-a')
+        self.assertEqual(cached.username, 'alice')
+        self.assertIsNot(cached, self.user)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set(1, 'a', self.user)
+        cache.set(1, 'b', self.user)
+        cache.get(1, 'a')
+        cache.set(1, 'c', self.user)
+        self.assertIsNone(cache.get(1, 'b'))
+        self.assertIsNotNone(cache.get(1, 'a'))
+        self.assertIsNotNone(cache.get(1, 'c'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache = UserCache(max_size=10, ttl=60)
+        with mock.patch('authentication.user_cache.time.monotonic', return_value=1000):
+            cache.set(1, 'a', self.user)
+        with mock.patch('authentication.user_cache.time.monotonic', return_value=1059):
+            self.assertIsNotNone(cache.get(1, 'a'))
+        with mock.patch('authentication.user_cache.time.monotonic', return_value=1061):
+            self.assertIsNone(cache.get(1, 'a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_invalidate_user_drops_every_token(self):
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set(1, 'a', self.user)
+        cache.set('1', 'b', self.user)
+        cache.set(2, 'a', User(id=2, username='bob'))
+        cache.invalidate_user(1)
+        self.assertIsNone(cache.get(1, 'a'))
+        self.assertIsNone(cache.get(1, 'b'))
+        self.assertIsNotNone(cache.get(2, 'a'))
+        self.assertEqual(cache.invalidations, 2)
+
+    def test_invalidate_token_keeps_other_sessions(self):
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set(1, 'a', self.user)
+        cache.set(1, 'b', self.user)
+        cache.invalidate_token(1, 'a')
+        self.assertIsNone(cache.get(1, 'a'))
+        self.assertIsNotNone(cache.get(1, 'b'))
+
+
+class RevocationFilterTests(SimpleTestCase):
+    def test_tokens_issued_before_the_logout_are_revoked(self):
+        revocations = RevocationFilter()
+        revoked_at = timezone.now().replace(microsecond=0)
+        revocations.add(7, revoked_at)
+        before = int(revoked_at.timestamp())
+        self.assertTrue(revocations.is_revoked(7, before - 1))
+        self.assertTrue(revocations.is_revoked('7', before - 1))
+        # Same second as the logout: a login right after it must still work
+        self.assertFalse(revocations.is_revoked(7, before))
+        self.assertFalse(revocations.is_revoked(8, before - 1))
+        self.assertFalse(revocations.is_revoked(7, None))
+
+    def test_older_revocation_does_not_move_the_cutoff_back(self):
+        revocations = RevocationFilter()
+        now = timezone.now()
+        revocations.add(7, now)
+        generation = revocations.generation
+        revocations.add(7, now - timedelta(minutes=5))
+        self.assertEqual(revocations.generation, generation)
+        self.assertTrue(revocations.is_revoked(7, int(now.timestamp()) - 60))
+
+
+class RevokeUserTokensTests(TestCase):
+    def setUp(self):
+        revocation_filter.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.other = User.objects.create_user('bob', 'bob@example.com', 'pw')
+
+    def tearDown(self):
+        revocation_filter.clear()
+
+    def test_blacklists_every_outstanding_refresh_token(self):
+        RefreshToken.for_user(self.user)
+        RefreshToken.for_user(self.user)
+        RefreshToken.for_user(self.other)
+        self.assertEqual(revoke_user_tokens(self.user.id), 2)
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=self.user).count(), 2)
+        self.assertFalse(BlacklistedToken.objects.filter(token__user=self.other).exists())
+        # Already blacklisted tokens are not inserted twice
+        self.assertEqual(revoke_user_tokens(self.user.id), 0)
+
+    def test_revokes_access_tokens_issued_so_far(self):
+        revoke_user_tokens(self.user.id)
+        revoked_at = TokenRevocation.objects.get(user=self.user).revoked_at
+        self.assertTrue(revocation_filter.is_revoked(self.user.id, int(revoked_at.timestamp()) - 1))
+
+    def test_other_processes_pick_up_revocations_on_refresh(self):
+        revoke_user_tokens(self.user.id)
+        revoked_at = TokenRevocation.objects.get(user=self.user).revoked_at
+        elsewhere = RevocationFilter()
+        elsewhere.refresh()
+        self.assertTrue(elsewhere.is_revoked(self.user.id, int(revoked_at.timestamp()) - 1))
+
+
+class CompactTokensTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+
+    def test_deletes_expired_tokens_and_old_revocations(self):
+        now = timezone.now()
+        expired = OutstandingToken.objects.create(
+            user=self.user, jti='expired', token='x', created_at=now - timedelta(days=2), expires_at=now - timedelta(days=1),
+        )
+        BlacklistedToken.objects.create(token=expired)
+        live = OutstandingToken.objects.create(
+            user=self.user, jti='live', token='y', created_at=now, expires_at=now + timedelta(days=1),
+        )
+        # No unexpired access token can predate this one
+        TokenRevocation.objects.create(
+            user=self.user, revoked_at=now - api_settings.ACCESS_TOKEN_LIFETIME - timedelta(minutes=1),
+        )
+
+        deleted = compact_tokens(batch_size=1)
+
+        self.assertEqual(deleted, {'outstanding': 1, 'blacklisted': 1, 'revocations': 1})
+        self.assertEqual(list(OutstandingToken.objects.values_list('id', flat=True)), [live.id])
+        self.assertFalse(TokenRevocation.objects.exists())
+
+
+def _wait(event):
+    event.wait(5)
+    return 'done'
+
+
+@override_settings(PASSWORD_HASHING={'ENABLED': True, 'TIMEOUT': 0.2, 'PREWARM': False})
+class PasswordHashingPoolTests(SimpleTestCase):
+    """
+    Admission is tested against a thread pool standing in for the worker processes.
+    """
+
+    def setUp(self):
+        self.pool = PasswordHashingPool()
+        self.pool._pool = ThreadPoolExecutor(1)
+        self.pool.workers = 1
+        self.pool.max_pending = 1
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.shutdown()
+
+    def drain(self):
+        # Done-callbacks run on the worker after the result is handed over; wait for them
+        self.pool._pool.submit(int).result(5)
+
+    def test_runs_on_the_pool(self):
+        self.assertEqual(self.pool.run('verify', max, 1, 2), 2)
+        self.drain()
+        self.assertEqual(self.pool.pending, 0)
+
+    def test_rejects_calls_beyond_max_pending(self):
+        self.pool._admit()
+        with self.assertRaisesMessage(PasswordHasherBusy, "queue is full"):
+            self.pool.run('verify', max, 1, 2)
+        self.pool._release()
+        self.assertEqual(self.pool.run('verify', max, 1, 2), 2)
+
+    def test_timed_out_call_keeps_its_slot_until_the_worker_finishes(self):
+        with self.assertRaisesMessage(PasswordHasherBusy, "timed out"):
+            self.pool.run('verify', _wait, self.release)
+        self.assertEqual((self.pool.pending, self.pool.abandoned), (1, 1))
+        with self.assertRaisesMessage(PasswordHasherBusy, "queue is full"):
+            self.pool.run('verify', max, 1, 2)
+
+        self.release.set()
+        self.drain()
+        self.assertEqual((self.pool.pending, self.pool.abandoned), (0, 0))
+
+    @override_settings(PASSWORD_HASHING={'ENABLED': False})
+    def test_disabled_pool_runs_inline(self):
+        self.pool._admit()
+        self.assertEqual(self.pool.run('verify', max, 1, 2), 2)
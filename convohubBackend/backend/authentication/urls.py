@@ -2,8 +2,10 @@ from django.urls import path
 from .login import LoginView
 from .signup import SignupView
 from .logout import LogoutView
+from .cache_stats import UserCacheStatsView
 urlpatterns = [
     path('login/',LoginView.as_view()),
     path('signup/',SignupView.as_view()),
-    path('logout/',LogoutView.as_view())
+    path('logout/',LogoutView.as_view()),
+    path('user-cache/',UserCacheStatsView.as_view())
 ]
\ No newline at end of file
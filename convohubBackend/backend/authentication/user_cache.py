@@ -0,0 +1,103 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+DEFAULT_USER_CACHE_SETTINGS = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+}
+
+
+class UserCache:
+    """
+    Bounded LRU cache of authenticated users with a per-entry TTL.
+
+    Entries are keyed by (user id, token jti), so a reconnecting client that
+    presents the same token skips the user lookup, and a single token can be
+    dropped without touching the user's other sessions. `get` returns a shallow
+    copy so per-request state (e.g. cached relations) never leaks between requests.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        config = {**DEFAULT_USER_CACHE_SETTINGS, **getattr(settings, 'USER_CACHE', {})}
+        self.max_size = max_size or config['MAX_SIZE']
+        self.ttl = ttl or config['TTL']
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id, jti):
+        key = (str(user_id), jti)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.copy(user)
+
+    def set(self, user_id, jti, user):
+        key = (str(user_id), jti)
+        with self._lock:
+            self._entries[key] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def invalidate_user(self, user_id):
+        """
+        Drops every cached entry for a user (logout, profile/permission changes, deletion).
+        """
+        with self._lock:
+            for key in list(self._keys_by_user.get(str(user_id), ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_token(self, user_id, jti):
+        with self._lock:
+            if (str(user_id), jti) in self._entries:
+                self._remove((str(user_id), jti))
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+user_cache = UserCache()
@@ -2,17 +2,22 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
-from channels.auth import AuthMiddlewareStack
 from chat import routing
+from chat.middleware import JWTAuthMiddleware
+from monitoring.middleware import WebSocketMetricsMiddleware
+from authentication.password_hashing import hashing_pool
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 
 django_asgi_application=get_asgi_application()
+
+# Start the password hashing processes now rather than on the first login
+hashing_pool.start()
 application = ProtocolTypeRouter({
     "http": django_asgi_application,
-    "websocket": AllowedHostsOriginValidator(AuthMiddlewareStack(
+    "websocket": WebSocketMetricsMiddleware(AllowedHostsOriginValidator(JWTAuthMiddleware(
         URLRouter(
             routing.websocket_urlpatterns
         ))
-    ),
+    )),
 })
\ No newline at end of file
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     "corsheaders",
     'authentication',
     'rest_framework',
@@ -48,9 +49,11 @@ INSTALLED_APPS = [
     'rooms',
     'review',
     'chat',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',  # First, so it times the whole stack
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,12 +105,101 @@ DATABASES = {
     }
 }
 
+# Connection pooling for PostgreSQL (Django's built-in psycopg_pool support, needs psycopg[pool]).
+# Each server process keeps MIN_SIZE..MAX_SIZE connections open and lends them to requests and to
+# the chat database executor, instead of opening a connection per request or per call. Requests wait
+# up to TIMEOUT seconds for a free connection; connections idle for MAX_IDLE seconds are closed
+# (down to MIN_SIZE) and all are replaced after MAX_LIFETIME. HEALTH_CHECKS tests a connection
+# before lending it. Keep MAX_SIZE at or above CHAT_DB_EXECUTOR['MAX_WORKERS'], and MAX_SIZE times
+# the number of processes within the server's max_connections.
+DATABASE_POOL = {
+    'ENABLED': os.environ.get('DATABASE_POOL_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'MIN_SIZE': 2,
+    'MAX_SIZE': 20,
+    'TIMEOUT': 10,
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+    'HEALTH_CHECKS': True,
+}
+if DATABASE_POOL['ENABLED'] and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = DATABASE_POOL['HEALTH_CHECKS']
+    # Merged into any OPTIONS already configured (sslmode, options, ...) rather than replacing them
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'name': 'default',
+        'min_size': DATABASE_POOL['MIN_SIZE'],
+        'max_size': DATABASE_POOL['MAX_SIZE'],
+        'timeout': DATABASE_POOL['TIMEOUT'],
+        'max_idle': DATABASE_POOL['MAX_IDLE'],
+        'max_lifetime': DATABASE_POOL['MAX_LIFETIME'],
+    }
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels.layers.InMemoryChannelLayer',
     },
 }
 
+# Multiple Daphne workers need a shared channel layer. Point CHANNEL_BROKER_HOSTS at one or
+# more brokers started with `python manage.py runbroker` (comma separated, e.g.
+# "unix:///tmp/convohub-broker.sock"); groups are sharded across them. For Redis, set
+# BACKEND to 'channels_redis.core.RedisChannelLayer' with the same 'hosts' list instead.
+CHANNEL_BROKER_HOSTS = [h for h in os.environ.get('CHANNEL_BROKER_HOSTS', '').split(',') if h]
+if CHANNEL_BROKER_HOSTS:
+    CHANNEL_LAYERS['default'] = {
+        'BACKEND': 'chat.layers.BrokerChannelLayer',
+        'CONFIG': {'hosts': CHANNEL_BROKER_HOSTS},
+    }
+
+# Chat message persistence: messages are broadcast without waiting for their row to be written,
+# which happens in batches. Set ENABLED to False to write every message before it is broadcast
+# (no loss window on a crash, at the cost of DB latency on every send). Either way each message
+# first takes its room sequence number from the database (one upsert on PostgreSQL; a locked
+# transaction on SQLite, which queues behind other chat DB calls on its single executor thread).
+CHAT_MESSAGE_BUFFER = {
+    'ENABLED': True,
+    'MAX_BATCH_SIZE': 100,   # Flush once this many messages are pending
+    'FLUSH_INTERVAL': 0.5,   # Max seconds a message may wait before being written
+}
+
+# Chat backpressure: each socket has a bounded outbound queue. Clients connecting with ?ack=1
+# acknowledge received frames; once MAX_UNACKED are outstanding the server stops writing and frames
+# queue up. When the queue reaches SEND_QUEUE_SIZE, POLICY decides: 'drop' the oldest frame, 'coalesce' the backlog
+# into one {"type": "resync"} frame, or 'disconnect' the socket (close code 4008). Inbound
+# messages are limited to RATE_LIMIT per second per user (bursts up to RATE_LIMIT_BURST; 0 = off).
+CHAT_BACKPRESSURE = {
+    'SEND_QUEUE_SIZE': 100,
+    'POLICY': 'drop',
+    'RATE_LIMIT': 5,
+    'RATE_LIMIT_BURST': 10,
+    'MAX_UNACKED': 50,  # Frames sent but not yet acknowledged before a ?ack=1 client counts as slow
+}
+
+# Chat presence: sockets are tracked in the database (shared by all workers) and expire unless the client sends
+# {"type": "heartbeat"} at least every TTL seconds (clients are told HEARTBEAT_INTERVAL). Each process drops a
+# room's expired sockets at most once per HEARTBEAT_INTERVAL
+CHAT_PRESENCE = {
+    'HEARTBEAT_INTERVAL': 30,
+    'TTL': 90,
+}
+
+# Reconnect replay: a client reconnecting with ?last_seq=N is sent the messages it missed from a
+# per-worker window of each room's latest WINDOW_SIZE messages (MAX_ROOMS rooms), else from the
+# database. More than REPLAY_LIMIT missed messages get a {"type": "resync"} frame instead.
+CHAT_REPLAY = {
+    'WINDOW_SIZE': 100,
+    'MAX_ROOMS': 1000,
+    'REPLAY_LIMIT': 50,
+}
+
+# Thread pool for the chat consumers' database and cache calls (instead of the single thread
+# sync_to_async shares). Each thread holds its own database connection, so keep MAX_WORKERS times the
+# number of ASGI processes within the database's connection limit. None = min(32, CPU count + 4),
+# or 1 on SQLite, which only allows one writer at a time.
+CHAT_DB_EXECUTOR = {
+    'ENABLED': True,
+    'MAX_WORKERS': None,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -129,13 +221,20 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt_auth.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Read endpoints served by async views (Django's async ORM, no worker thread held per request) instead
+# of their DRF views; remove a route name to switch it back. Other methods on these routes (e.g. PUT on
+# room-detail, POST on teacher-list) are always handled by the DRF view.
+ASYNC_VIEWS = {
+    'ROUTES': ['room-list', 'room-detail', 'search-room', 'recent-activity', 'teacher-list'],
+}
+
 # SimpleJWT token settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),  # Access token valid for 7 days
@@ -148,6 +247,56 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',                      # The user field included in the token
     'USER_ID_CLAIM': 'user_id',                 # The key for the user ID in the token payload
 }
+
+# Recent-activity feed: the latest messages of each room are kept in the cache and merged per request.
+# Buffers are keyed by a per-room version in the database (RoomActivity), which every message
+# write and rename moves on, so no worker serves a buffer another worker has made stale.
+ACTIVITY_FEED = {
+    'ROOM_BUFFER_SIZE': 50,  # Messages kept per room; larger `limit` requests read the DB directly
+    'TTL': 300,              # Seconds an unused buffer is kept; only bounds memory
+}
+
+# Teacher/course list responses, keyed by a catalog version row in the database, so a change
+# made through any process is seen by all of them; TTL only bounds memory
+CATALOG_CACHE = {
+    'TTL': 3600,
+}
+
+# Request instrumentation, exposed at /metrics/ (Prometheus text) and /metrics/slow/.
+# Superusers can read both; set METRICS_TOKEN and send it as X-Metrics-Token for scrapers.
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,        # Requests slower than this are logged with their SQL
+    'SLOW_LOG_SIZE': 20,           # Slowest requests kept for /metrics/slow/
+    'MAX_SQL_PER_REQUEST': 100,    # Statements kept per request for the slow log
+    'METRICS_TOKEN': os.environ.get('METRICS_TOKEN'),
+    'LOOP_LAG_INTERVAL': 0.5,      # Seconds between event-loop lag samples in WebSocket workers
+}
+
+# Users resolved from JWTs (REST and WebSocket) are cached per (user id, token jti)
+USER_CACHE = {
+    'MAX_SIZE': 10000,  # Entries kept before the least recently used is evicted
+    'TTL': 300,         # Seconds an entry is trusted before re-reading the user
+}
+
+# Login/signup password hashing runs in a process pool so PBKDF2 doesn't hold the GIL of the server
+# process; calls beyond MAX_PENDING, or waiting longer than TIMEOUT, are answered with 503
+PASSWORD_HASHING = {
+    'ENABLED': True,
+    'WORKERS': None,      # Hashing processes; None uses the CPU count
+    'MAX_PENDING': None,  # Calls queued or running before new ones are refused; None is 8 per worker
+    'TIMEOUT': 10,        # Seconds a request waits for its hash
+    'STARTUP_TIMEOUT': 60,  # Seconds a request may wait for the worker processes to start (outside TIMEOUT)
+    'PREWARM': True,      # Start the worker processes when the ASGI/WSGI application loads
+}
+
+# Logout revocation: access tokens issued before a user's last logout are rejected by an in-memory
+# filter that each process re-syncs from the database; `manage.py compact_tokens` prunes expired rows
+TOKEN_REVOCATION = {
+    'REFRESH_INTERVAL': 5,       # Seconds between re-reads of logouts made by other processes
+    'COMPACT_BATCH_SIZE': 1000,  # Expired tokens deleted per transaction by compact_tokens
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -25,6 +25,8 @@ urlpatterns = [
     path('rooms/', include('rooms.urls')),
     path('review/', include('review.urls')),
     path('profile/', include('user_profile.urls')),
+    path('chat/', include('chat.urls')),
+    path('metrics/', include('monitoring.urls')),
 ]
 
 
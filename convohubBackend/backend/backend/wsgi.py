@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+from authentication.password_hashing import hashing_pool  # noqa: E402
+
+# Start the password hashing processes now rather than on the first login
+hashing_pool.start()
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_search_indexes(sender, using='default', **kwargs):
+    from .search import ensure_full_text_index
+    ensure_full_text_index(using)
 
 
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(create_search_indexes, sender=self)
@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs
+from django.conf import settings
+from . import metrics
+
+DEFAULT_BACKPRESSURE_SETTINGS = {
+    'SEND_QUEUE_SIZE': 100,
+    'POLICY': 'drop',
+    'RATE_LIMIT': 5,
+    'RATE_LIMIT_BURST': 10,
+    'MAX_UNACKED': 50,
+}
+
+POLICIES = ('drop', 'coalesce', 'disconnect')
+
+
+def wants_acks(scope):
+    """
+    True when the client connected with ?ack=1 and will acknowledge the frames it receives.
+    """
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return query.get('ack', [''])[0].lower() in ('1', 'true', 'yes')
+
+# Close code sent to sockets disconnected by the 'disconnect' policy
+SLOW_CONSUMER_CLOSE_CODE = 4008
+
+
+def get_backpressure_settings():
+    config = {**DEFAULT_BACKPRESSURE_SETTINGS, **getattr(settings, 'CHAT_BACKPRESSURE', {})}
+    if config['POLICY'] not in POLICIES:
+        raise ValueError(f"CHAT_BACKPRESSURE['POLICY'] must be one of {POLICIES}")
+    return config
+
+
+class SendQueue:
+    """
+    Bounded outbound queue for one socket, drained by its own writer task.
+
+    Channel-layer handlers only enqueue, so the consumer keeps draining its
+    channel-layer queue however slowly the client reads. `send()` returns as
+    soon as the server has buffered a frame, so it can't tell a slow reader
+    from a fast one; clients that opt in with ?ack=1 report how many frames
+    they have received ({"type": "ack", "count": N}), and the writer stops once
+    `max_unacked` frames are unacknowledged. The backlog then builds up here,
+    and when the queue is full the policy decides what gives:
+
+    - drop: discard the oldest queued frame.
+    - coalesce: collapse the backlog into one {"type": "resync", "missed": N}
+      frame, N counting the chat messages discarded; the client re-reads
+      history instead of receiving every message.
+    - disconnect: close the socket with code 4008.
+    """
+
+    def __init__(self, send, close, size, policy, max_unacked=None):
+        self._send = send
+        self._close = close
+        self.size = size
+        self.policy = policy
+        self.max_unacked = max_unacked
+        self.sent = 0
+        self.acked = 0
+        self._frames = deque()
+        self._ready = asyncio.Event()
+        self._acked = asyncio.Event()
+        self._task = None
+        self.closed = False
+
+    def __len__(self):
+        return len(self._frames)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self.closed = True
+        self._frames.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def put(self, frame, sent_at=None, is_message=False):
+        """
+        Queues a frame (a dict, serialized when written). `is_message` marks chat
+        messages, the frames a coalesced resync counts. Returns False if it was not queued.
+        """
+        if self.closed:
+            return False
+        if len(self._frames) >= self.size:
+            if self.policy == 'disconnect':
+                self.closed = True
+                self._frames.clear()
+                metrics.shed_load.inc(reason='slow_consumer_disconnect')
+                asyncio.ensure_future(self._close(code=SLOW_CONSUMER_CLOSE_CODE))
+                return False
+            if self.policy == 'coalesce':
+                missed = 0
+                for queued, _, message in self._frames:
+                    if message:
+                        missed += 1
+                    elif queued.get('type') == 'resync':
+                        missed += queued['missed']
+                metrics.shed_load.inc(len(self._frames), reason='coalesced')
+                self._frames.clear()
+                self._frames.append(({'type': 'resync', 'missed': missed}, None, False))
+            else:
+                self._frames.popleft()
+                metrics.shed_load.inc(reason='send_queue_drop')
+        self._frames.append((frame, sent_at, is_message))
+        self._ready.set()
+        return True
+
+    def ack(self, count):
+        """
+        Records that the client has received `count` frames on this socket.
+        """
+        if self.acked < count <= self.sent:
+            self.acked = count
+            self._acked.set()
+
+    @property
+    def unacked(self):
+        return self.sent - self.acked
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            while self._frames:
+                if self.max_unacked and self.unacked >= self.max_unacked:
+                    # A slow reader: hold further frames here, where the policy applies
+                    self._acked.clear()
+                    await self._acked.wait()
+                    continue
+                frame, sent_at, _ = self._frames.popleft()
+                try:
+                    await self._send(frame)
+                except Exception as e:
+                    print(f"Error during message broadcast: {e}")
+                    metrics.dropped_messages.inc(reason='send_error')
+                    continue
+                self.sent += 1
+                if sent_at is not None:
+                    metrics.broadcast_delay.observe(max(0.0, time.time() - sent_at))
+            self._ready.clear()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+# Buckets idle this long are full again and can be forgotten
+_BUCKET_IDLE_SECONDS = 300
+
+
+def allow_message(user_id):
+    """
+    Per-user token bucket shared by all of the user's sockets in this process.
+
+    Returns False when the user has exceeded RATE_LIMIT messages per second
+    (with bursts of up to RATE_LIMIT_BURST).
+    """
+    config = get_backpressure_settings()
+    if not config['RATE_LIMIT']:
+        return True
+    with _buckets_lock:
+        bucket = _buckets.get(user_id)
+        if bucket is None:
+            if len(_buckets) > 10000:
+                cutoff = time.monotonic() - _BUCKET_IDLE_SECONDS
+                for key in [key for key, b in _buckets.items() if b.updated < cutoff]:
+                    del _buckets[key]
+            bucket = _buckets[user_id] = TokenBucket(config['RATE_LIMIT'], config['RATE_LIMIT_BURST'])
+        return bucket.take()
@@ -0,0 +1,86 @@
+import json
+import platform
+import statistics
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from authentication.user_cache import user_cache
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def latency_ms(seconds):
+    """
+    Summarizes a list of durations (seconds) as p50/p99/max/mean milliseconds.
+    """
+    if not seconds:
+        return {'p50': None, 'p99': None, 'max': None, 'mean': None}
+    return {
+        'p50': round(percentile(seconds, 50) * 1000, 3),
+        'p99': round(percentile(seconds, 99) * 1000, 3),
+        'max': round(max(seconds) * 1000, 3),
+        'mean': round(statistics.fmean(seconds) * 1000, 3),
+    }
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """
+    Runs the block against a freshly migrated test database (test_<NAME>), never the real one.
+
+    Works with SQLite and PostgreSQL alike; caches are cleared on entry so results don't
+    depend on what an earlier run left behind.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    cache.clear()
+    user_cache.clear()
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def create_users(count, prefix='bench'):
+    """
+    Bulk-creates `count` users sharing one password hash (hashing per user would dominate setup).
+    """
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password)
+        for i in range(count)
+    ])
+    return list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+
+def environment():
+    return {
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def write_report(command, report, output=None):
+    """
+    Prints the JSON report and, with `output`, also writes it to that file.
+    """
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    command.stdout.write(text)
@@ -0,0 +1,200 @@
+"""
+A small pure-Python message broker for `chat.layers.BrokerChannelLayer`.
+
+It stands in for Redis when running several Daphne workers on one machine (or in
+tests): workers connect over TCP or a unix socket, subscribe to their channel
+prefixes and register group memberships. A `group_send` is fanned out by the
+broker as one frame per subscribed worker connection, carrying every channel of
+that worker that belongs to the group, so a broadcast costs one write per worker
+rather than one per socket.
+
+Run it with `python manage.py runbroker`.
+"""
+import asyncio
+import base64
+import json
+import struct
+import time
+from collections import defaultdict
+
+HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# Frames for a worker are dropped once this many bytes are waiting to be written to it
+MAX_CONNECTION_BUFFER = 8 * 1024 * 1024
+
+
+def _encode_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode()}
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _decode_hook(obj):
+    if len(obj) == 1 and '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def encode_frame(payload):
+    """
+    Serializes a payload (lists/dicts of JSON types and bytes) into a length-prefixed frame.
+    """
+    body = json.dumps(payload, default=_encode_default, separators=(',', ':')).encode()
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    """
+    Reads one frame written by `encode_frame`.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection closes mid-frame or before one starts.
+    """
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return json.loads(await reader.readexactly(size), object_hook=_decode_hook)
+
+
+def channel_key(channel):
+    """
+    Returns the routing key of a channel: the process prefix for `prefix!suffix`
+    channels, otherwise the channel name itself.
+    """
+    if '!' in channel:
+        return channel.split('!', 1)[0] + '!'
+    return channel
+
+
+def parse_address(address):
+    """
+    Parses `tcp://host:port`, `unix:///path` or a `(host, port)` pair.
+
+    Returns:
+        tuple: ('tcp', host, port) or ('unix', path, None).
+    """
+    if isinstance(address, (list, tuple)):
+        return 'tcp', address[0], int(address[1])
+    if address.startswith('unix://'):
+        return 'unix', address[len('unix://'):], None
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    host, port = address.rsplit(':', 1)
+    return 'tcp', host, int(port)
+
+
+async def open_connection(address):
+    kind, host, port = parse_address(address)
+    if kind == 'unix':
+        return await asyncio.open_unix_connection(host)
+    return await asyncio.open_connection(host, port)
+
+
+class Broker:
+    """
+    Routes channel messages and group broadcasts between connected workers.
+
+    Wire protocol (each frame is a JSON list whose first item is the op):
+        ["sub", key]                        route channels with this key to the connection
+        ["add", group, channel, expiry]     add a channel to a group for `expiry` seconds
+        ["discard", group, channel]
+        ["send", channel, message]
+        ["gsend", [[group, message], ...]]  batched group sends
+        ["flush"]
+    The broker only ever writes ["msg", [channel, ...], message] frames back.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.groups = defaultdict(dict)
+        self.dropped = 0
+
+    async def handle(self, reader, writer):
+        owned = set()
+        try:
+            while True:
+                frame = await read_frame(reader)
+                op = frame[0]
+                if op == 'gsend':
+                    for group, message in frame[1]:
+                        self.group_send(group, message)
+                elif op == 'send':
+                    self.deliver(channel_key(frame[1]), [frame[1]], frame[2])
+                elif op == 'add':
+                    self.groups[frame[1]][frame[2]] = time.monotonic() + frame[3]
+                elif op == 'discard':
+                    members = self.groups.get(frame[1])
+                    if members is not None:
+                        members.pop(frame[2], None)
+                        if not members:
+                            del self.groups[frame[1]]
+                elif op == 'sub':
+                    self.routes[frame[1]] = writer
+                    owned.add(frame[1])
+                elif op == 'flush':
+                    self.groups.clear()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"Broker connection error: {e}")
+        finally:
+            self.drop_keys(owned, writer)
+            writer.close()
+
+    def drop_keys(self, keys, writer):
+        for key in keys:
+            if self.routes.get(key) is writer:
+                del self.routes[key]
+        for group in list(self.groups):
+            members = self.groups[group]
+            for channel in [c for c in members if channel_key(c) in keys]:
+                del members[channel]
+            if not members:
+                del self.groups[group]
+
+    def group_send(self, group, message):
+        members = self.groups.get(group)
+        if not members:
+            return
+        now = time.monotonic()
+        by_key = defaultdict(list)
+        for channel, expires_at in list(members.items()):
+            if expires_at < now:
+                del members[channel]
+                continue
+            by_key[channel_key(channel)].append(channel)
+        # Keys of one process share a connection; merge them so each worker gets one frame
+        by_writer = defaultdict(list)
+        for key, channels in by_key.items():
+            writer = self.routes.get(key)
+            if writer is not None:
+                by_writer[writer].extend(channels)
+        for writer, channels in by_writer.items():
+            self.write(writer, channels, message)
+
+    def deliver(self, key, channels, message):
+        writer = self.routes.get(key)
+        if writer is not None:
+            self.write(writer, channels, message)
+
+    def write(self, writer, channels, message):
+        if writer.transport.get_write_buffer_size() > MAX_CONNECTION_BUFFER:
+            self.dropped += 1
+            return
+        writer.write(encode_frame(['msg', channels, message]))
+
+    async def serve(self, address):
+        kind, host, port = parse_address(address)
+        if kind == 'unix':
+            server = await asyncio.start_unix_server(self.handle, path=host)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def run_broker(address):
+    """
+    Runs a broker on `address` until interrupted.
+    """
+    asyncio.run(Broker().serve(address))
@@ -1,49 +1,86 @@
-import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth.models import User
-from .models import Message
 from rooms.models import Room
-from urllib.parse import parse_qs
+from .db_executor import run_in_db
+from .message_buffer import message_buffer
+from . import metrics, presence
+from .backpressure import SendQueue, allow_message, get_backpressure_settings, wants_acks
+from .read_receipts import mark_read
+from .replay import get_replay_settings, missed_messages, recent_messages, requested_seq
+from .protocol import Encoded, chat_frame, decode, encode, encode_once, encoded_kwargs, negotiate, sender_info
+
+
+def is_room_member(room_id, user_id):
+    return Room.members.through.objects.filter(room_id=room_id, user_id=user_id).exists()
 
 
 class RoomChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
+        # JWTAuthMiddleware has already authenticated the user; unauthenticated handshakes never get here
         try:
-           
-            query_string = parse_qs(self.scope['query_string'].decode())
-            token = query_string.get('token', [None])[0]
+            room_id = int(self.scope['url_route']['kwargs']['pk'])
+            user = self.scope['user']
 
-            if not token:
-                
+            # Membership is checked once here; messages on an accepted socket aren't re-checked
+            if not await run_in_db(is_room_member)(room_id, user.id):
+                metrics.connect_rejected.inc(reason='not_member')
                 await self.close()
                 return
 
-            
-            try:
-                validated_token = AccessToken(token)
-                self.scope['user'] = await sync_to_async(User.objects.get)(id=validated_token['user_id'])
-            except Exception as e:
-                print(f"Token validation error: {e}")
-                await self.close()
-                return
-
-           
-            self.room_id = self.scope['url_route']['kwargs']['pk']
+            self.room_id = room_id
             self.room_group_name = f'chat_room_{self.room_id}'
+            self.protocol, subprotocol = negotiate(self.scope)
+            # Resolved once so every chat frame can carry the sender without a lookup
+            self.sender = await run_in_db(sender_info)(user)
+            last_seq = requested_seq(self.scope)
+            # While replaying, live broadcasts are held back so the client sees them after the missed ones
+            self.held = [] if last_seq is not None else None
 
             await self.channel_layer.group_add(
                 self.room_group_name,
                 self.channel_name
             )
-            await self.accept()
+            await self.accept(subprotocol)
+            config = get_backpressure_settings()
+            self.send_queue = SendQueue(
+                self.send_frame, self.close, config['SEND_QUEUE_SIZE'], config['POLICY'],
+                max_unacked=config['MAX_UNACKED'] if wants_acks(self.scope) else None,
+            )
+            self.send_queue.start()
+            metrics.consumer_connected(self)
+
+            came_online, expired = await run_in_db(presence.join)(
+                self.room_id, user, self.channel_name
+            )
+            snapshot = {
+                'type': 'presence',
+                'event': 'snapshot',
+                'users': await run_in_db(presence.online_users)(self.room_id),
+                'heartbeat_interval': presence.get_presence_settings()['HEARTBEAT_INTERVAL'],
+            }
+            if self.send_queue.max_unacked:
+                snapshot['ack_window'] = self.send_queue.max_unacked
+            self.send_queue.put(snapshot)
+            if came_online:
+                await self.broadcast_presence('join', user.id, user.username)
+            for user_id in expired:
+                await self.broadcast_presence('leave', user_id)
+            if last_seq is not None:
+                await self.replay(last_seq)
 
         except Exception as e:
             print(f"Error during WebSocket connection: {e}")
             await self.close()
 
     async def disconnect(self, close_code):
+        metrics.consumer_disconnected(self)
+        if hasattr(self, 'room_id') and not any(
+            consumer.room_id == self.room_id for consumer in list(metrics.active_consumers)
+        ):
+            # Nothing left here to keep the room's window complete
+            recent_messages.discard(self.room_id)
+        if hasattr(self, 'send_queue'):
+            await self.send_queue.stop()
         try:
            
             await self.channel_layer.group_discard(
@@ -53,53 +90,180 @@ class RoomChatConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             print(f"Error during WebSocket disconnection: {e}")
 
-    async def receive(self, text_data):
         try:
-            
-            text_data_json = json.loads(text_data)
-            message_content = text_data_json.get('message')
-            user = self.scope.get('user')
+            if hasattr(self, 'room_id'):
+                went_offline, expired = await run_in_db(presence.leave)(
+                    self.room_id, self.scope['user'].id, self.channel_name
+                )
+                if went_offline:
+                    await self.broadcast_presence('leave', self.scope['user'].id)
+                for user_id in expired:
+                    await self.broadcast_presence('leave', user_id)
+        except Exception as e:
+            print(f"Error updating presence on disconnect: {e}")
+
+        try:
+            # Don't leave this socket's messages waiting on the flush timer
+            await message_buffer.flush()
+        except Exception as e:
+            print(f"Error flushing messages on disconnect: {e}")
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            frame = decode(text_data, bytes_data)
+        except ValueError as e:
+            print(f"Frame decode error: {e}")
+            metrics.invalid_frames.inc(reason='malformed')
+            return
+
+        try:
+            if frame.get('type') == 'heartbeat':
+                await self.heartbeat()
+                return
+            if frame.get('type') == 'ack':
+                count = frame.get('count')
+                if isinstance(count, int) and not isinstance(count, bool):
+                    self.send_queue.ack(count)
+                return
+            if frame.get('type') == 'read':
+                await self.mark_read(frame.get('seq'))
+                return
+            message_content = frame.get('message')
+            user = self.scope['user']
 
-            if not message_content or not user.is_authenticated:
-                print("Invalid message or unauthenticated user")
+            if not isinstance(message_content, str) or not message_content:
+                print("Invalid message")
+                metrics.invalid_frames.inc(reason='empty')
+                return
+            if not allow_message(user.id):
+                metrics.shed_load.inc(reason='rate_limited')
+                self.enqueue({'type': 'error', 'error': 'rate_limited'})
                 return
+            metrics.room_messages.inc(room=self.room_id)
 
-            # Save the message to the database
-            await self.save_message(user, message_content, self.room_id)
+            # Queue the message for a batched write; it is broadcast without waiting on the DB
+            message = await message_buffer.add(user, self.room_id, message_content)
+            if message is None:
+                return
 
-            # Broadcast the message to the room group
+            # Broadcast the message to the room group, encoded once for every member
+            started = time.perf_counter()
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     'type': 'chat_message',
-                    'message': message_content,
-                    'user_id': user.id,
+                    'frame': encode_once(chat_frame(message, self.sender)),
+                    'seq': message.seq,
+                    'sent_at': time.time(),
                 }
             )
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
+            metrics.group_send_latency.observe(time.perf_counter() - started)
         except Exception as e:
             print(f"Error during message reception: {e}")
 
     async def chat_message(self, event):
-        try:
-            message_content = event.get('message')
-            user_id = event.get('user_id')
-
-            # Send the message to WebSocket
-            await self.send(text_data=json.dumps({
-                'message': message_content,
-                'user_id': user_id,
-            }))
-        except Exception as e:
-            print(f"Error during message broadcast: {e}")
+        recent_messages.add(self.room_id, event['seq'], event['frame'])
+        if self.held is not None:
+            self.held.append(event)
+            return
+        # Queued rather than sent here, so a slow client can't stall this consumer's channel-layer queue
+        self.enqueue(Encoded(event['frame']), sent_at=event.get('sent_at'), is_message=True)
+
+    async def replay(self, last_seq):
+        """
+        Sends the messages a reconnecting client missed after `last_seq`, then the broadcasts held meanwhile.
 
-    @sync_to_async
-    def save_message(self, user, content, room_id):
+        Served from the recent-message window when it reaches back far enough,
+        otherwise from one bounded query. More than REPLAY_LIMIT missed messages
+        get a {"type": "resync"} frame instead, as for a client that fell behind.
+        """
+        # Leave room in the send queue for the snapshot and the held broadcasts
+        limit = min(get_replay_settings()['REPLAY_LIMIT'], self.send_queue.size // 2)
+        replayed = set()
         try:
-            room = Room.objects.get(id=room_id)
-            Message.objects.create(user=user, room=room, content=content)
-        except Room.DoesNotExist:
-            print(f"Room with id {room_id} does not exist")
+            window = recent_messages.since(self.room_id, last_seq)
+            if window is not None:
+                source, missed = 'window', len(window)
+                frames = [(seq, Encoded(frame)) for seq, frame in window] if missed <= limit else None
+            else:
+                # This worker's own pending messages must be visible to the query
+                await message_buffer.flush()
+                source = 'database'
+                frames, missed = await run_in_db(missed_messages)(self.room_id, last_seq, limit)
+
+            metrics.replays.inc(source=source if frames is not None else 'resync')
+            if frames is None:
+                self.enqueue({'type': 'resync', 'missed': missed})
+            else:
+                for seq, frame in frames:
+                    self.enqueue(frame, is_message=True)
+                    replayed.add(seq)
         except Exception as e:
-            print(f"Error saving message: {e}")
+            print(f"Error replaying messages: {e}")
+        finally:
+            held, self.held = self.held, None
+            for event in held:
+                # Broadcasts can arrive out of order (5 after 6), so skip by seq rather than by the newest sent
+                if event['seq'] > last_seq and event['seq'] not in replayed:
+                    self.enqueue(Encoded(event['frame']), sent_at=event.get('sent_at'), is_message=True)
+
+    def enqueue(self, frame, sent_at=None, is_message=False):
+        send_queue = getattr(self, 'send_queue', None)
+        if send_queue is not None:
+            send_queue.put(frame, sent_at=sent_at, is_message=is_message)
+
+    async def send_frame(self, frame):
+        if isinstance(frame, Encoded):
+            await self.send(**encoded_kwargs(frame, self.protocol))
+        else:
+            await self.send(**encode(frame, self.protocol))
+
+    async def heartbeat(self):
+        """
+        Keeps this socket's presence alive; clients send {"type": "heartbeat"} every HEARTBEAT_INTERVAL seconds.
+        """
+        user = self.scope['user']
+        came_online, expired = await run_in_db(presence.heartbeat)(self.room_id, user, self.channel_name)
+        if came_online:
+            await self.broadcast_presence('join', user.id, user.username)
+        for user_id in expired:
+            await self.broadcast_presence('leave', user_id)
+
+    async def mark_read(self, seq):
+        """
+        Handles {"type": "read", "seq": N}: advances the user's read pointer and tells the room.
+        """
+        if not isinstance(seq, int) or isinstance(seq, bool):
+            metrics.invalid_frames.inc(reason='malformed')
+            return
+        user = self.scope['user']
+        last_read_seq = await run_in_db(mark_read)(user.id, self.room_id, seq)
+        if last_read_seq is None:
+            return
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'read_receipt',
+                'frame': encode_once({'type': 'read', 'user_id': user.id, 'seq': last_read_seq}),
+            }
+        )
+
+    async def read_receipt(self, event):
+        self.enqueue(Encoded(event['frame']))
+
+    async def broadcast_presence(self, event, user_id, username=None):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'presence_event',
+                'frame': encode_once({
+                    'type': 'presence',
+                    'event': event,
+                    'user_id': user_id,
+                    'username': username,
+                }),
+            }
+        )
+
+    async def presence_event(self, event):
+        self.enqueue(Encoded(event['frame']))
@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from . import metrics
+
+DEFAULT_DB_EXECUTOR_SETTINGS = {
+    'ENABLED': True,
+    'MAX_WORKERS': None,
+}
+
+
+def get_db_executor_settings():
+    return {**DEFAULT_DB_EXECUTOR_SETTINGS, **getattr(settings, 'CHAT_DB_EXECUTOR', {})}
+
+
+def default_max_workers():
+    # SQLite takes one writer at a time, so more threads only trade waiting for "database is locked"
+    if connection.vendor == 'sqlite':
+        return 1
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class DatabaseExecutor:
+    """
+    Bounded thread pool that runs the chat app's blocking database and cache calls.
+
+    `sync_to_async` is thread-sensitive by default, so every socket's ORM call in a
+    process queues for the same single thread. Here up to MAX_WORKERS calls run at
+    once (default: min(32, CPU count + 4); 1 on SQLite), each worker holding its
+    own database connection; stale connections are closed around every call as
+    `database_sync_to_async` does. With ENABLED set to False calls go through
+    `database_sync_to_async` again.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()
+        self.max_workers = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self.max_workers = get_db_executor_settings()['MAX_WORKERS'] or default_max_workers()
+                self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='chat-db')
+                metrics.db_workers.set(self.max_workers)
+            return self._pool
+
+    def _call(self, submitted, func, args, kwargs):
+        metrics.db_queue_depth.dec()
+        metrics.db_wait.observe(time.perf_counter() - submitted)
+        metrics.db_in_flight.inc()
+        started = time.perf_counter()
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+            metrics.db_in_flight.dec()
+            metrics.db_call_duration.observe(time.perf_counter() - started)
+
+    async def run(self, func, *args, **kwargs):
+        if not get_db_executor_settings()['ENABLED']:
+            return await database_sync_to_async(func)(*args, **kwargs)
+        pool = self._get_pool()
+        metrics.db_queue_depth.inc()
+        # Carry context variables (request instrumentation) into the worker thread, like sync_to_async
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._call, time.perf_counter(), func, args, kwargs)
+        try:
+            future = pool.submit(call)
+        except BaseException:
+            metrics.db_queue_depth.dec()
+            raise
+        # A call cancelled while still queued (its awaiting coroutine was cancelled) never reaches _call
+        future.add_done_callback(_dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+def _dequeue_cancelled(future):
+    if future.cancelled():
+        metrics.db_queue_depth.dec()
+
+
+db_executor = DatabaseExecutor()
+
+
+def run_in_db(func):
+    """
+    Wraps a blocking function to run on the chat database executor:
+
+        await run_in_db(is_room_member)(room_id, user_id)
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.run(func, *args, **kwargs)
+    return wrapper
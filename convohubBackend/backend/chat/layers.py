@@ -0,0 +1,277 @@
+import asyncio
+import binascii
+import itertools
+import uuid
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from .broker import channel_key, encode_frame, open_connection, read_frame
+
+
+class _LoopState:
+    """
+    Per-event-loop connections, subscriptions, group memberships and local receive queues.
+
+    Subscriptions and memberships are kept here as well as in the broker, which forgets
+    them when the connection drops, so they can be sent again on reconnect.
+    """
+
+    def __init__(self):
+        self.connections = []
+        self.reader_tasks = []
+        self.subscribed = set()
+        self.groups = {}
+        self.queues = {}
+        self.pending = {}
+        self.flush_scheduled = False
+        self.reconnect_task = None
+        self.closed = False
+        self.lock = asyncio.Lock()
+
+
+class BrokerChannelLayer(BaseChannelLayer):
+    """
+    Cross-process channel layer backed by one or more `chat.broker` instances.
+
+    Configured like channels_redis, so swapping to Redis is a settings change:
+
+        CHANNEL_LAYERS = {'default': {
+            'BACKEND': 'chat.layers.BrokerChannelLayer',
+            'CONFIG': {'hosts': ['unix:///tmp/convohub-broker.sock']},
+        }}
+
+    Groups are sharded over `hosts` by CRC32 of the group name. Channels created
+    by `new_channel` carry a per-process prefix, and every process subscribes its
+    prefix on all shards, so a broker delivers a broadcast as a single frame per
+    process. `group_send` calls made in the same event-loop tick are batched into
+    one write per shard.
+
+    The broker drops a process's subscriptions and group memberships when its
+    connection closes. When a connection is lost the layer reconnects in the
+    background (with backoff, so sockets that are only receiving recover too)
+    and sends them again. `group_send`s made while disconnected are queued, up
+    to `pending_capacity` per shard (oldest dropped first), and sent once the
+    connection is back.
+    """
+
+    extensions = ['groups', 'flush']
+
+    RECONNECT_DELAYS = (0.1, 0.5, 1, 2, 5)
+
+    def __init__(self, hosts=None, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None,
+                 pending_capacity=10000):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.hosts = hosts or ['tcp://127.0.0.1:6390']
+        self.group_expiry = group_expiry
+        self.pending_capacity = pending_capacity
+        self.client_prefix = uuid.uuid4().hex
+        self._states = {}
+
+    def _shard(self, name):
+        return binascii.crc32(name.encode()) % len(self.hosts)
+
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    async def _state(self):
+        state = self._loop_state()
+        if not state.connections:
+            async with state.lock:
+                if not state.connections:
+                    await self._connect(state)
+        return state
+
+    async def _recorded_state(self):
+        """
+        `_state` for operations that are recorded and replayed on reconnect (subscriptions,
+        group changes, group sends): if the broker is unreachable they go ahead offline.
+        """
+        try:
+            return await self._state()
+        except OSError as e:
+            print(f"Channel layer cannot reach its broker: {e}")
+            state = self._loop_state()
+            self._schedule_reconnect(state)
+            return state
+
+    async def _connect(self, state):
+        connections = []
+        try:
+            for host in self.hosts:
+                connections.append(await open_connection(host))
+        except OSError:
+            for _, writer in connections:
+                writer.close()
+            raise
+        for _, writer in connections:
+            for key in state.subscribed:
+                writer.write(encode_frame(['sub', key]))
+        state.connections = connections
+        for group, channels in state.groups.items():
+            for channel in channels:
+                self._write(state, self._shard(group), ['add', group, channel, self.group_expiry])
+        state.reader_tasks = [
+            asyncio.ensure_future(self._read(state, reader, writer)) for reader, writer in connections
+        ]
+        # Broadcasts queued while disconnected, after the memberships they are meant for
+        self._flush_pending(state)
+
+    def _schedule_reconnect(self, state):
+        if state.closed or (state.reconnect_task is not None and not state.reconnect_task.done()):
+            return
+        state.reconnect_task = asyncio.ensure_future(self._reconnect(state))
+
+    async def _reconnect(self, state):
+        for attempt in itertools.count():
+            await asyncio.sleep(self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)])
+            if state.closed or state.connections:
+                return
+            try:
+                async with state.lock:
+                    if not state.connections:
+                        await self._connect(state)
+                return
+            except OSError as e:
+                if attempt == 0:
+                    print(f"Channel layer reconnect failed, retrying: {e}")
+
+    async def _read(self, state, reader, writer):
+        try:
+            while True:
+                _, channels, message = await read_frame(reader)
+                for channel in channels:
+                    self._deliver(state, channel, message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            print("Channel layer lost its broker connection")
+        except Exception as e:
+            print(f"Channel layer read error: {e}")
+        finally:
+            # The broker has dropped this process's memberships; reconnect and restore them
+            if any(w is writer for _, w in state.connections):
+                for _, w in state.connections:
+                    w.close()
+                state.connections = []
+                self._schedule_reconnect(state)
+
+    def _deliver(self, state, channel, message):
+        queue = state.queues.get(channel)
+        if queue is None:
+            queue = state.queues[channel] = asyncio.Queue()
+        if queue.qsize() >= self.get_capacity(channel):
+            return
+        queue.put_nowait(dict(message))
+
+    def _write(self, state, shard, frame):
+        state.connections[shard][1].write(encode_frame(frame))
+
+    async def new_channel(self, prefix='specific'):
+        return f"{prefix}.{self.client_prefix}!{uuid.uuid4().hex}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        state = await self._state()
+        key = channel_key(channel)
+        if key in state.subscribed:
+            # Local channel: skip the broker round trip
+            queue = state.queues.get(channel)
+            if queue is not None and queue.qsize() >= self.get_capacity(channel):
+                raise ChannelFull(channel)
+            self._deliver(state, channel, message)
+            return
+        self._write(state, self._shard(key), ['send', channel, message])
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        state = await self._recorded_state()
+        key = channel_key(channel)
+        if key not in state.subscribed:
+            state.subscribed.add(key)
+            for _, writer in state.connections:
+                writer.write(encode_frame(['sub', key]))
+        queue = state.queues.get(channel)
+        if queue is None:
+            queue = state.queues[channel] = asyncio.Queue()
+        try:
+            return await queue.get()
+        except asyncio.CancelledError:
+            if queue.empty():
+                state.queues.pop(channel, None)
+            raise
+
+    def queue_depth(self, channel):
+        """
+        Messages delivered to `channel` in this process but not yet received.
+        """
+        return sum(
+            queue.qsize() for state in list(self._states.values())
+            for queue in [state.queues.get(channel)] if queue is not None
+        )
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        state = await self._recorded_state()
+        state.groups.setdefault(group, set()).add(channel)
+        if state.connections:
+            self._write(state, self._shard(group), ['add', group, channel, self.group_expiry])
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        state = await self._recorded_state()
+        channels = state.groups.get(group)
+        if channels is not None:
+            channels.discard(channel)
+            if not channels:
+                del state.groups[group]
+        if state.connections:
+            self._write(state, self._shard(group), ['discard', group, channel])
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Group name not valid"
+        state = await self._recorded_state()
+        state.pending.setdefault(self._shard(group), []).append([group, message])
+        if not state.flush_scheduled:
+            state.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_pending, state)
+
+    def _flush_pending(self, state):
+        state.flush_scheduled = False
+        if not state.connections:
+            # Kept for _connect to send once the broker is reachable again
+            for shard, batch in state.pending.items():
+                if len(batch) > self.pending_capacity:
+                    print(f"Channel layer dropped {len(batch) - self.pending_capacity} queued group sends")
+                    del batch[:len(batch) - self.pending_capacity]
+            return
+        pending, state.pending = state.pending, {}
+        for shard, batch in pending.items():
+            self._write(state, shard, ['gsend', batch])
+
+    async def flush(self):
+        state = await self._state()
+        for _, writer in state.connections:
+            writer.write(encode_frame(['flush']))
+        state.queues.clear()
+        state.groups.clear()
+        state.pending.clear()
+
+    async def close(self):
+        """
+        Closes the broker connections of the current event loop.
+        """
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        state.closed = True
+        if state.reconnect_task is not None:
+            state.reconnect_task.cancel()
+        for task in state.reader_tasks:
+            task.cancel()
+        for _, writer in state.connections:
+            writer.close()
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef, Value
+from django.db.models.functions import Coalesce
+from chat.models import Message, ReadReceipt, RoomSequence
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Numbers messages saved before sequence numbers existed, in (created_at, id) order per room, "
+        "and brings each room's sequence counter up to date. Members with no read receipt get one at "
+        "their room's latest message, so history from before read receipts does not count as unread. "
+        "Safe to run more than once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        room_ids = list(
+            Room.objects.filter(messages__seq__isnull=True).distinct().values_list('id', flat=True)
+        )
+        numbered = 0
+        for room_id in room_ids:
+            with transaction.atomic():
+                sequence, _ = RoomSequence.objects.select_for_update().get_or_create(room_id=room_id)
+                # Older messages get numbers above any already handed out, so existing ones stay valid
+                last_seq = max(
+                    sequence.last_seq,
+                    Message.objects.filter(room_id=room_id).aggregate(last=Max('seq'))['last'] or 0,
+                )
+                pending = Message.objects.filter(room_id=room_id, seq__isnull=True).order_by('created_at', 'id')
+                batch = []
+                for message in pending.only('id').iterator(chunk_size=options['batch_size']):
+                    last_seq += 1
+                    message.seq = last_seq
+                    batch.append(message)
+                Message.objects.bulk_update(batch, ['seq'], batch_size=options['batch_size'])
+                sequence.last_seq = last_seq
+                sequence.save(update_fields=['last_seq'])
+                numbered += len(batch)
+        self.stdout.write(f"Numbered {numbered} message(s) in {len(room_ids)} room(s).")
+        created = self.backfill_receipts(options['batch_size'])
+        self.stdout.write(f"Created {created} read receipt(s).")
+
+    def backfill_receipts(self, batch_size):
+        # After numbering, so each room's counter covers its older messages too
+        memberships = Room.members.through.objects.filter(
+            ~Exists(ReadReceipt.objects.filter(user_id=OuterRef('user_id'), room_id=OuterRef('room_id')))
+        ).annotate(
+            last_seq=Coalesce(F('room__message_sequence__last_seq'), Value(0)),
+        ).values_list('user_id', 'room_id', 'last_seq')
+        created = 0
+        batch = []
+        for user_id, room_id, last_seq in memberships.iterator(chunk_size=batch_size):
+            batch.append(ReadReceipt(user_id=user_id, room_id=room_id, last_read_seq=last_seq))
+            if len(batch) >= batch_size:
+                created += self.create_receipts(batch)
+                batch = []
+        return created + self.create_receipts(batch)
+
+    def create_receipts(self, batch):
+        # Receipts written meanwhile by mark_read are newer than these; keep them
+        ReadReceipt.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from chat.benchmarking import environment, write_report
+from chat.consumers import RoomChatConsumer
+from chat.models import Message
+from chat.protocol import JSON, MSGPACK, Encoded, chat_frame, encode, encode_once
+
+
+async def _discard(message):
+    pass
+
+
+def make_consumer(protocol):
+    """
+    A RoomChatConsumer wired to a no-op ASGI send, so only the consumer-side work is measured.
+    """
+    consumer = RoomChatConsumer()
+    consumer.protocol = protocol
+    consumer.base_send = _discard
+    return consumer
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures CPU time per chat broadcast against group size, encoding the frame once per "
+        "recipient (the old path) versus once per broadcast (serialize-once fan-out)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500, 2000], help="Group sizes to test")
+        parser.add_argument('--broadcasts', type=int, default=100, help="Broadcasts per group size and mode")
+        parser.add_argument('--msgpack-share', type=float, default=0.0, help="Fraction of sockets using MessagePack")
+        parser.add_argument('--message-length', type=int, default=200)
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        message = Message(id=1, seq=1, room_id=1, user_id=1, content='x' * options['message_length'], created_at=timezone.now())
+        sender = {'id': 1, 'username': 'benchmark_user', 'profile_image': '/media/profile_images/benchmark.png'}
+        frame = chat_frame(message, sender)
+        results = [asyncio.run(self.measure(frame, size, options)) for size in options['sizes']]
+        write_report(self, {
+            'benchmark': 'chat_broadcast_cpu',
+            'environment': environment(),
+            'broadcasts': options['broadcasts'],
+            'msgpack_share': options['msgpack_share'],
+            'frame_bytes': len(json.dumps(frame)),
+            'results': results,
+        }, options['output'])
+
+    async def measure(self, frame, size, options):
+        msgpack_count = int(size * options['msgpack_share'])
+        consumers = [make_consumer(MSGPACK if i < msgpack_count else JSON) for i in range(size)]
+        broadcasts = options['broadcasts']
+
+        async def per_recipient():
+            # What chat_message did before: every consumer encodes the event itself
+            for consumer in consumers:
+                await consumer.send(**encode(frame, consumer.protocol))
+
+        async def serialize_once():
+            encoded = Encoded(encode_once(frame))
+            for consumer in consumers:
+                await consumer.send_frame(encoded)
+
+        timings = {}
+        for name, broadcast in (('per_recipient', per_recipient), ('serialize_once', serialize_once)):
+            await broadcast()  # warm up
+            started = time.process_time()
+            for _ in range(broadcasts):
+                await broadcast()
+            timings[name] = (time.process_time() - started) / broadcasts
+
+        return {
+            'group_size': size,
+            'cpu_ms_per_broadcast': {name: round(seconds * 1000, 4) for name, seconds in timings.items()},
+            'cpu_us_per_recipient': {name: round(seconds * 1e6 / size, 3) for name, seconds in timings.items()},
+            'encodes_per_broadcast': {'per_recipient': size, 'serialize_once': 2},
+            'speedup': round(timings['per_recipient'] / timings['serialize_once'], 2) if timings['serialize_once'] else None,
+        }
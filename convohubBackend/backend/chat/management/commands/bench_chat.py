@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+from unittest import mock
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from chat.benchmarking import benchmark_database, create_users, environment, latency_ms, write_report
+from chat.message_buffer import message_buffer
+from chat.middleware import JWTAuthMiddleware
+from chat.models import Message, RoomSequence
+from chat.routing import websocket_urlpatterns
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks RoomChatConsumer through Channels' WebsocketCommunicator: connect rate, "
+        "message throughput, broadcast latency and the room sequence allocation each message "
+        "waits for before its broadcast. Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help="WebSocket clients in the room")
+        parser.add_argument('--senders', type=int, default=5, help="How many of the clients send messages")
+        parser.add_argument('--messages', type=int, default=20, help="Messages per sender")
+        parser.add_argument('--rate', type=float, default=0, help="Messages per second per sender (0 = as fast as possible)")
+        parser.add_argument(
+            '--rate-limit', type=float, default=0,
+            help="Per-user inbound messages per second (CHAT_BACKPRESSURE['RATE_LIMIT']; 0 = off)",
+        )
+        parser.add_argument('--timeout', type=float, default=30, help="Seconds to wait for deliveries")
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            users = create_users(options['clients'], prefix='chatbench')
+            room = Room.objects.create(name='Benchmark room', host=users[0])
+            room.members.set(users)
+            tokens = [str(AccessToken.for_user(user)) for user in users]
+            backpressure = {**getattr(settings, 'CHAT_BACKPRESSURE', {}), 'RATE_LIMIT': options['rate_limit']}
+            allocations = []
+            allocate = RoomSequence.allocate
+
+            def timed_allocate(room_id):
+                started = time.perf_counter()
+                try:
+                    return allocate(room_id)
+                finally:
+                    allocations.append(time.perf_counter() - started)
+
+            with override_settings(CHAT_BACKPRESSURE=backpressure), \
+                    mock.patch.object(RoomSequence, 'allocate', timed_allocate):
+                report = asyncio.run(self.run(room.id, tokens, options))
+            # The one database round trip on the broadcast path; compare with broadcast_latency_ms
+            report['seq_allocate_ms'] = latency_ms(allocations)
+            report['persisted_messages'] = Message.objects.filter(room=room).count()
+        write_report(self, report, options['output'])
+
+    async def run(self, room_id, tokens, options):
+        application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        senders = min(options['senders'], len(tokens))
+        per_sender = options['messages']
+        expected = senders * per_sender
+
+        async def connect(token):
+            communicator = WebsocketCommunicator(application, f'/ws/chat/{room_id}/?token={token}')
+            started = time.perf_counter()
+            connected, _ = await communicator.connect(timeout=options['timeout'])
+            return communicator, connected, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(connect(token) for token in tokens))
+        connect_seconds = time.perf_counter() - started
+        clients = [communicator for communicator, connected, _ in results if connected]
+
+        sent_at = {}
+        latencies = []
+
+        async def listen(communicator):
+            received = 0
+            while received < expected:
+                try:
+                    frame = json.loads(await communicator.receive_from(timeout=options['timeout']))
+                except asyncio.TimeoutError:
+                    return
+                if 'type' in frame:
+                    # Presence, resync and error frames
+                    continue
+                received += 1
+                latencies.append(time.perf_counter() - sent_at[frame['message']])
+
+        async def send(index, communicator):
+            for seq in range(per_sender):
+                key = f'{index}:{seq}'
+                sent_at[key] = time.perf_counter()
+                await communicator.send_to(text_data=json.dumps({'message': key}))
+                await asyncio.sleep(1 / options['rate'] if options['rate'] else 0)
+
+        listeners = [asyncio.ensure_future(listen(communicator)) for communicator in clients]
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i, communicator) for i, communicator in enumerate(clients[:senders])))
+        send_seconds = time.perf_counter() - started
+        await asyncio.gather(*listeners)
+        delivery_seconds = time.perf_counter() - started
+
+        for communicator in clients:
+            await communicator.disconnect()
+        await message_buffer.flush()
+        layer = get_channel_layer()
+
+        deliveries = len(latencies)
+        return {
+            'benchmark': 'chat_consumer',
+            'environment': {**environment(), 'channel_layer': type(layer).__name__},
+            'clients': len(tokens),
+            'senders': senders,
+            'messages_per_sender': per_sender,
+            'connect': {
+                'connected': len(clients),
+                'seconds': round(connect_seconds, 4),
+                'per_second': round(len(clients) / connect_seconds, 2) if connect_seconds else None,
+                'latency_ms': latency_ms([seconds for _, connected, seconds in results if connected]),
+            },
+            'throughput': {
+                'messages_sent': expected,
+                'send_seconds': round(send_seconds, 4),
+                'messages_per_second': round(expected / send_seconds, 2) if send_seconds else None,
+                'deliveries': deliveries,
+                'delivery_ratio': round(deliveries / (expected * len(clients)), 4) if clients and expected else None,
+                'deliveries_per_second': round(deliveries / delivery_seconds, 2) if delivery_seconds else None,
+            },
+            'broadcast_latency_ms': latency_ms(latencies),
+        }
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from chat.benchmarking import environment, latency_ms, write_report
+from chat.broker import run_broker
+from chat.layers import BrokerChannelLayer
+
+GROUP = 'bench_room'
+
+
+def worker_main(hosts, members, expected, ready, results):
+    """
+    One simulated Daphne worker: `members` sockets in the group, recording delivery latency.
+    """
+    async def run():
+        layer = BrokerChannelLayer(hosts=hosts)
+        channels = [await layer.new_channel() for _ in range(members)]
+        latencies = []
+
+        async def listen(channel):
+            for _ in range(expected):
+                message = await layer.receive(channel)
+                latencies.append(time.time() - message['sent_at'])
+
+        listeners = [asyncio.ensure_future(listen(channel)) for channel in channels]
+        await asyncio.sleep(0)
+        for channel in channels:
+            await layer.group_add(GROUP, channel)
+        await asyncio.sleep(0.2)
+        ready.set()
+        try:
+            await asyncio.wait_for(asyncio.gather(*listeners), timeout=60)
+        except asyncio.TimeoutError:
+            pass
+        await layer.close()
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+
+class Command(BaseCommand):
+    help = "Measures group_send fan-out latency through BrokerChannelLayer across N worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--members', type=int, default=50, help="Group members per worker")
+        parser.add_argument('--messages', type=int, default=200)
+        parser.add_argument('--rate', type=float, default=0, help="Messages per second (0 = as fast as possible)")
+        parser.add_argument('--hosts', nargs='*', help="Existing broker addresses; a local broker is started if omitted")
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        workers, members, count = options['workers'], options['members'], options['messages']
+        broker = None
+        hosts = options['hosts']
+        if not hosts:
+            hosts = [f"unix://{os.path.join(tempfile.mkdtemp(), 'broker.sock')}"]
+            broker = multiprocessing.Process(target=run_broker, args=(hosts[0],), daemon=True)
+            broker.start()
+            time.sleep(0.5)
+
+        ready_events = [multiprocessing.Event() for _ in range(workers)]
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker_main, args=(hosts, members, count, ready, results))
+            for ready in ready_events
+        ]
+        for process in processes:
+            process.start()
+        for ready in ready_events:
+            ready.wait(timeout=30)
+
+        async def publish():
+            layer = BrokerChannelLayer(hosts=hosts)
+            started = time.time()
+            for i in range(count):
+                await layer.group_send(GROUP, {'type': 'chat.message', 'seq': i, 'sent_at': time.time()})
+                if options['rate']:
+                    await asyncio.sleep(1 / options['rate'])
+                else:
+                    await asyncio.sleep(0)
+            elapsed = time.time() - started
+            await asyncio.sleep(0.1)
+            await layer.close()
+            return elapsed
+
+        publish_seconds = asyncio.run(publish())
+        latencies = []
+        for _ in processes:
+            latencies.extend(results.get(timeout=90))
+        for process in processes:
+            process.join()
+        if broker is not None:
+            broker.terminate()
+
+        expected = workers * members * count
+        report = {
+            'benchmark': 'chat_fanout',
+            'environment': environment(),
+            'workers': workers,
+            'members_per_worker': members,
+            'messages': count,
+            'deliveries': len(latencies),
+            'delivery_ratio': len(latencies) / expected if expected else None,
+            'publish_seconds': round(publish_seconds, 4),
+            'latency_ms': latency_ms(latencies),
+        }
+        write_report(self, report, options['output'])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from chat.broker import run_broker
+
+
+class Command(BaseCommand):
+    help = "Runs the local channel-layer broker used by chat.layers.BrokerChannelLayer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind', default='tcp://127.0.0.1:6390',
+            help="Address to listen on: tcp://host:port or unix:///path/to.sock",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Channel-layer broker listening on {options['bind']}")
+        try:
+            run_broker(options['bind'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,252 @@
+import asyncio
+import atexit
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from . import metrics
+from .db_executor import run_in_db
+from .models import Message, RoomSequence
+from .read_receipts import record_sent
+from .search import index_messages
+from rooms.activity_feed import record_messages
+from rooms.models import Room
+
+DEFAULT_BUFFER_SETTINGS = {
+    'ENABLED': True,
+    'MAX_BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 0.5,
+}
+
+logger = logging.getLogger('convohub.chat')
+
+
+def get_buffer_settings():
+    """
+    Returns the CHAT_MESSAGE_BUFFER settings merged over the defaults.
+    """
+    return {**DEFAULT_BUFFER_SETTINGS, **getattr(settings, 'CHAT_MESSAGE_BUFFER', {})}
+
+
+def _lose(messages, reason, error=None):
+    # These messages were already broadcast, so they are counted and logged rather than dropped quietly
+    if not messages:
+        return
+    metrics.lost_messages.inc(len(messages), reason=reason)
+    logger.error(
+        "Could not save %d chat message(s) (%s): ids %s%s", len(messages), reason,
+        [m.id for m in messages], f": {error}" if error else "",
+    )
+
+
+def _insert(batch):
+    # A savepoint, so a failed insert leaves an outer transaction usable
+    with transaction.atomic():
+        Message.objects.bulk_create(batch)
+
+
+def _without_missing_references(batch):
+    """
+    Drops the messages whose room or user no longer exists.
+    """
+    rooms = set(Room.objects.filter(id__in={int(m.room_id) for m in batch}).values_list('id', flat=True))
+    users = set(User.objects.filter(id__in={m.user_id for m in batch}).values_list('id', flat=True))
+    kept = [m for m in batch if int(m.room_id) in rooms and m.user_id in users]
+    _lose([m for m in batch if int(m.room_id) not in rooms], 'missing_room')
+    _lose([m for m in batch if int(m.room_id) in rooms and m.user_id not in users], 'missing_user')
+    return kept
+
+
+def _insert_each(batch):
+    """
+    Inserts the messages one at a time. Returns the ones that were saved.
+    """
+    saved = []
+    for message in batch:
+        try:
+            _insert([message])
+        except Exception as e:
+            _lose([message], 'error', e)
+        else:
+            saved.append(message)
+    return saved
+
+
+def write_messages(batch):
+    """
+    Persists a batch of pending messages with a single bulk insert.
+
+    If the insert fails, the rows whose room or user no longer exists are
+    dropped and the rest retried in bulk; if that fails too (a (room, seq)
+    conflict, a database error), the rows are inserted one by one so a bad
+    row only loses itself. Lost messages are logged and counted in
+    `convohub_chat_lost_messages_total`.
+
+    Args:
+        batch (list): Unsaved Message instances.
+    """
+    if not batch:
+        return
+    try:
+        _insert(batch)
+    except Exception as e:
+        logger.warning("Bulk insert of %d chat messages failed, retrying: %s", len(batch), e)
+        batch = _without_missing_references(batch)
+        try:
+            _insert(batch)
+        except Exception as e:
+            logger.warning("Retried bulk insert failed, inserting row by row: %s", e)
+            batch = _insert_each(batch)
+    if not batch:
+        return
+    # bulk_create skips post_save, so keep the search index and activity feed current here
+    index_messages(batch)
+    record_messages(batch)
+    record_sent(batch)
+
+
+class MessageIdAllocator:
+    """
+    Hands out Message primary keys before the row is written, so a broadcast can carry the id.
+
+    On PostgreSQL ids are reserved from the table's sequence in blocks of
+    BLOCK_SIZE (one query per block), so they never collide with other
+    processes or with rows saved normally. Other databases continue from the
+    current maximum id, which is only safe with a single writing process
+    (local development on SQLite).
+    """
+
+    BLOCK_SIZE = 100
+
+    def __init__(self):
+        self._ids = deque()
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        table = Message._meta.db_table
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                    [table, self.BLOCK_SIZE],
+                )
+                return [row[0] for row in cursor.fetchall()]
+        start = max(Message.objects.aggregate(last=Max('id'))['last'] or 0, self._last) + 1
+        return list(range(start, start + self.BLOCK_SIZE))
+
+    def _take(self):
+        with self._lock:
+            return self._ids.popleft() if self._ids else None
+
+    def _refill(self):
+        ids = self._reserve()
+        with self._lock:
+            self._ids.extend(ids)
+            self._last = max(self._last, ids[-1])
+
+    async def allocate(self):
+        message_id = self._take()
+        while message_id is None:
+            await run_in_db(self._refill)()
+            message_id = self._take()
+        return message_id
+
+
+message_ids = MessageIdAllocator()
+
+
+class MessageBuffer:
+    """
+    In-process write-behind buffer for chat messages.
+
+    Consumers add messages and broadcast straight away; pending messages are
+    written with `bulk_create` once MAX_BATCH_SIZE is reached or FLUSH_INTERVAL
+    seconds have passed, whichever comes first. With ENABLED set to False each
+    message is written before `add` returns (no loss window, higher latency).
+
+    The room sequence number is the one database call made before a broadcast:
+    it has to be unique and increasing across every worker, which a per-process
+    block or counter can't give. Blocks reserved per worker would interleave (a
+    client resuming from seq 101 would miss a 2 broadcast after it, and unread
+    counts would skip it), so each message pays the round trip; `bench_chat`
+    reports it as `seq_allocate_ms`. On PostgreSQL it is a single upsert;
+    elsewhere a short locked transaction, queued on the chat DB executor.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+        # The loop only keeps weak references to tasks; these are the timer's flushes in flight
+        self._flushes = set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def add(self, user, room_id, content):
+        """
+        Queues a message and returns it, with `id`, `seq` and `created_at` already assigned.
+
+        Returns None if the room no longer exists.
+        """
+        config = get_buffer_settings()
+        seq = await run_in_db(RoomSequence.allocate)(room_id)
+        if seq is None:
+            return None
+        message = Message(
+            id=await message_ids.allocate(), seq=seq, user=user, room_id=room_id,
+            content=content, created_at=timezone.now(),
+        )
+
+        if not config['ENABLED']:
+            await run_in_db(write_messages)([message])
+            return message
+
+        with self._lock:
+            self._pending.append(message)
+            pending = len(self._pending)
+
+        if pending >= config['MAX_BATCH_SIZE']:
+            await self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(config['FLUSH_INTERVAL'], self._start_flush, loop)
+        return message
+
+    def _start_flush(self, loop):
+        task = loop.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _take(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    async def flush(self):
+        """
+        Writes every pending message to the database.
+        """
+        batch = self._take()
+        if batch:
+            await run_in_db(write_messages)(batch)
+
+    def flush_sync(self):
+        """
+        Blocking flush for use outside the event loop (process shutdown).
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        write_messages(batch)
+
+
+message_buffer = MessageBuffer()
+atexit.register(message_buffer.flush_sync)
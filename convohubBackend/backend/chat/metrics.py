@@ -0,0 +1,116 @@
+import asyncio
+import weakref
+from monitoring.instrumentation import get_instrumentation_settings
+from monitoring.registry import registry
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+room_connections = registry.gauge(
+    'convohub_chat_room_connections', 'Open chat sockets per room.', ('room',))
+room_messages = registry.counter(
+    'convohub_chat_messages_total', 'Chat messages received per room with open sockets.', ('room',))
+connect_rejected = registry.counter(
+    'convohub_chat_connect_rejected_total', 'Chat connections refused, by reason.', ('reason',))
+invalid_frames = registry.counter(
+    'convohub_chat_invalid_frames_total', 'Inbound frames ignored, by reason.', ('reason',))
+dropped_messages = registry.counter(
+    'convohub_chat_dropped_messages_total', 'Broadcasts that could not be delivered to a socket, by reason.', ('reason',))
+lost_messages = registry.counter(
+    'convohub_chat_lost_messages_total', 'Broadcast messages that could not be saved, by reason.', ('reason',))
+shed_load = registry.counter(
+    'convohub_chat_shed_total', 'Frames shed under backpressure or rate limiting, by reason.', ('reason',))
+replays = registry.counter(
+    'convohub_chat_replays_total', 'Reconnects resumed with last_seq, by where the missed messages came from.',
+    ('source',))
+group_send_latency = registry.histogram(
+    'convohub_chat_group_send_seconds', 'Time spent in channel_layer.group_send.', buckets=LAG_BUCKETS)
+broadcast_delay = registry.histogram(
+    'convohub_chat_broadcast_delay_seconds', 'Delay from receiving a message to sending it to each socket.',
+    buckets=LAG_BUCKETS)
+db_workers = registry.gauge(
+    'convohub_chat_db_workers', 'Threads in the chat database executor.')
+db_queue_depth = registry.gauge(
+    'convohub_chat_db_queue_depth', 'Chat database calls waiting for an executor thread.')
+db_in_flight = registry.gauge(
+    'convohub_chat_db_in_flight', 'Chat database calls running on the executor.')
+db_wait = registry.histogram(
+    'convohub_chat_db_wait_seconds', 'Time chat database calls wait for an executor thread.', buckets=LAG_BUCKETS)
+db_call_duration = registry.histogram(
+    'convohub_chat_db_call_seconds', 'Time chat database calls take on the executor.', buckets=LAG_BUCKETS)
+loop_lag = registry.gauge(
+    'convohub_event_loop_lag_seconds', 'Latest event-loop scheduling lag sample.')
+loop_lag_samples = registry.histogram(
+    'convohub_event_loop_lag_sample_seconds', 'Event-loop scheduling lag samples.', buckets=LAG_BUCKETS)
+
+# Connected consumers, for queue-depth sampling at scrape time
+active_consumers = weakref.WeakSet()
+# Loops with a lag sampler. Weak on purpose: the sampler task holds its loop, so a
+# mapping from loop to task would keep every loop alive. The loop keeps the task instead.
+_monitored_loops = weakref.WeakSet()
+
+
+def consumer_connected(consumer):
+    active_consumers.add(consumer)
+    room_connections.inc(room=consumer.room_id)
+    ensure_loop_monitor()
+
+
+def consumer_disconnected(consumer):
+    if consumer not in active_consumers:
+        return
+    active_consumers.discard(consumer)
+    room_connections.dec(room=consumer.room_id)
+    if not any(other.room_id == consumer.room_id for other in list(active_consumers)):
+        # Keep the label sets bounded to rooms with open sockets
+        room_connections.remove(room=consumer.room_id)
+        room_messages.remove(room=consumer.room_id)
+
+
+async def _sample_loop_lag(interval):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        loop_lag.set(lag)
+        loop_lag_samples.observe(lag)
+
+
+def ensure_loop_monitor():
+    """
+    Starts the lag sampler for the running event loop, once per loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _monitored_loops:
+        interval = get_instrumentation_settings()['LOOP_LAG_INTERVAL']
+        _monitored_loops.add(loop)
+        loop.create_task(_sample_loop_lag(interval))
+
+
+def layer_queue_depth(layer, channel):
+    """
+    Messages waiting in the channel layer for `channel` (0 if the layer can't tell).
+    """
+    depth = getattr(layer, 'queue_depth', None)
+    if depth is not None:
+        return depth(channel)
+    queue = getattr(layer, 'channels', {}).get(channel)  # InMemoryChannelLayer
+    return queue.qsize() if queue is not None else 0
+
+
+@registry.register_collector
+def send_queue_metrics():
+    per_room = {}
+    for consumer in list(active_consumers):
+        depth = layer_queue_depth(consumer.channel_layer, consumer.channel_name)
+        send_queue = getattr(consumer, 'send_queue', None)
+        if send_queue is not None:
+            depth += len(send_queue)
+        per_room.setdefault(consumer.room_id, []).append(depth)
+    depths = [depth for room_depths in per_room.values() for depth in room_depths]
+    return [
+        ('convohub_chat_send_queue_depth_max', 'gauge', 'Deepest outbound backlog of any chat socket, per room.',
+         [({'room': room}, max(room_depths)) for room, room_depths in per_room.items()]),
+        ('convohub_chat_send_queue_depth_total', 'gauge', 'Outbound frames queued for all chat sockets.',
+         [({}, sum(depths))]),
+    ]
@@ -0,0 +1,40 @@
+from urllib.parse import parse_qs
+from channels.middleware import BaseMiddleware
+from channels.security.websocket import WebsocketDenier
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from authentication.jwt_auth import aget_user_for_token
+from . import metrics
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections from the `?token=<access token>` query parameter.
+
+    The user is resolved through `user_cache`, so a client reconnecting with the same
+    token costs no queries. Missing, invalid or revoked tokens are refused during the handshake,
+    before a consumer is created. Replaces Channels' session-based AuthMiddlewareStack,
+    which looked up a session on every connect that the JWT check then ignored.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'websocket':
+            return await self.inner(scope, receive, send)
+
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+        if not token:
+            metrics.connect_rejected.inc(reason='missing_token')
+            return await WebsocketDenier.as_asgi()(scope, receive, send)
+
+        try:
+            user = await aget_user_for_token(AccessToken(token))
+        except AuthenticationFailed:
+            # Issued before the user's last logout
+            metrics.connect_rejected.inc(reason='revoked_token')
+            return await WebsocketDenier.as_asgi()(scope, receive, send)
+        except Exception as e:
+            print(f"Token validation error: {e}")
+            metrics.connect_rejected.inc(reason='invalid_token')
+            return await WebsocketDenier.as_asgi()(scope, receive, send)
+
+        return await super().__call__(dict(scope, user=user), receive, send)
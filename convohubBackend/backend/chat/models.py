@@ -1,13 +1,103 @@
 # chat/models.py
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rooms.models import Room
 
+
+class RoomSequence(models.Model):
+    """
+    The last message sequence number handed out in a room.
+    """
+    room = models.OneToOneField(Room, on_delete=models.CASCADE, primary_key=True, related_name='message_sequence')
+    last_seq = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, room_id):
+        """
+        Reserves the room's next sequence number.
+
+        One atomic statement on PostgreSQL (an upsert), so numbers are unique and
+        increasing across every worker process.
+
+        Returns:
+            int: The sequence number, or None if the room no longer exists.
+        """
+        try:
+            if connection.vendor == 'postgresql':
+                table = connection.ops.quote_name(cls._meta.db_table)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {table} (room_id, last_seq) VALUES (%s, 1) "
+                        f"ON CONFLICT (room_id) DO UPDATE SET last_seq = {table}.last_seq + 1 "
+                        f"RETURNING last_seq",
+                        [room_id],
+                    )
+                    return cursor.fetchone()[0]
+            with transaction.atomic():
+                sequence, _ = cls.objects.select_for_update().get_or_create(room_id=room_id)
+                sequence.last_seq += 1
+                sequence.save(update_fields=['last_seq'])
+                return sequence.last_seq
+        except IntegrityError:
+            return None
+
+
 class Message(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='messages')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the message is received, not when the write-behind buffer saves it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Per-room, increasing; clients resume a dropped socket from the last one they saw
+    seq = models.PositiveBigIntegerField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['room', 'created_at', 'id'], name='chat_msg_room_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'seq'], name='chat_msg_room_seq_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.seq is None:
+            self.seq = RoomSequence.allocate(self.room_id)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username}: {self.content[:50]}"
+
+
+class ReadReceipt(models.Model):
+    """
+    How far a user has read in a room. Unread count = room's last seq - last_read_seq.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='read_receipts')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='read_receipts')
+    last_read_seq = models.PositiveBigIntegerField(default=0)
+    read_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'room'], name='chat_read_receipt_user_room_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read room {self.room_id} up to {self.last_read_seq}"
+
+
+class RoomPresence(models.Model):
+    """
+    One open chat socket in a room, kept alive by heartbeats until `expires_at`.
+
+    Stored in the database rather than the cache so every worker process sees (and
+    atomically updates) the same roster.
+    """
+    channel_name = models.CharField(max_length=255, primary_key=True)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='presence')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='room_presence')
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['room', 'expires_at'], name='chat_presence_room_exp_idx')]
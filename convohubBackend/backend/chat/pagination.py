@@ -0,0 +1,128 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+from .models import Message
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """
+    Encodes a message's position as an opaque cursor string.
+
+    Args:
+        message (Message): The message marking the cursor position.
+
+    Returns:
+        str: A URL-safe cursor built from the message's (created_at, id) pair.
+    """
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor string.
+
+    Returns:
+        tuple: A (created_at, id) pair.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, message_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(message_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+def parse_page_size(value):
+    """
+    Parses and clamps a requested page size.
+
+    Raises:
+        ValueError: If the value is not a positive integer.
+    """
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit <= 0:
+        raise ValueError("'limit' must be a positive integer.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def get_message_page(room_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetches one page of a room's messages using keyset pagination over (created_at, id).
+
+    Each page costs a single indexed range scan on (room, created_at, id), so the
+    cost does not grow with the age or size of the room.
+
+    Args:
+        room_id (int): The room whose messages are fetched.
+        before (str, optional): Cursor; only messages older than it are returned.
+        after (str, optional): Cursor; only messages newer than it are returned.
+        limit (int): The maximum number of messages to return.
+
+    Returns:
+        dict: `messages` (newest first), plus `before_cursor` and `after_cursor`
+        for fetching the next older / newer page (None when there is no such page).
+    """
+    return _page_result(list(_page_query(room_id, before, after, limit)), before, after, limit)
+
+
+async def aget_message_page(room_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    `get_message_page` for async views, fetched with the async ORM.
+    """
+    rows = [message async for message in _page_query(room_id, before, after, limit)]
+    return _page_result(rows, before, after, limit)
+
+
+def _page_query(room_id, before, after, limit):
+    """
+    The single (limit + 1)-row range scan behind a page.
+
+    Raises:
+        ValueError: If a cursor is malformed.
+    """
+    queryset = Message.objects.filter(room_id=room_id).select_related('user__profile')
+
+    if after:
+        created_at, message_id = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
+        ).order_by('created_at', 'id')
+    else:
+        if before:
+            created_at, message_id = decode_cursor(before)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id)
+            )
+        queryset = queryset.order_by('-created_at', '-id')
+    return queryset[:limit + 1]
+
+
+def _page_result(rows, before, after, limit):
+    has_more = len(rows) > limit
+    if after:
+        messages = rows[:limit][::-1]
+        has_newer, has_older = has_more, True
+    else:
+        messages = rows[:limit]
+        has_newer, has_older = bool(before), has_more
+
+    return {
+        'messages': messages,
+        'before_cursor': encode_cursor(messages[-1]) if messages and has_older else None,
+        'after_cursor': encode_cursor(messages[0]) if messages and has_newer else None,
+    }
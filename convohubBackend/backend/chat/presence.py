@@ -0,0 +1,132 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rooms.models import Room
+from .models import RoomPresence
+
+DEFAULT_PRESENCE_SETTINGS = {
+    'HEARTBEAT_INTERVAL': 30,
+    'TTL': 90,
+}
+
+
+def get_presence_settings():
+    return {**DEFAULT_PRESENCE_SETTINGS, **getattr(settings, 'CHAT_PRESENCE', {})}
+
+
+# Room id -> time.monotonic() of this process's last prune there
+_last_prune = {}
+
+
+def _prune(room_id, now):
+    """
+    Drops the room's expired sockets, at most once per heartbeat interval per process.
+    Returns the ids of users left without any.
+    """
+    checked_at = time.monotonic()
+    if checked_at - _last_prune.get(room_id, float('-inf')) < get_presence_settings()['HEARTBEAT_INTERVAL']:
+        return []
+    _last_prune[room_id] = checked_at
+    stale = RoomPresence.objects.filter(room_id=room_id, expires_at__lte=now)
+    user_ids = set(stale.values_list('user_id', flat=True))
+    if not user_ids:
+        return []
+    stale.delete()
+    still_online = set(
+        RoomPresence.objects.filter(room_id=room_id, user_id__in=user_ids).values_list('user_id', flat=True)
+    )
+    return sorted(user_ids - still_online)
+
+
+def _is_online(room_id, user_id):
+    return RoomPresence.objects.filter(room_id=room_id, user_id=user_id).exists()
+
+
+def _lock_member(room_id, user_id):
+    # Serializes one user's joins and leaves in a room, so exactly one of them reports the change
+    list(
+        Room.members.through.objects.select_for_update()
+        .filter(room_id=room_id, user_id=user_id).values_list('id', flat=True)
+    )
+
+
+def _register(room_id, user_id, channel_name, now, expires_at):
+    """
+    Upserts the socket's row in one statement, inserting only if the user had no live
+    socket in the room. Returns True if it did, i.e. the user came online.
+    """
+    table = connection.ops.quote_name(RoomPresence._meta.db_table)
+    now, expires_at = (connection.ops.adapt_datetimefield_value(value) for value in (now, expires_at))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (channel_name, room_id, user_id, expires_at) SELECT %s, %s, %s, %s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE room_id = %s AND user_id = %s AND expires_at > %s) "
+            f"ON CONFLICT (channel_name) DO UPDATE SET room_id = excluded.room_id, "
+            f"user_id = excluded.user_id, expires_at = excluded.expires_at",
+            [channel_name, room_id, user_id, expires_at, room_id, user_id, now],
+        )
+        return cursor.rowcount > 0
+
+
+def join(room_id, user, channel_name):
+    """
+    Registers a socket. Returns (came_online, expired_user_ids).
+
+    Sockets are rows in the database, shared by every worker process; each call is a
+    short transaction, so concurrent joins and leaves never overwrite each other.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=get_presence_settings()['TTL'])
+    with transaction.atomic():
+        expired = _prune(room_id, now)
+        _lock_member(room_id, user.id)
+        came_online = _register(room_id, user.id, channel_name, now, expires_at)
+        if not came_online:
+            RoomPresence.objects.update_or_create(
+                channel_name=channel_name,
+                defaults={'room_id': room_id, 'user_id': user.id, 'expires_at': expires_at},
+            )
+    return came_online, expired
+
+
+def heartbeat(room_id, user, channel_name):
+    """
+    Extends a socket's expiry. Returns (came_online, expired_user_ids); a socket
+    whose entry already expired is re-registered and reported as coming online.
+
+    A live socket costs one UPDATE, plus the room's prune once per heartbeat interval.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=get_presence_settings()['TTL'])
+    if not RoomPresence.objects.filter(channel_name=channel_name, expires_at__gt=now).update(expires_at=expires_at):
+        return join(room_id, user, channel_name)
+    return False, _prune(room_id, now)
+
+
+def leave(room_id, user_id, channel_name):
+    """
+    Unregisters a socket. Returns (went_offline, expired_user_ids).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        expired = _prune(room_id, now)
+        _lock_member(room_id, user_id)
+        deleted, _ = RoomPresence.objects.filter(channel_name=channel_name).delete()
+        went_offline = bool(deleted) and not _is_online(room_id, user_id)
+    return went_offline, expired
+
+
+def online_users(room_id):
+    """
+    Users with at least one live socket in the room, ordered by username. One query.
+    """
+    rows = (
+        RoomPresence.objects.filter(room_id=room_id, expires_at__gt=timezone.now())
+        .values_list('user_id', 'user__username')
+        .distinct()
+        .order_by(Lower('user__username'))
+    )
+    return [{'user_id': user_id, 'username': username} for user_id, username in rows]
@@ -0,0 +1,99 @@
+import json
+from urllib.parse import parse_qs
+import msgpack
+from rooms.serializers import UserSerializer
+
+JSON, MSGPACK = 'json', 'msgpack'
+
+# WebSocket subprotocols a client can request, e.g. new WebSocket(url, ['convohub.msgpack'])
+SUBPROTOCOLS = {'convohub.json': JSON, 'convohub.msgpack': MSGPACK}
+
+
+def negotiate(scope):
+    """
+    Picks the wire format for a socket.
+
+    Returns:
+        tuple: (protocol, subprotocol to echo in the handshake or None). Clients
+        that can't set subprotocols may pass ?format=msgpack instead; anything
+        else gets JSON text frames.
+    """
+    for subprotocol in scope.get('subprotocols') or []:
+        if subprotocol in SUBPROTOCOLS:
+            return SUBPROTOCOLS[subprotocol], subprotocol
+    query = parse_qs(scope.get('query_string', b'').decode())
+    if query.get('format', [JSON])[0] == MSGPACK:
+        return MSGPACK, None
+    return JSON, None
+
+
+def encode(frame, protocol):
+    """
+    Returns the send() kwargs for `frame` in `protocol`.
+    """
+    if protocol == MSGPACK:
+        return {'bytes_data': msgpack.packb(frame, use_bin_type=True)}
+    return {'text_data': json.dumps(frame, separators=(',', ':'))}
+
+
+def decode(text_data=None, bytes_data=None):
+    """
+    Parses an inbound frame: JSON text or a MessagePack binary map.
+
+    Raises:
+        ValueError: If the frame is not a valid map in either format.
+    """
+    try:
+        frame = msgpack.unpackb(bytes_data, raw=False) if bytes_data is not None else json.loads(text_data)
+    except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, TypeError) as e:
+        raise ValueError(f"Malformed frame: {e}")
+    if not isinstance(frame, dict):
+        raise ValueError("Frame must be an object.")
+    return frame
+
+
+def encode_once(frame):
+    """
+    Encodes a frame in every wire format up front.
+
+    The result travels through the channel layer to the whole group and each
+    socket sends the encoding for its format as-is, so a broadcast costs one
+    encode per format instead of one per recipient.
+    """
+    return {'text': encode(frame, JSON)['text_data'], 'binary': encode(frame, MSGPACK)['bytes_data']}
+
+
+class Encoded(dict):
+    """
+    Marks a frame from `encode_once` on its way to a socket, as opposed to a dict still to be encoded.
+    """
+
+
+def encoded_kwargs(encoded, protocol):
+    """
+    The send() kwargs for a frame from `encode_once`.
+    """
+    return {'bytes_data': encoded['binary']} if protocol == MSGPACK else {'text_data': encoded['text']}
+
+
+def sender_info(user):
+    """
+    The sender block included in chat frames (same shape as `user` in message history).
+    """
+    return dict(UserSerializer(user).data)
+
+
+def chat_frame(message, sender):
+    """
+    A chat message frame. `id`, `seq` and `created_at` match what the history endpoints return.
+    """
+    return {
+        'id': message.id,
+        'seq': message.seq,
+        'room_id': message.room_id,
+        'message': message.content,
+        'user_id': sender['id'],
+        'user': sender,
+        'created_at': message.created_at.isoformat(),
+        'ts': int(message.created_at.timestamp() * 1000),
+    }
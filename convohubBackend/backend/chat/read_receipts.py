@@ -0,0 +1,77 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Exists, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from .models import ReadReceipt, RoomSequence
+from rooms.models import Room
+
+
+def latest_seq(room_id):
+    return RoomSequence.objects.filter(room_id=room_id).values_list('last_seq', flat=True).first() or 0
+
+
+def mark_read(user_id, room_id, seq=None):
+    """
+    Moves a user's read pointer in a room forward to `seq` (default: the latest message).
+
+    The pointer never moves backwards, and never past the room's latest sequence number.
+
+    Returns:
+        int: The user's read pointer after the update.
+    """
+    latest = latest_seq(room_id)
+    seq = latest if seq is None else max(0, min(seq, latest))
+    updated = ReadReceipt.objects.filter(
+        user_id=user_id, room_id=room_id, last_read_seq__lt=seq,
+    ).update(last_read_seq=seq, read_at=timezone.now())
+    if not updated:
+        try:
+            with transaction.atomic():
+                ReadReceipt.objects.get_or_create(user_id=user_id, room_id=room_id, defaults={'last_read_seq': seq})
+        except IntegrityError:
+            # Created concurrently; the conditional update above can simply be retried
+            ReadReceipt.objects.filter(
+                user_id=user_id, room_id=room_id, last_read_seq__lt=seq,
+            ).update(last_read_seq=seq, read_at=timezone.now())
+    return ReadReceipt.objects.filter(user_id=user_id, room_id=room_id).values_list('last_read_seq', flat=True).first()
+
+
+def record_sent(messages):
+    """
+    Marks each sender as having read up to their own latest message, so it never counts as unread for them.
+
+    Called by the message buffer after a batch is written: one conditional update per (user, room) in the batch.
+    """
+    latest = {}
+    for message in messages:
+        if message.seq is not None:
+            key = (message.user_id, message.room_id)
+            latest[key] = max(latest.get(key, 0), message.seq)
+    for (user_id, room_id), seq in latest.items():
+        try:
+            mark_read(user_id, room_id, seq)
+        except Exception as e:
+            print(f"Error updating read receipt: {e}")
+
+
+def with_unread_counts(rooms, user):
+    """
+    Annotates `unread_count` (and `last_read_seq`) for `user` on a Room queryset.
+
+    Both come from the room's sequence counter and the user's read receipt,
+    joined into the room query itself, so badges for every room cost no extra queries.
+    Both are None for rooms `user` is not a member of.
+    """
+    last_read = ReadReceipt.objects.filter(user=user, room=OuterRef('pk')).values('last_read_seq')[:1]
+    membership = Room.members.through.objects.filter(room_id=OuterRef('pk'), user_id=user.pk)
+    return rooms.annotate(
+        is_member=Exists(membership),
+        last_read_seq=Case(When(is_member=True, then=Coalesce(Subquery(last_read), Value(0))), default=None),
+    ).annotate(
+        unread_count=Case(
+            When(is_member=True, then=Greatest(
+                Coalesce(F('message_sequence__last_seq'), Value(0)) - F('last_read_seq'), Value(0),
+            )),
+            default=None,
+        ),
+    )
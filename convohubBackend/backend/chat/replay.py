@@ -0,0 +1,106 @@
+import bisect
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from django.conf import settings
+from .models import Message, RoomSequence
+from .protocol import chat_frame, sender_info
+
+DEFAULT_REPLAY_SETTINGS = {
+    'WINDOW_SIZE': 100,
+    'MAX_ROOMS': 1000,
+    'REPLAY_LIMIT': 50,
+}
+
+
+def get_replay_settings():
+    return {**DEFAULT_REPLAY_SETTINGS, **getattr(settings, 'CHAT_REPLAY', {})}
+
+
+def requested_seq(scope):
+    """
+    The `last_seq` a reconnecting client passed in the query string, or None.
+    """
+    value = parse_qs(scope.get('query_string', b'').decode()).get('last_seq', [None])[0]
+    try:
+        seq = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seq if seq >= 0 else None
+
+
+class RecentMessages:
+    """
+    Per-process window of the latest encoded chat frames of each room, keyed by sequence number.
+
+    Every consumer records the broadcasts it receives, so while a room has a
+    socket in this process its window holds every message since the window was
+    created. Windows are dropped when the room's last local socket closes (they
+    could miss messages from then on) and the least recently used room is
+    evicted beyond MAX_ROOMS.
+    """
+
+    def __init__(self):
+        self._rooms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, room_id, seq, frame):
+        config = get_replay_settings()
+        with self._lock:
+            window = self._rooms.get(room_id)
+            if window is None:
+                window = self._rooms[room_id] = ([], {})
+                while len(self._rooms) > config['MAX_ROOMS']:
+                    self._rooms.popitem(last=False)
+            self._rooms.move_to_end(room_id)
+            seqs, frames = window
+            if seq in frames:
+                # Already recorded by another consumer in this room
+                return
+            # Broadcasts from other workers can arrive slightly out of order
+            bisect.insort(seqs, seq)
+            frames[seq] = frame
+            while len(seqs) > config['WINDOW_SIZE']:
+                del frames[seqs.pop(0)]
+
+    def since(self, room_id, last_seq):
+        """
+        Returns the frames after `last_seq`, oldest first, or None if the window doesn't reach back that far.
+        """
+        with self._lock:
+            window = self._rooms.get(room_id)
+            if window is None or not window[0] or window[0][0] > last_seq + 1:
+                return None
+            seqs, frames = window
+            return [(seq, frames[seq]) for seq in seqs[bisect.bisect_right(seqs, last_seq):]]
+
+    def discard(self, room_id):
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+
+recent_messages = RecentMessages()
+
+
+def missed_messages(room_id, last_seq, limit):
+    """
+    Loads the messages after `last_seq` from the database, for when the window can't serve them.
+
+    Returns:
+        tuple: (frames oldest first, or None if more than `limit` were missed; the number missed).
+    """
+    messages = list(
+        Message.objects.filter(room_id=room_id, seq__gt=last_seq)
+        .select_related('user__profile')
+        .order_by('seq')[:limit + 1]
+    )
+    if len(messages) > limit:
+        current = RoomSequence.objects.filter(room_id=room_id).values_list('last_seq', flat=True).first()
+        return None, (current or 0) - last_seq
+    senders = {}
+    frames = []
+    for message in messages:
+        if message.user_id not in senders:
+            senders[message.user_id] = sender_info(message.user)
+        frames.append((message.seq, chat_frame(message, senders[message.user_id])))
+    return frames, len(frames)
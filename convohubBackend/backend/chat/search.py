@@ -0,0 +1,147 @@
+import html
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchVector
+from django.db import connection, connections
+from django.db.models import Q
+from .models import Message
+from .pagination import decode_cursor, encode_cursor
+from rooms.search import InvertedIndex, TOKEN_RE, tokenize, within_one_edit
+
+SEARCH_CONFIG = 'english'
+HIGHLIGHT_START, HIGHLIGHT_STOP = '<mark>', '</mark>'
+# ts_headline marks matches with control characters so the text can be escaped before adding tags
+_SENTINEL_START, _SENTINEL_STOP = '\x02', '\x03'
+
+message_index = InvertedIndex()
+
+
+def index_messages(messages):
+    """
+    Adds messages to the in-process index (no-op until the index has been built).
+    """
+    if not message_index.built:
+        return
+    for message in messages:
+        if message.id is not None:
+            _index(message)
+
+
+def _index(message):
+    # Room ids may arrive as URL strings; searches filter on ints. The timestamp orders results
+    # the way the cursor does, by (created_at, id)
+    message_index.add(message.id, [(message.content, 1.0)], meta=(int(message.room_id), message.created_at))
+
+
+def build_message_index():
+    message_index.clear()
+    for message in Message.objects.only('id', 'room_id', 'content', 'created_at').iterator():
+        _index(message)
+    message_index.built = True
+
+
+def uses_full_text_search():
+    return connection.vendor == 'postgresql'
+
+
+def highlight(text, query):
+    """
+    HTML-escapes `text` and wraps words matching a query term (exactly, by prefix or within one edit).
+    """
+    terms = tokenize(query)
+
+    def matches(word):
+        word = word.lower()
+        return any(
+            word == term or word.startswith(term) or (len(term) >= 4 and within_one_edit(term, word))
+            for term in terms
+        )
+
+    parts, last = [], 0
+    for match in TOKEN_RE.finditer(text):
+        if matches(match.group()):
+            parts.append(html.escape(text[last:match.start()]))
+            parts.append(f"{HIGHLIGHT_START}{html.escape(match.group())}{HIGHLIGHT_STOP}")
+            last = match.end()
+    parts.append(html.escape(text[last:]))
+    return ''.join(parts)
+
+
+def search_messages(user, query, before=None, limit=20):
+    """
+    Searches message content in the rooms `user` has joined, newest first.
+
+    On PostgreSQL this is a `@@` match against a GIN-indexed tsvector expression,
+    so cost tracks the number of matches rather than table size; elsewhere it
+    uses the in-process `message_index`. Either way Postgres/Python maintain the
+    index as messages are written.
+
+    Args:
+        user (User): The caller; results are limited to their joined rooms.
+        query (str): Free-text query.
+        before (str, optional): Cursor from a previous page.
+        limit (int): Page size.
+
+    Returns:
+        dict: `messages` (with `highlight` set) and `before_cursor` for the next page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    joined_room_ids = user.joined_rooms.values('id')
+    messages = Message.objects.select_related('room', 'user')
+    cursor_filter = Q()
+    if before:
+        created_at, message_id = decode_cursor(before)
+        cursor_filter = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id)
+
+    if uses_full_text_search():
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        rows = list(
+            messages.alias(document=SearchVector('content', config=SEARCH_CONFIG))
+            .filter(cursor_filter, room_id__in=joined_room_ids, document=search_query)
+            .annotate(highlight=SearchHeadline(
+                'content', search_query, config=SEARCH_CONFIG,
+                start_sel=_SENTINEL_START, stop_sel=_SENTINEL_STOP,
+            ))
+            .order_by('-created_at', '-id')[:limit + 1]
+        )
+        for message in rows:
+            message.highlight = html.escape(message.highlight).replace(
+                _SENTINEL_START, HIGHLIGHT_START).replace(_SENTINEL_STOP, HIGHLIGHT_STOP)
+    else:
+        if not message_index.built:
+            build_message_index()
+        room_ids = set(joined_room_ids.values_list('id', flat=True))
+        candidates = []
+        for doc_id, _ in message_index.search(query, match_all=True):
+            room_id, doc_created_at = message_index.get_meta(doc_id)
+            if room_id in room_ids and (not before or (doc_created_at, doc_id) < (created_at, message_id)):
+                candidates.append((doc_created_at, doc_id))
+        candidates.sort(reverse=True)
+        rows = list(
+            messages.filter(id__in=[doc_id for _, doc_id in candidates[:limit + 1]]).order_by('-created_at', '-id')
+        )
+        for message in rows:
+            message.highlight = highlight(message.content, query)
+
+    page = rows[:limit]
+    return {
+        'messages': page,
+        'before_cursor': encode_cursor(page[-1]) if len(rows) > limit else None,
+    }
+
+
+def ensure_full_text_index(using='default'):
+    """
+    Creates the GIN index over the tsvector expression used by `search_messages`.
+
+    The expression must match what SearchVector('content', config=SEARCH_CONFIG) compiles to.
+    """
+    conn = connections[using]
+    if conn.vendor != 'postgresql':
+        return
+    table = Message._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_content_fts ON {table} USING gin "
+            f"(to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(content, '')))"
+        )
@@ -0,0 +1,69 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from .pagination import parse_page_size
+from .search import search_messages
+from authentication.decorators import return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
+
+MAX_SEARCH_PAGE_SIZE = 50
+
+
+class SearchMessagesView(APIView):
+    """
+    Full-text search over messages in the rooms the user has joined.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            query = request.query_params.get('query', '').strip()
+            if not query:
+                return return_class({
+                    "data": {},
+                    "message": "Query parameter is required.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            try:
+                limit = min(parse_page_size(request.query_params.get('limit', 20)), MAX_SEARCH_PAGE_SIZE)
+                page = search_messages(request.user, query, before=request.query_params.get('before'), limit=limit)
+            except ValueError as e:
+                return return_class({
+                    "data": {},
+                    "message": str(e),
+                    "status": BAD_REQUEST_CODE
+                })
+
+            data = [
+                {
+                    "message_id": message.id,
+                    "content": message.content,
+                    "highlight": message.highlight,
+                    "room": {
+                        "room_id": message.room.id,
+                        "room_name": message.room.name
+                    },
+                    "user": {
+                        "user_id": message.user.id,
+                        "username": message.user.username
+                    },
+                    "created_at": message.created_at
+                }
+                for message in page['messages']
+            ]
+
+            return return_class({
+                "data": {
+                    "results": data,
+                    "before_cursor": page['before_cursor'],
+                },
+                "message": f"{len(data)} message(s) found.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+
+        except Exception as e:
+            return return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while searching messages.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
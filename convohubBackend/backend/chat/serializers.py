@@ -6,4 +6,4 @@ class MessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Message
-        fields = ['id', 'user', 'content', 'created_at']
+        fields = ['id', 'seq', 'user', 'content', 'created_at']
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Message
+from .search import index_messages
+from rooms.activity_feed import record_messages
+
+
+# No post_delete receiver on purpose: it would disable fast cascade deletes of a
+# room's messages. Stale index entries are harmless because hits are re-read from the DB.
+@receiver(post_save, sender=Message)
+def on_message_saved(sender, instance, created, **kwargs):
+    index_messages([instance])
+    if created:
+        record_messages([instance])
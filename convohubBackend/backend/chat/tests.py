@@ -1,3 +1,313 @@
-from django.test import TestCase
+import asyncio
+import os
+import tempfile
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rooms.models import Room
+from . import metrics, presence
+from .broker import Broker
+from .layers import BrokerChannelLayer
+from .message_buffer import write_messages
+from .models import Message, RoomPresence, RoomSequence
+from .pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, get_message_page, parse_page_size
+from .read_receipts import mark_read
+from .replay import RecentMessages, missed_messages
+from .search import message_index, search_messages
 
-# Create your tests here.
+
+class CursorTests(TestCase):
+    def test_round_trip(self):
+        created_at = timezone.now()
+        cursor = encode_cursor(Message(id=42, created_at=created_at))
+        self.assertEqual(decode_cursor(cursor), (created_at, 42))
+
+    def test_malformed_cursor_raises_value_error(self):
+        for cursor in ('', 'not-base64!', encode_cursor(Message(id=1, created_at=timezone.now()))[:-4]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class PageSizeTests(SimpleTestCase):
+    def test_parses_and_clamps(self):
+        self.assertEqual(parse_page_size('10'), 10)
+        self.assertEqual(parse_page_size(str(MAX_PAGE_SIZE + 1)), MAX_PAGE_SIZE)
+
+    def test_rejects_non_numeric_and_non_positive_values(self):
+        for value in ('abc', '1.5', '0', '-3'):
+            with self.assertRaisesMessage(ValueError, "'limit' must be a positive integer."):
+                parse_page_size(value)
+
+
+class MessagePageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+        start = timezone.now()
+        # Two pairs share a timestamp, so paging must fall back to the id
+        offsets = [0, 1, 1, 2, 3, 3, 4]
+        self.messages = [
+            Message.objects.create(
+                room=self.room, user=self.user, content=f'm{i}', created_at=start + timedelta(seconds=offset),
+            )
+            for i, offset in enumerate(offsets)
+        ]
+
+    def test_before_cursor_walks_history_newest_first(self):
+        seen, before = [], None
+        while True:
+            page = get_message_page(self.room.id, before=before, limit=2)
+            seen.extend(message.content for message in page['messages'])
+            before = page['before_cursor']
+            if before is None:
+                break
+        expected = [m.content for m in sorted(self.messages, key=lambda m: (m.created_at, m.id), reverse=True)]
+        self.assertEqual(seen, expected)
+
+    def test_after_cursor_returns_newer_messages(self):
+        oldest = get_message_page(self.room.id, limit=len(self.messages))['messages'][-1]
+        page = get_message_page(self.room.id, after=encode_cursor(oldest), limit=2)
+        self.assertEqual([m.content for m in page['messages']], ['m2', 'm1'])
+        self.assertIsNotNone(page['after_cursor'])
+        self.assertIsNotNone(page['before_cursor'])
+
+    def test_latest_page_has_no_newer_page(self):
+        page = get_message_page(self.room.id, limit=3)
+        self.assertEqual([m.content for m in page['messages']], ['m6', 'm5', 'm4'])
+        self.assertIsNone(page['after_cursor'])
+
+
+class SearchFallbackTests(TestCase):
+    def setUp(self):
+        message_index.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+        start = timezone.now()
+        # Saved out of order, so ids and timestamps disagree
+        for offset in (3, 1, 4, 0, 2):
+            Message.objects.create(
+                room=self.room, user=self.user, content=f'exam {offset}', created_at=start + timedelta(seconds=offset),
+            )
+
+    def tearDown(self):
+        message_index.clear()
+
+    def test_pages_follow_the_cursor_order(self):
+        seen, before = [], None
+        while True:
+            page = search_messages(self.user, 'exam', before=before, limit=2)
+            seen.extend(message.content for message in page['messages'])
+            before = page['before_cursor']
+            if before is None:
+                break
+        self.assertEqual(seen, [f'exam {offset}' for offset in (4, 3, 2, 1, 0)])
+
+
+class RoomSequenceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+
+    def test_allocates_increasing_numbers_per_room(self):
+        other = Room.objects.create(name='Other', host=self.user)
+        self.assertEqual([RoomSequence.allocate(self.room.id) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(RoomSequence.allocate(other.id), 1)
+
+    def test_saved_messages_are_numbered(self):
+        first = Message.objects.create(room=self.room, user=self.user, content='a')
+        second = Message.objects.create(room=self.room, user=self.user, content='b')
+        self.assertEqual((first.seq, second.seq), (1, 2))
+
+
+class RoomSequenceMissingRoomTests(TransactionTestCase):
+    # SQLite checks foreign keys when the outermost transaction commits, which TestCase never does
+
+    def test_missing_room_gets_none(self):
+        self.assertIsNone(RoomSequence.allocate(1000))
+
+
+class WriteMessagesTests(TransactionTestCase):
+    # Foreign keys are only checked on commit on SQLite, so the inserts have to really commit
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+
+    def test_bad_rows_only_lose_themselves(self):
+        metrics.lost_messages.clear()
+        Message.objects.create(room=self.room, user=self.user, content='saved', seq=1)
+        batch = [
+            Message(id=100, seq=2, room_id=str(self.room.id), user=self.user, content='ok'),
+            Message(id=101, seq=1, room=self.room, user=self.user, content='seq taken'),
+            Message(id=102, seq=3, room=self.room, user_id=1000, content='no user'),
+            Message(id=103, seq=1, room_id=1000, user=self.user, content='no room'),
+        ]
+        with self.assertLogs('convohub.chat', 'ERROR'):
+            write_messages(batch)
+        self.assertEqual(list(Message.objects.order_by('id').values_list('content', flat=True)), ['saved', 'ok'])
+        lost = {dict(labels)['reason']: value for _, labels, value in metrics.lost_messages.samples()}
+        self.assertEqual(lost, {'missing_room': 1, 'missing_user': 1, 'error': 1})
+
+
+@override_settings(CHAT_REPLAY={'WINDOW_SIZE': 3, 'MAX_ROOMS': 2, 'REPLAY_LIMIT': 50})
+class RecentMessagesTests(SimpleTestCase):
+    def test_returns_frames_after_last_seq_in_order(self):
+        window = RecentMessages()
+        for seq in (1, 3, 2):
+            window.add(1, seq, f'frame{seq}')
+        self.assertEqual(window.since(1, 1), [(2, 'frame2'), (3, 'frame3')])
+        self.assertEqual(window.since(1, 3), [])
+
+    def test_duplicates_are_recorded_once(self):
+        window = RecentMessages()
+        window.add(1, 1, 'first')
+        window.add(1, 1, 'again')
+        self.assertEqual(window.since(1, 0), [(1, 'first')])
+
+    def test_window_that_does_not_reach_back_returns_none(self):
+        window = RecentMessages()
+        for seq in range(1, 6):
+            window.add(1, seq, f'frame{seq}')
+        # Only seqs 3-5 are kept
+        self.assertIsNone(window.since(1, 1))
+        self.assertEqual([seq for seq, _ in window.since(1, 2)], [3, 4, 5])
+        self.assertIsNone(window.since(2, 0))
+
+    def test_least_recently_used_room_is_evicted(self):
+        window = RecentMessages()
+        window.add(1, 1, 'a')
+        window.add(2, 1, 'b')
+        window.add(3, 1, 'c')
+        self.assertIsNone(window.since(1, 0))
+        self.assertEqual(window.since(3, 0), [(1, 'c')])
+
+
+class MissedMessagesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+        for i in range(5):
+            Message.objects.create(room=self.room, user=self.user, content=f'm{i}')
+
+    def test_loads_frames_after_last_seq(self):
+        frames, missed = missed_messages(self.room.id, 3, limit=10)
+        self.assertEqual(missed, 2)
+        self.assertEqual([seq for seq, _ in frames], [4, 5])
+        self.assertEqual(frames[0][1]['message'], 'm3')
+        self.assertEqual(frames[0][1]['user']['username'], 'alice')
+
+    def test_too_many_missed_returns_the_count_only(self):
+        self.assertEqual(missed_messages(self.room.id, 0, limit=3), (None, 5))
+
+
+class MarkReadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.reader = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+        for i in range(5):
+            Message.objects.create(room=self.room, user=self.user, content=f'm{i}')
+
+    def test_pointer_only_moves_forward(self):
+        self.assertEqual(mark_read(self.reader.id, self.room.id, 3), 3)
+        self.assertEqual(mark_read(self.reader.id, self.room.id, 1), 3)
+        self.assertEqual(mark_read(self.reader.id, self.room.id, 4), 4)
+
+    def test_pointer_is_clamped_to_the_latest_message(self):
+        self.assertEqual(mark_read(self.reader.id, self.room.id, 99), 5)
+        self.assertEqual(mark_read(self.reader.id, self.room.id, -1), 5)
+
+    def test_defaults_to_the_latest_message(self):
+        self.assertEqual(mark_read(self.reader.id, self.room.id), 5)
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        presence._last_prune.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.room = Room.objects.create(name='General', host=self.user)
+
+    def test_only_the_first_socket_brings_the_user_online(self):
+        self.assertEqual(presence.join(self.room.id, self.user, 'a'), (True, []))
+        self.assertEqual(presence.join(self.room.id, self.user, 'b'), (False, []))
+        self.assertEqual(presence.leave(self.room.id, self.user.id, 'a'), (False, []))
+        self.assertEqual(presence.leave(self.room.id, self.user.id, 'b'), (True, []))
+
+    def test_heartbeat_of_a_live_socket_is_one_update(self):
+        presence.join(self.room.id, self.user, 'a')
+        with self.assertNumQueries(1):
+            self.assertEqual(presence.heartbeat(self.room.id, self.user, 'a'), (False, []))
+
+    @override_settings(CHAT_PRESENCE={'HEARTBEAT_INTERVAL': 0, 'TTL': 90})
+    def test_expired_socket_is_pruned_and_rejoins_on_heartbeat(self):
+        presence.join(self.room.id, self.user, 'a')
+        RoomPresence.objects.update(expires_at=timezone.now())
+        other = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.assertEqual(presence.join(self.room.id, other, 'b'), (True, [self.user.id]))
+        self.assertEqual(presence.heartbeat(self.room.id, self.user, 'a'), (True, []))
+
+
+class BrokerReconnectTests(SimpleTestCase):
+    """
+    Runs a broker on a unix socket, restarts it under a connected layer and checks delivery.
+    """
+
+    async def start_broker(self, path):
+        broker, connections = Broker(), []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            try:
+                await broker.handle(reader, writer)
+            except asyncio.CancelledError:
+                # Still reading when the test's loop shuts down
+                pass
+
+        server = await asyncio.start_unix_server(handle, path=path)
+        return server, connections
+
+    async def stop_broker(self, server, connections):
+        server.close()
+        for writer in connections:
+            writer.close()
+        await server.wait_closed()
+
+    async def receive(self, layer, channel):
+        return await asyncio.wait_for(layer.receive(channel), timeout=5)
+
+    async def subscribe(self, layer, channel):
+        # As a consumer's receive loop does on start; the broker only routes subscribed channels
+        receiving = asyncio.ensure_future(layer.receive(channel))
+        await asyncio.sleep(0.05)
+        receiving.cancel()
+
+    async def test_memberships_and_queued_sends_survive_a_broker_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), 'broker.sock')
+        server, connections = await self.start_broker(path)
+        layer = BrokerChannelLayer(hosts=[f'unix://{path}'])
+        try:
+            channel = await layer.new_channel()
+            await self.subscribe(layer, channel)
+            await layer.group_add('room_1', channel)
+            await layer.group_send('room_1', {'type': 'chat', 'n': 1})
+            self.assertEqual((await self.receive(layer, channel))['n'], 1)
+
+            await self.stop_broker(server, connections)
+            os.unlink(path)
+            state = layer._loop_state()
+            while state.connections:
+                await asyncio.sleep(0.01)
+            # Sent while the broker is down: queued, not dropped
+            await layer.group_send('room_1', {'type': 'chat', 'n': 2})
+
+            server, connections = await self.start_broker(path)
+            self.assertEqual((await self.receive(layer, channel))['n'], 2)
+            await layer.group_send('room_1', {'type': 'chat', 'n': 3})
+            self.assertEqual((await self.receive(layer, channel))['n'], 3)
+
+            await layer.group_discard('room_1', channel)
+            self.assertEqual(layer._loop_state().groups, {})
+        finally:
+            await layer.close()
+            await self.stop_broker(server, connections)
@@ -0,0 +1,6 @@
+from django.urls import path
+from .search_messages import SearchMessagesView
+
+urlpatterns = [
+    path('search/', SearchMessagesView.as_view(), name='search-messages'),
+]
@@ -0,0 +1,72 @@
+from authentication.revocation import revocation_filter
+from authentication.user_cache import user_cache
+from .db_pool import pool_stats
+from .registry import registry
+
+
+@registry.register_collector
+def user_cache_metrics():
+    stats = user_cache.stats()
+    return [
+        ('convohub_user_cache_size', 'gauge', 'Users held in the JWT user cache.', [({}, stats['size'])]),
+        ('convohub_user_cache_hits_total', 'counter', 'JWT user cache hits.', [({}, stats['hits'])]),
+        ('convohub_user_cache_misses_total', 'counter', 'JWT user cache misses.', [({}, stats['misses'])]),
+        ('convohub_user_cache_evictions_total', 'counter', 'JWT user cache evictions.', [({}, stats['evictions'])]),
+        ('convohub_user_cache_invalidations_total', 'counter', 'JWT user cache invalidations.',
+         [({}, stats['invalidations'])]),
+    ]
+
+
+
+@registry.register_collector
+def token_revocation_metrics():
+    stats = revocation_filter.stats()
+    return [
+        ('convohub_token_revocations', 'gauge', 'Users with revoked access tokens held in the revocation filter.',
+         [({}, stats['size'])]),
+        ('convohub_token_revocation_generation', 'counter', 'Changes to the revocation filter.',
+         [({}, stats['generation'])]),
+        ('convohub_token_revocation_checks_total', 'counter', 'Access tokens checked against the revocation filter.',
+         [({}, stats['checks'])]),
+        ('convohub_token_revocation_rejections_total', 'counter', 'Access tokens rejected as revoked.',
+         [({}, stats['rejections'])]),
+        ('convohub_token_revocation_refreshes_total', 'counter', 'Revocation filter re-syncs from the database.',
+         [({}, stats['refreshes'])]),
+    ]
+
+
+POOL_METRICS = (
+    # (metric, type, help, psycopg_pool stat, scale)
+    ('convohub_db_pool_min_size', 'gauge', 'Configured minimum pool size.', 'pool_min', 1),
+    ('convohub_db_pool_max_size', 'gauge', 'Configured maximum pool size.', 'pool_max', 1),
+    ('convohub_db_pool_size', 'gauge', 'Connections currently held by the pool, lent or idle.', 'pool_size', 1),
+    ('convohub_db_pool_available', 'gauge', 'Idle connections ready to be lent.', 'pool_available', 1),
+    ('convohub_db_pool_requests_waiting', 'gauge', 'Callers waiting for a connection.', 'requests_waiting', 1),
+    ('convohub_db_pool_requests_total', 'counter', 'Connections requested from the pool.', 'requests_num', 1),
+    ('convohub_db_pool_requests_queued_total', 'counter', 'Requests that had to wait for a connection.',
+     'requests_queued', 1),
+    ('convohub_db_pool_requests_wait_seconds_total', 'counter', 'Time spent waiting for a connection.',
+     'requests_wait_ms', 0.001),
+    ('convohub_db_pool_requests_errors_total', 'counter', 'Requests that timed out or failed.', 'requests_errors', 1),
+    ('convohub_db_pool_usage_seconds_total', 'counter', 'Time connections spent lent out.', 'usage_ms', 0.001),
+    ('convohub_db_pool_connections_total', 'counter', 'Server connections opened by the pool.', 'connections_num', 1),
+    ('convohub_db_pool_connections_seconds_total', 'counter', 'Time spent opening server connections.',
+     'connections_ms', 0.001),
+    ('convohub_db_pool_connections_errors_total', 'counter', 'Failed connection attempts.', 'connections_errors', 1),
+    ('convohub_db_pool_connections_lost_total', 'counter', 'Connections found broken by a health check.',
+     'connections_lost', 1),
+    ('convohub_db_pool_returns_bad_total', 'counter', 'Connections returned to the pool in a bad state.',
+     'returns_bad', 1),
+)
+
+
+@registry.register_collector
+def database_pool_metrics():
+    stats = pool_stats()
+    if not stats:
+        return []
+    return [
+        (name, kind, documentation,
+         [({'pool': alias}, pool.get(stat, 0) * scale) for alias, pool in stats.items()])
+        for name, kind, documentation, stat, scale in POOL_METRICS
+    ]
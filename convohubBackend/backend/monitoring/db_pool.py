@@ -0,0 +1,19 @@
+from django.db import connections
+
+
+def pool_stats():
+    """
+    Returns psycopg_pool statistics for every database alias that uses connection pooling.
+
+    Returns:
+        dict: {alias: stats}. Gauges (pool_size, pool_available, requests_waiting, ...)
+        are current values; the rest are totals since the pool was created.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql' or not connection.settings_dict['OPTIONS'].get('pool'):
+            continue
+        pool = connection.pool
+        stats[alias] = {'name': pool.name, 'closed': pool.closed, **pool.get_stats()}
+    return stats
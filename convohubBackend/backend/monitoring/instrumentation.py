@@ -0,0 +1,174 @@
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+DEFAULT_INSTRUMENTATION_SETTINGS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_LOG_SIZE': 20,
+    'MAX_SQL_PER_REQUEST': 100,
+    'METRICS_TOKEN': None,
+    'LOOP_LAG_INTERVAL': 0.5,
+}
+
+logger = logging.getLogger('convohub.slow_requests')
+
+
+def get_instrumentation_settings():
+    return {**DEFAULT_INSTRUMENTATION_SETTINGS, **getattr(settings, 'INSTRUMENTATION', {})}
+
+
+class RequestStats:
+    """
+    Work done on behalf of one HTTP request or WebSocket connection.
+
+    Held in a context variable, so queries run through sync_to_async and
+    tasks spawned by a consumer are attributed to the right request.
+    """
+
+    def __init__(self, max_sql):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.sql = []
+        self.max_sql = max_sql
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if len(self.sql) < self.max_sql:
+            self.sql.append((sql, duration))
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current = contextvars.ContextVar('convohub_request_stats', default=None)
+
+
+def begin():
+    """
+    Starts collecting stats for the current context. Returns (stats, token) for `end`.
+    """
+    stats = RequestStats(get_instrumentation_settings()['MAX_SQL_PER_REQUEST'])
+    return stats, _current.set(stats)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - started)
+
+
+def _wrap_connection(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _wrap_connection(connection)
+
+
+_original_data = BaseSerializer.data
+
+
+def _timed_data(self):
+    stats = _current.get()
+    if stats is None or stats.serializer_depth:
+        return _original_data.fget(self)
+    stats.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_data.fget(self)
+    finally:
+        stats.serializer_depth -= 1
+        stats.serializer_time += time.perf_counter() - started
+
+
+def install():
+    """
+    Hooks query and serializer timing in. Idempotent; a no-op when INSTRUMENTATION['ENABLED'] is False.
+
+    Serializer time is measured around `BaseSerializer.data`, which every
+    Serializer and ListSerializer goes through, so views need no changes.
+    """
+    if not get_instrumentation_settings()['ENABLED']:
+        return
+    connection_created.connect(_on_connection_created, dispatch_uid='monitoring_query_timing')
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(connection)
+    BaseSerializer.data = property(_timed_data)
+
+
+class SlowRequestLog:
+    """
+    Keeps the `size` slowest requests over SLOW_REQUEST_MS, with their SQL.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, duration, entry):
+        size = get_instrumentation_settings()['SLOW_LOG_SIZE']
+        item = (duration, next(self._counter), entry)
+        with self._lock:
+            if len(self._heap) < size:
+                heapq.heappush(self._heap, item)
+            elif duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def entries(self):
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+
+slow_requests = SlowRequestLog()
+
+
+def record_slow_request(stats, **details):
+    """
+    Logs a request that exceeded SLOW_REQUEST_MS and adds it to `slow_requests`.
+    """
+    duration = stats.elapsed
+    if duration * 1000 < get_instrumentation_settings()['SLOW_REQUEST_MS']:
+        return
+    entry = {
+        **details,
+        'duration_ms': round(duration * 1000, 3),
+        'queries': stats.queries,
+        'db_ms': round(stats.db_time * 1000, 3),
+        'serializer_ms': round(stats.serializer_time * 1000, 3),
+        'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sql': [{'sql': sql, 'ms': round(seconds * 1000, 3)} for sql, seconds in stats.sql],
+    }
+    slow_requests.add(duration, entry)
+    logger.warning(
+        "Slow request %s %s: %.1f ms, %d queries (%.1f ms)",
+        details.get('method'), details.get('path'), entry['duration_ms'], stats.queries, entry['db_ms'],
+    )
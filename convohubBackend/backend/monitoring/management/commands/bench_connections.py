@@ -0,0 +1,113 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from chat.benchmarking import benchmark_database, create_users, environment, latency_ms, write_report
+from chat.models import Message
+from rooms.models import Room
+
+MODES = ('new_connection', 'persistent', 'pooled')
+
+
+def pooling_available():
+    if connection.vendor != 'postgresql':
+        return False, "connection pooling needs PostgreSQL"
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False, "psycopg_pool is not installed (pip install psycopg[pool])"
+    return True, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures REST request latency with a new database connection per request, persistent "
+        "connections and a connection pool. Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help="Requests per mode")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--pool-size', type=int, default=4, help="max_size of the benchmark pool")
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        original = {'OPTIONS': dict(settings_dict['OPTIONS']), 'CONN_MAX_AGE': settings_dict['CONN_MAX_AGE']}
+        with benchmark_database(keepdb=options['keepdb']):
+            user = create_users(1, prefix='connbench')[0]
+            room = Room.objects.create(name='Benchmark room', host=user)
+            Message.objects.bulk_create([Message(room=room, user=user, content=f'message {i}') for i in range(50)])
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            path = f'/rooms/{room.id}/messages/'
+            try:
+                results = {mode: self.measure(mode, client, path, options) for mode in MODES}
+            finally:
+                self.configure(None, options)
+                settings_dict.update(original)
+
+        report = {
+            'benchmark': 'database_connections',
+            'environment': environment(),
+            'path': path,
+            'iterations': options['iterations'],
+            'modes': results,
+        }
+        if connection.vendor == 'sqlite':
+            report['note'] = "SQLite test databases live in memory on one connection; run against PostgreSQL."
+        write_report(self, report, options['output'])
+
+    def configure(self, mode, options):
+        """
+        Closes the current connection (and pool) and reconfigures the default database for `mode`.
+        """
+        connection.close()
+        if connection.vendor == 'postgresql' and connection.settings_dict['OPTIONS'].get('pool'):
+            connection.close_pool()
+        db_options = {key: value for key, value in connection.settings_dict['OPTIONS'].items() if key != 'pool'}
+        if mode == 'pooled':
+            db_options['pool'] = {'min_size': 1, 'max_size': options['pool_size']}
+        connection.settings_dict['OPTIONS'] = db_options
+        connection.settings_dict['CONN_MAX_AGE'] = None if mode == 'persistent' else 0
+
+    def measure(self, mode, client, path, options):
+        if mode == 'pooled':
+            available, reason = pooling_available()
+            if not available:
+                return {'skipped': reason}
+        self.configure(mode, options)
+
+        connects = 0
+
+        def count_connect(**kwargs):
+            nonlocal connects
+            connects += 1
+
+        for _ in range(options['warmup']):
+            client.get(path, {'limit': 20})
+        connection_created.connect(count_connect)
+        pool_before = connection.pool.get_stats().get('connections_num', 0) if mode == 'pooled' else 0
+        durations = []
+        try:
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                response = client.get(path, {'limit': 20})
+                durations.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+        finally:
+            connection_created.disconnect(count_connect)
+
+        if mode == 'pooled':
+            # connection_created fires on every loan; only the pool knows how many were really opened
+            opened = connection.pool.get_stats().get('connections_num', 0) - pool_before
+        else:
+            opened = connects
+        return {
+            'latency_ms': latency_ms(durations),
+            'server_connections_opened': opened,
+            'connections_per_request': round(opened / options['iterations'], 3),
+        }
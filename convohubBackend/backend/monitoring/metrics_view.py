@@ -0,0 +1,71 @@
+import hmac
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from authentication.decorators import return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, FORBIDDEN_CODE
+from .db_pool import pool_stats
+from .instrumentation import get_instrumentation_settings, slow_requests
+from .registry import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def has_metrics_access(request):
+    """
+    Superusers, or scrapers sending the configured METRICS_TOKEN in the X-Metrics-Token header.
+    """
+    expected = get_instrumentation_settings()['METRICS_TOKEN']
+    supplied = request.headers.get('X-Metrics-Token')
+    if expected and supplied:
+        return hmac.compare_digest(expected, supplied)
+    return request.user.is_authenticated and request.user.is_superuser
+
+
+class MetricsView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        if not has_metrics_access(request):
+            return return_class({
+                "data": {},
+                "message": "You do not have permission to access this resource.",
+                "status": FORBIDDEN_CODE
+            })
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class SlowRequestsView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        if not has_metrics_access(request):
+            return return_class({
+                "data": {},
+                "message": "You do not have permission to access this resource.",
+                "status": FORBIDDEN_CODE
+            })
+        return return_class({
+            "data": slow_requests.entries(),
+            "message": "Slow requests retrieved successfully.",
+            "status": SUCCESS_RESPONSE_CODE
+        })
+
+
+class DatabasePoolView(APIView):
+    """
+    Connection pool statistics per database alias (empty when pooling is off).
+    """
+    permission_classes = []
+
+    def get(self, request):
+        if not has_metrics_access(request):
+            return return_class({
+                "data": {},
+                "message": "You do not have permission to access this resource.",
+                "status": FORBIDDEN_CODE
+            })
+        return return_class({
+            "data": pool_stats(),
+            "message": "Database pool statistics retrieved successfully.",
+            "status": SUCCESS_RESPONSE_CODE
+        })
@@ -0,0 +1,158 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .instrumentation import begin, end, get_instrumentation_settings, record_slow_request
+from .registry import registry
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+http_requests = registry.counter(
+    'convohub_http_requests_total', 'HTTP requests by view, method and status.', ('view', 'method', 'status'))
+http_duration = registry.histogram(
+    'convohub_http_request_duration_seconds', 'HTTP request latency.', ('view', 'method'))
+http_queries = registry.histogram(
+    'convohub_http_db_queries', 'Database queries per HTTP request.', ('view',), buckets=QUERY_BUCKETS)
+http_db_time = registry.histogram(
+    'convohub_http_db_time_seconds', 'Database time per HTTP request.', ('view',))
+http_serializer_time = registry.histogram(
+    'convohub_http_serializer_time_seconds', 'Serializer time per HTTP request.', ('view',))
+http_response_size = registry.histogram(
+    'convohub_http_response_size_bytes', 'HTTP response body size.', ('view',), buckets=SIZE_BUCKETS)
+
+ws_connections = registry.counter(
+    'convohub_websocket_connections_total', 'WebSocket connections accepted.')
+ws_rejected = registry.counter(
+    'convohub_websocket_rejected_total', 'WebSocket handshakes closed before being accepted.')
+ws_active = registry.gauge(
+    'convohub_websocket_connections_active', 'Open WebSocket connections.')
+ws_duration = registry.histogram(
+    'convohub_websocket_connection_duration_seconds', 'WebSocket connection lifetime.',
+    buckets=(1, 10, 60, 300, 900, 3600, 14400))
+ws_frames = registry.counter(
+    'convohub_websocket_frames_total', 'WebSocket frames by direction.', ('direction',))
+ws_bytes = registry.counter(
+    'convohub_websocket_bytes_total', 'WebSocket payload bytes by direction.', ('direction',))
+ws_queries = registry.counter(
+    'convohub_websocket_db_queries_total', 'Database queries run by WebSocket consumers.')
+ws_db_time = registry.counter(
+    'convohub_websocket_db_time_seconds_total', 'Database time spent by WebSocket consumers.')
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None else 'unmatched'
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count/time, serializer time and response size per view.
+
+    Keep it first in MIDDLEWARE so it measures the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_instrumentation_settings()['ENABLED']
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats, token = begin()
+        try:
+            response = self.get_response(request)
+            self.record(request, response, stats)
+        finally:
+            end(token)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats, token = begin()
+        try:
+            response = await self.get_response(request)
+            self.record(request, response, stats)
+        finally:
+            end(token)
+        return response
+
+    def record(self, request, response, stats):
+        duration = stats.elapsed
+        view = _view_label(request)
+        size = None if response.streaming else len(response.content)
+        http_requests.inc(view=view, method=request.method, status=response.status_code)
+        http_duration.observe(duration, view=view, method=request.method)
+        http_queries.observe(stats.queries, view=view)
+        http_db_time.observe(stats.db_time, view=view)
+        http_serializer_time.observe(stats.serializer_time, view=view)
+        if size is not None:
+            http_response_size.observe(size, view=view)
+        record_slow_request(
+            stats, kind='http', view=view, method=request.method, path=request.get_full_path(),
+            status=response.status_code, response_bytes=size,
+        )
+
+
+def _payload_size(event):
+    if event.get('bytes') is not None:
+        return len(event['bytes'])
+    if event.get('text') is not None:
+        return len(event['text'].encode())
+    return 0
+
+
+class WebSocketMetricsMiddleware:
+    """
+    ASGI middleware counting WebSocket connections, frames, bytes and consumer DB work.
+
+    Wrap the websocket application with it in asgi.py.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'websocket' or not get_instrumentation_settings()['ENABLED']:
+            return await self.inner(scope, receive, send)
+
+        stats, token = begin()
+        accepted = False
+        started = time.monotonic()
+
+        async def counted_receive():
+            event = await receive()
+            if event['type'] == 'websocket.receive':
+                ws_frames.inc(direction='in')
+                ws_bytes.inc(_payload_size(event), direction='in')
+            return event
+
+        async def counted_send(event):
+            nonlocal accepted
+            if event['type'] == 'websocket.accept' and not accepted:
+                accepted = True
+                ws_connections.inc()
+                ws_active.inc()
+            elif event['type'] == 'websocket.send':
+                ws_frames.inc(direction='out')
+                ws_bytes.inc(_payload_size(event), direction='out')
+            elif event['type'] == 'websocket.close' and not accepted:
+                ws_rejected.inc()
+            await send(event)
+
+        try:
+            return await self.inner(scope, counted_receive, counted_send)
+        finally:
+            if accepted:
+                ws_active.dec()
+                ws_duration.observe(time.monotonic() - started)
+            ws_queries.inc(stats.queries)
+            ws_db_time.inc(stats.db_time)
+            end(token)
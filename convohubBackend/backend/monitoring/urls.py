@@ -0,0 +1,8 @@
+from django.urls import path
+from .metrics_view import DatabasePoolView, MetricsView, SlowRequestsView
+
+urlpatterns = [
+    path('', MetricsView.as_view(), name='metrics'),
+    path('slow/', SlowRequestsView.as_view(), name='slow-requests'),
+    path('db-pool/', DatabasePoolView.as_view(), name='db-pool'),
+]
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import Teacher,Course,TeacherReview
+from .models import Teacher,Course,TeacherReview,TeacherRating,TeacherCourseRating
 # Register your models here.
 
 admin.site.register(Course)
 admin.site.register(Teacher)
-admin.site.register(TeacherReview)
\ No newline at end of file
+admin.site.register(TeacherReview)
+admin.site.register(TeacherRating)
+admin.site.register(TeacherCourseRating)
\ No newline at end of file
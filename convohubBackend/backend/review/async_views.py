@@ -0,0 +1,37 @@
+from .models import Teacher
+from .serializers import TeacherSerializer
+from .catalog_cache import acatalog_response
+from authentication.async_views import AsyncReadView
+from authentication.decorators import json_return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, INTERNAL_SERVER_ERROR_CODE
+
+
+class AsyncTeacherListView(AsyncReadView):
+    """
+    Async version of TeacherViewSet.list; creating teachers goes to TeacherViewSet.
+
+    A catalog cache hit (or 304) costs one primary-key read of the catalog version.
+    """
+
+    async def get(self, request):
+        try:
+            teachers = Teacher.objects.prefetch_related('courses')
+            if request.GET.get('include_ratings', '').lower() in ('1', 'true', 'yes'):
+                # Ratings change with every review, so this variant is not cached
+                rows = [teacher async for teacher in teachers.select_related('rating')]
+                return json_return_class({
+                    "data": TeacherSerializer(rows, many=True, context={'include_ratings': True}).data,
+                    "message": "Teacher(s) retrieved successfully.",
+                    "status": SUCCESS_RESPONSE_CODE
+                })
+
+            async def build():
+                return TeacherSerializer([teacher async for teacher in teachers], many=True).data
+
+            return await acatalog_response(request, 'teachers', build, "Teacher(s) retrieved successfully.")
+        except Exception as e:
+            return json_return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while retrieving teachers.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
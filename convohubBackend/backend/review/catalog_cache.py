@@ -0,0 +1,133 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse
+from rest_framework.response import Response
+from authentication.decorators import json_return_class, return_class
+from authentication.constants import NOT_MODIFIED_CODE, SUCCESS_RESPONSE_CODE
+from .models import CatalogVersion
+
+DEFAULT_CATALOG_CACHE_SETTINGS = {
+    'TTL': 3600,
+}
+
+VERSION_ID = 1
+
+
+def get_catalog_settings():
+    return {**DEFAULT_CATALOG_CACHE_SETTINGS, **getattr(settings, 'CATALOG_CACHE', {})}
+
+
+def _versions():
+    return CatalogVersion.objects.filter(pk=VERSION_ID).values_list('version', flat=True)
+
+
+def _version():
+    # One primary-key read per request; the row is shared by every process, unlike the cache
+    return _versions().first() or 0
+
+
+def _bump_version():
+    if not CatalogVersion.objects.filter(pk=VERSION_ID).update(version=F('version') + 1):
+        CatalogVersion.objects.get_or_create(pk=VERSION_ID)
+        CatalogVersion.objects.filter(pk=VERSION_ID).update(version=F('version') + 1)
+
+
+def invalidate_catalog():
+    """
+    Retires every cached catalog response, in every process.
+
+    Deferred until the surrounding transaction commits, so a concurrent reader
+    cannot cache pre-commit data under the new version.
+    """
+    transaction.on_commit(_bump_version)
+
+
+def get_catalog(name, build):
+    """
+    Returns a cached catalog payload, building it on a miss.
+
+    Args:
+        name (str): Catalog name, e.g. "teachers".
+        build (callable): Returns the serialized data for the catalog.
+
+    Returns:
+        tuple: (data, etag). The ETag is a hash of the data, so it is stable across processes.
+    """
+    key = f'review:catalog:{name}:v{_version()}'
+    entry = cache.get(key)
+    if entry is None:
+        entry = _entry(name, build())
+        cache.set(key, entry, timeout=get_catalog_settings()['TTL'])
+    return entry
+
+
+async def aget_catalog(name, abuild):
+    """
+    `get_catalog` for async views; `abuild` is a coroutine function returning the data.
+    """
+    version = await _versions().afirst() or 0
+    key = f'review:catalog:{name}:v{version}'
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = _entry(name, await abuild())
+        await cache.aset(key, entry, timeout=get_catalog_settings()['TTL'])
+    return entry
+
+
+def _entry(name, data):
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    return data, f'"{name}-{digest}"'
+
+
+def not_modified(request, etag):
+    """
+    True if the request's If-None-Match already names `etag`.
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def catalog_response(request, name, build, message):
+    """
+    Serves a catalog through the cache, answering 304 when the client's copy is current.
+    """
+    data, etag = get_catalog(name, build)
+    if not_modified(request, etag):
+        response = Response(status=NOT_MODIFIED_CODE)
+    else:
+        response = return_class({
+            "data": data,
+            "message": message,
+            "status": SUCCESS_RESPONSE_CODE
+        })
+    return _with_validators(response, etag)
+
+
+async def acatalog_response(request, name, abuild, message):
+    """
+    `catalog_response` for async views.
+    """
+    data, etag = await aget_catalog(name, abuild)
+    if not_modified(request, etag):
+        response = HttpResponse(status=NOT_MODIFIED_CODE)
+    else:
+        response = json_return_class({
+            "data": data,
+            "message": message,
+            "status": SUCCESS_RESPONSE_CODE
+        })
+    return _with_validators(response, etag)
+
+
+def _with_validators(response, etag):
+    response['ETag'] = etag
+    # Authenticated data: clients may keep it but must revalidate before reuse
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Course
 from .serializers import CourseSerializer
+from .catalog_cache import catalog_response
 from authentication.decorators import return_class
 from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, FORBIDDEN_CODE, INTERNAL_SERVER_ERROR_CODE
 
@@ -27,9 +28,11 @@ class CourseAPIView(APIView):
                 serializer = CourseSerializer(course)
                 data = serializer.data
             else:
-                courses = Course.objects.all()
-                serializer = CourseSerializer(courses, many=True)
-                data = serializer.data
+                return catalog_response(
+                    request, 'courses',
+                    lambda: CourseSerializer(Course.objects.all(), many=True).data,
+                    "Course(s) retrieved successfully."
+                )
 
             return return_class({
                 "data": data,
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from review.models import Teacher
+from review.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = "Recomputes every teacher and teacher/course rating aggregate from the stored reviews."
+
+    def handle(self, *args, **options):
+        teacher_ids = list(Teacher.objects.values_list('id', flat=True))
+        for teacher_id in teacher_ids:
+            with transaction.atomic():
+                recompute_ratings(teacher_id)
+        self.stdout.write(f"Rebuilt ratings for {len(teacher_ids)} teacher(s).")
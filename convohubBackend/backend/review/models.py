@@ -29,4 +29,67 @@ class TeacherReview(models.Model):
         return f"Review for {self.teacher.name} by {self.user.username} in {self.course.name}"
 
     class Meta:
-        unique_together = ("user", "teacher", "course")
\ No newline at end of file
+        unique_together = ("user", "teacher", "course")
+
+
+def empty_histogram():
+    return {str(score): 0 for score in range(1, 6)}
+
+
+class RatingAggregate(models.Model):
+    """
+    Running totals of review scores, kept in step with TeacherReview rows by review.ratings.
+    """
+    review_count = models.PositiveIntegerField(default=0)
+    teaching_style_sum = models.FloatField(default=0)
+    marking_sum = models.FloatField(default=0)
+    teaching_style_histogram = models.JSONField(default=empty_histogram)
+    marking_histogram = models.JSONField(default=empty_histogram)
+
+    class Meta:
+        abstract = True
+
+    def as_dict(self):
+        count = self.review_count
+        return {
+            "review_count": count,
+            "teaching_style": {
+                "mean": round(self.teaching_style_sum / count, 2) if count else None,
+                "sum": self.teaching_style_sum,
+                "histogram": self.teaching_style_histogram,
+            },
+            "marking": {
+                "mean": round(self.marking_sum / count, 2) if count else None,
+                "sum": self.marking_sum,
+                "histogram": self.marking_histogram,
+            },
+        }
+
+
+class TeacherRating(RatingAggregate):
+    teacher = models.OneToOneField(Teacher, on_delete=models.CASCADE, related_name="rating")
+
+    def __str__(self):
+        return f"Rating for {self.teacher.name}"
+
+
+class TeacherCourseRating(RatingAggregate):
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name="course_ratings")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="teacher_ratings")
+
+    def __str__(self):
+        return f"Rating for {self.teacher.name} in {self.course.name}"
+
+    class Meta:
+        unique_together = ("teacher", "course")
+
+
+class CatalogVersion(models.Model):
+    """
+    Single row counting catalog changes; cached catalog responses are keyed by it, so a
+    change made through any process retires them everywhere.
+    """
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
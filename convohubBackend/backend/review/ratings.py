@@ -0,0 +1,92 @@
+import math
+from django.db.models import Count, Sum
+from .models import TeacherRating, TeacherCourseRating, TeacherReview, empty_histogram
+
+
+def bucket(score):
+    """
+    Maps a 1.0-5.0 score to its histogram bucket ("1" to "5").
+
+    Halves round up (2.5 goes to "3"); `round` would send them to the even neighbour.
+    """
+    return str(min(5, max(1, math.floor(score + 0.5))))
+
+
+def _apply(aggregate, review, sign):
+    aggregate.review_count = max(0, aggregate.review_count + sign)
+    aggregate.teaching_style_sum += sign * review.teaching_style
+    aggregate.marking_sum += sign * review.marking
+    for histogram, score in (
+        (aggregate.teaching_style_histogram, review.teaching_style),
+        (aggregate.marking_histogram, review.marking),
+    ):
+        key = bucket(score)
+        histogram[key] = max(0, histogram.get(key, 0) + sign)
+    if aggregate.review_count == 0:
+        # Drop accumulated float error once the last review is gone
+        aggregate.teaching_style_sum = aggregate.marking_sum = 0
+    aggregate.save()
+
+
+def _locked_aggregates(teacher_id, course_id, create):
+    """
+    Returns the (teacher, teacher+course) aggregate rows locked for update.
+    """
+    if create:
+        TeacherRating.objects.get_or_create(teacher_id=teacher_id)
+        TeacherCourseRating.objects.get_or_create(teacher_id=teacher_id, course_id=course_id)
+    return (
+        TeacherRating.objects.select_for_update().filter(teacher_id=teacher_id).first(),
+        TeacherCourseRating.objects.select_for_update().filter(teacher_id=teacher_id, course_id=course_id).first(),
+    )
+
+
+def add_review(review):
+    """
+    Adds a new review to its aggregates. Call inside the transaction that saved the review.
+    """
+    for aggregate in _locked_aggregates(review.teacher_id, review.course_id, create=True):
+        _apply(aggregate, review, 1)
+
+
+def remove_review(review):
+    """
+    Removes a deleted review from its aggregates. Rows already removed by a cascade are skipped.
+    """
+    for aggregate in _locked_aggregates(review.teacher_id, review.course_id, create=False):
+        if aggregate is not None:
+            _apply(aggregate, review, -1)
+
+
+def _recompute(aggregate, reviews):
+    totals = reviews.aggregate(count=Count('id'), teaching_style=Sum('teaching_style'), marking=Sum('marking'))
+    aggregate.review_count = totals['count']
+    aggregate.teaching_style_sum = totals['teaching_style'] or 0
+    aggregate.marking_sum = totals['marking'] or 0
+    aggregate.teaching_style_histogram = empty_histogram()
+    aggregate.marking_histogram = empty_histogram()
+    for teaching_style, marking in reviews.values_list('teaching_style', 'marking'):
+        aggregate.teaching_style_histogram[bucket(teaching_style)] += 1
+        aggregate.marking_histogram[bucket(marking)] += 1
+    aggregate.save()
+
+
+def recompute_ratings(teacher_id, course_id=None):
+    """
+    Rebuilds a teacher's aggregates from their reviews (after edits, or to repair drift).
+
+    With `course_id`, only that course's row is rebuilt alongside the teacher total.
+    """
+    teacher_rating, _ = TeacherRating.objects.get_or_create(teacher_id=teacher_id)
+    _recompute(teacher_rating, TeacherReview.objects.filter(teacher_id=teacher_id))
+
+    if course_id is not None:
+        course_ids = [course_id]
+    else:
+        # Include existing rows so courses that lost all their reviews are reset to zero
+        course_ids = set(
+            TeacherReview.objects.filter(teacher_id=teacher_id).values_list('course_id', flat=True)
+        ) | set(TeacherCourseRating.objects.filter(teacher_id=teacher_id).values_list('course_id', flat=True))
+    for cid in course_ids:
+        course_rating, _ = TeacherCourseRating.objects.get_or_create(teacher_id=teacher_id, course_id=cid)
+        _recompute(course_rating, TeacherReview.objects.filter(teacher_id=teacher_id, course_id=cid))
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Course, Teacher,TeacherReview
+from .models import Course, Teacher,TeacherReview, TeacherRating
 from better_profanity import profanity
 
 
@@ -9,11 +9,24 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']  
 
 class TeacherSerializer(serializers.ModelSerializer):
+    """
+    Pass `include_ratings=True` in the context to embed the teacher's rating aggregate.
+    """
     courses = CourseSerializer(many=True)  
+    ratings = serializers.SerializerMethodField()
 
     class Meta:
         model = Teacher
-        fields = ['id', 'name', 'courses']
+        fields = ['id', 'name', 'courses', 'ratings']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('include_ratings'):
+            self.fields.pop('ratings')
+
+    def get_ratings(self, obj):
+        rating = getattr(obj, 'rating', None)
+        return rating.as_dict() if rating else TeacherRating(teacher=obj).as_dict()
 
 
 class TeacherReviewSerializer(serializers.ModelSerializer):
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .catalog_cache import invalidate_catalog
+from .models import Course, Teacher, TeacherReview
+from .ratings import add_review, recompute_ratings, remove_review
+
+
+@receiver(pre_save, sender=TeacherReview)
+def on_review_saving(sender, instance, **kwargs):
+    # The teacher and course the stored review counts towards, in case this save moves it
+    instance._previous_keys = (
+        TeacherReview.objects.filter(pk=instance.pk).values_list('teacher_id', 'course_id').first()
+        if instance.pk is not None else None
+    )
+
+
+@receiver(post_save, sender=TeacherReview)
+def on_review_saved(sender, instance, created, **kwargs):
+    with transaction.atomic():
+        if created:
+            add_review(instance)
+        else:
+            # Scores may have changed; rebuild rather than guess the old values
+            recompute_ratings(instance.teacher_id, instance.course_id)
+            previous = getattr(instance, '_previous_keys', None)
+            if previous is not None and previous != (instance.teacher_id, instance.course_id):
+                # Moved to another teacher or course: the old aggregates lose it
+                recompute_ratings(*previous)
+
+
+@receiver(post_delete, sender=TeacherReview)
+def on_review_deleted(sender, instance, **kwargs):
+    with transaction.atomic():
+        remove_review(instance)
+
+
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def on_catalog_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=Teacher.courses.through)
+def on_teacher_courses_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalog()
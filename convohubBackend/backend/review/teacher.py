@@ -1,8 +1,9 @@
 from rest_framework.viewsets import ViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import Teacher, Course
+from .models import Teacher, Course, TeacherRating
 from .serializers import TeacherSerializer
+from .catalog_cache import catalog_response
 from authentication.decorators import return_class
 from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, FORBIDDEN_CODE, INTERNAL_SERVER_ERROR_CODE
 
@@ -19,15 +20,27 @@ class TeacherViewSet(ViewSet):
             }), False
         return None, True
 
+    def include_ratings(self, request):
+        return request.query_params.get('include_ratings', '').lower() in ('1', 'true', 'yes')
+
     def list(self, request):
         try:
-            teachers = Teacher.objects.all()
-            serializer = TeacherSerializer(teachers, many=True)
-            return return_class({
-                "data": serializer.data,
-                "message": "Teacher(s) retrieved successfully.",
-                "status": SUCCESS_RESPONSE_CODE
-            })
+            teachers = Teacher.objects.prefetch_related('courses')
+            if self.include_ratings(request):
+                # Ratings change with every review, so this variant is not cached
+                serializer = TeacherSerializer(
+                    teachers.select_related('rating'), many=True, context={'include_ratings': True}
+                )
+                return return_class({
+                    "data": serializer.data,
+                    "message": "Teacher(s) retrieved successfully.",
+                    "status": SUCCESS_RESPONSE_CODE
+                })
+            return catalog_response(
+                request, 'teachers',
+                lambda: TeacherSerializer(teachers, many=True).data,
+                "Teacher(s) retrieved successfully."
+            )
         except Exception as e:
             return return_class({
                 "data": {"error": str(e)},
@@ -37,8 +50,8 @@ class TeacherViewSet(ViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            teacher = Teacher.objects.get(pk=pk)
-            serializer = TeacherSerializer(teacher)
+            teacher = Teacher.objects.prefetch_related('courses').get(pk=pk)
+            serializer = TeacherSerializer(teacher, context={'include_ratings': self.include_ratings(request)})
             return return_class({
                 "data": serializer.data,
                 "message": "Teacher retrieved successfully.",
@@ -57,6 +70,41 @@ class TeacherViewSet(ViewSet):
                 "status": INTERNAL_SERVER_ERROR_CODE
             })
 
+    def stats(self, request, pk=None):
+        try:
+            teacher = Teacher.objects.select_related('rating').get(pk=pk)
+            rating = getattr(teacher, 'rating', None) or TeacherRating(teacher=teacher)
+            course_ratings = teacher.course_ratings.select_related('course').order_by('course__name')
+            return return_class({
+                "data": {
+                    "teacher_id": teacher.id,
+                    "teacher_name": teacher.name,
+                    **rating.as_dict(),
+                    "courses": [
+                        {
+                            "course_id": course_rating.course.id,
+                            "course_name": course_rating.course.name,
+                            **course_rating.as_dict(),
+                        }
+                        for course_rating in course_ratings
+                    ],
+                },
+                "message": "Teacher rating statistics retrieved successfully.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+        except Teacher.DoesNotExist:
+            return return_class({
+                "data": {},
+                "message": "Teacher not found.",
+                "status": BAD_REQUEST_CODE
+            })
+        except Exception as e:
+            return return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while retrieving teacher statistics.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
+
     def create(self, request):
         response, is_allowed = self.has_superuser_access(request)
         if not is_allowed:
@@ -1,6 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
+from django.db import transaction
 from .models import TeacherReview
 from .serializers import TeacherReviewSerializer
 from authentication.decorators import return_class
@@ -81,7 +82,9 @@ class TeacherReviewView(APIView):
             }
             serializer = TeacherReviewSerializer(data=data, context={'request': request})
             serializer.is_valid(raise_exception=True)  # Raise ValidationError if invalid
-            serializer.save()
+            # The review and its rating aggregates (see review.signals) commit together
+            with transaction.atomic():
+                serializer.save()
 
             return return_class({
                 "data": serializer.data,
@@ -112,7 +115,8 @@ class TeacherReviewView(APIView):
 
         try:
             review = TeacherReview.objects.get(pk=pk)
-            review.delete()
+            with transaction.atomic():
+                review.delete()
 
             return return_class({
                 "data": {},
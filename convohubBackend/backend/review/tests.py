@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from .models import Course, Teacher, TeacherCourseRating, TeacherRating, TeacherReview
+from .ratings import bucket
 
-# Create your tests here.
+
+class BucketTests(SimpleTestCase):
+    def test_whole_scores_keep_their_bucket(self):
+        self.assertEqual([bucket(score) for score in (1, 2, 3, 4, 5)], ['1', '2', '3', '4', '5'])
+
+    def test_halves_round_up(self):
+        self.assertEqual([bucket(score) for score in (1.5, 2.5, 3.5, 4.5)], ['2', '3', '4', '5'])
+
+    def test_other_scores_round_to_nearest(self):
+        self.assertEqual([bucket(score) for score in (1.49, 2.51, 3.2, 4.8)], ['1', '3', '3', '5'])
+
+    def test_out_of_range_scores_are_clamped(self):
+        self.assertEqual([bucket(score) for score in (0, 0.5, 5.4, 7)], ['1', '1', '5', '5'])
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.courses = [Course.objects.create(name=name) for name in ('Physics', 'Chemistry')]
+        self.teachers = [Teacher.objects.create(name=name) for name in ('Smith', 'Jones')]
+        self.review = TeacherReview.objects.create(
+            user=self.user, teacher=self.teachers[0], course=self.courses[0], teaching_style=4, marking=2,
+        )
+
+    def counts(self, teacher, course):
+        return (
+            TeacherRating.objects.get(teacher=teacher).review_count,
+            TeacherCourseRating.objects.get(teacher=teacher, course=course).review_count,
+        )
+
+    def test_moving_a_review_updates_the_old_and_new_aggregates(self):
+        self.review.teacher = self.teachers[1]
+        self.review.course = self.courses[1]
+        self.review.save()
+        self.assertEqual(self.counts(self.teachers[0], self.courses[0]), (0, 0))
+        self.assertEqual(self.counts(self.teachers[1], self.courses[1]), (1, 1))
+
+    def test_moving_a_review_to_another_course_keeps_the_teacher_total(self):
+        self.review.course = self.courses[1]
+        self.review.save()
+        self.assertEqual(self.counts(self.teachers[0], self.courses[0]), (1, 0))
+        self.assertEqual(self.counts(self.teachers[0], self.courses[1]), (1, 1))
+        rating = TeacherCourseRating.objects.get(teacher=self.teachers[0], course=self.courses[0])
+        self.assertEqual(rating.teaching_style_histogram['4'], 0)
@@ -2,6 +2,8 @@ from django.urls import path
 from .course import CourseAPIView
 from .teacher import TeacherViewSet
 from .teacher_review import TeacherReviewView
+from .async_views import AsyncTeacherListView
+from authentication.async_views import read_view
 
 urlpatterns = [
     # Course API
@@ -9,8 +11,11 @@ urlpatterns = [
     path('courses/<int:pk>/', CourseAPIView.as_view(), name='course-detail'),
 
     # Teacher API
-    path('teachers/', TeacherViewSet.as_view({'get': 'list', 'post': 'create'}), name='teacher-list'),
+    path('teachers/', read_view(
+        'teacher-list', TeacherViewSet.as_view({'get': 'list', 'post': 'create'}), AsyncTeacherListView
+    ), name='teacher-list'),
     path('teachers/<int:pk>/', TeacherViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}), name='teacher-detail'),
+    path('teachers/<int:pk>/stats/', TeacherViewSet.as_view({'get': 'stats'}), name='teacher-stats'),
 
     # Teacher Review API
     path('teacher-reviews/', TeacherReviewView.as_view(), name='teacher-review-list'),  
@@ -0,0 +1,208 @@
+import heapq
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from chat.models import Message
+from .models import RoomActivity
+
+DEFAULT_ACTIVITY_FEED_SETTINGS = {
+    'ROOM_BUFFER_SIZE': 50,
+    'TTL': 300,
+}
+
+
+def get_feed_settings():
+    return {**DEFAULT_ACTIVITY_FEED_SETTINGS, **getattr(settings, 'ACTIVITY_FEED', {})}
+
+
+def _key(room_id, version):
+    return f'activity_feed:room:{room_id}:v{version or 0}'
+
+
+def _entry(message, room_name):
+    return {
+        "message_id": message.id,
+        "content": message.content,
+        "room": {
+            "room_id": int(message.room_id),
+            "room_name": room_name
+        },
+        "user": {
+            "user_id": message.user_id,
+            "username": message.user.username
+        },
+        "created_at": message.created_at
+    }
+
+
+def _sort_key(entry):
+    return entry['created_at'], entry['message_id']
+
+
+def record_messages(messages):
+    """
+    Moves the rooms that newly saved messages belong to on to a new version.
+
+    Must run after the messages are committed: a reader that sees the new version
+    then also sees the messages, so a buffer is never cached under a version newer
+    than its contents. Buffers this process holds are carried over to the new
+    version with the messages added, so the next read needs no database query.
+    """
+    by_room = {}
+    for message in messages:
+        if message.id is not None:
+            by_room.setdefault(int(message.room_id), []).append(message)
+    if not by_room:
+        return
+    versions = RoomActivity.bump(by_room)
+    # Inside a transaction, wait for it: a rollback would reuse the versions
+    transaction.on_commit(lambda: _extend_buffers(by_room, versions))
+
+
+def _extend_buffers(by_room, versions):
+    """
+    The buffer cached under version v - 1 holds every message recorded up to that
+    version; adding the messages that moved the room to v makes it valid for v.
+    Rooms whose previous buffer is not cached here are left to the next read.
+    """
+    config = get_feed_settings()
+    previous = {room_id: _key(room_id, version - 1) for room_id, version in versions.items()}
+    cached = cache.get_many(list(previous.values()))
+    extended = {}
+    for room_id, version in versions.items():
+        buffer = cached.get(previous[room_id])
+        if not buffer:
+            # An empty buffer has no room name to build the entries with
+            continue
+        room_name = buffer[0]['room']['room_name']
+        entries = buffer + [_entry(message, room_name) for message in by_room[room_id]]
+        entries.sort(key=_sort_key, reverse=True)
+        extended[_key(room_id, version)] = entries[:config['ROOM_BUFFER_SIZE']]
+    if extended:
+        cache.set_many(extended, timeout=config['TTL'])
+
+
+def invalidate_rooms(room_ids):
+    RoomActivity.bump(room_ids)
+
+
+def invalidate_room(room_id):
+    invalidate_rooms([room_id])
+
+
+def _load_buffers(room_ids, size):
+    """
+    Reads the latest `size` messages of each room.
+    """
+    ids = [message_id for query in _buffer_id_queries(room_ids, size) for message_id in query]
+    return _group_buffers(_buffer_rows(ids), room_ids)
+
+
+async def _aload_buffers(room_ids, size):
+    ids = [message_id for query in _buffer_id_queries(room_ids, size) async for message_id in query]
+    return _group_buffers([message async for message in _buffer_rows(ids)], room_ids)
+
+
+def _buffer_id_queries(room_ids, size):
+    """
+    One `[:size]` range scan of the (room, created_at, id) index per room, so the
+    cost does not grow with the rooms' history. PostgreSQL runs them as a single
+    UNION ALL; SQLite cannot slice inside a compound query and runs one per room.
+    """
+    queries = [
+        Message.objects.filter(room_id=room_id).order_by('-created_at', '-id').values_list('id', flat=True)[:size]
+        for room_id in room_ids
+    ]
+    if len(queries) > 1 and connection.features.supports_slicing_ordering_in_compound:
+        return [queries[0].union(*queries[1:], all=True)]
+    return queries
+
+
+def _buffer_rows(ids):
+    return (
+        Message.objects.filter(id__in=ids)
+        .select_related('room', 'user')
+        .order_by('room_id', '-created_at', '-id')
+    )
+
+
+def _group_buffers(rows, room_ids):
+    buffers = {room_id: [] for room_id in room_ids}
+    for message in rows:
+        buffers[message.room_id].append(_entry(message, message.room.name))
+    return buffers
+
+
+def _latest_messages(room_ids, limit):
+    return (
+        Message.objects.filter(room_id__in=room_ids)
+        .select_related('room', 'user')
+        .order_by('-created_at', '-id')[:limit]
+    )
+
+
+def _merge(buffers, limit):
+    merged = heapq.merge(*buffers, key=_sort_key, reverse=True)
+    return [entry for entry, _ in zip(merged, range(limit))]
+
+
+def _joined_rooms(user):
+    # The rooms' feed versions come with the membership query, so checking them costs nothing extra
+    return user.joined_rooms.values_list('id', 'activity__version')
+
+
+def _split(keys, cached):
+    buffers = [cached[key] for key in keys.values() if key in cached]
+    missing = [room_id for room_id, key in keys.items() if key not in cached]
+    return buffers, missing
+
+
+def recent_activity(user, limit):
+    """
+    Returns the `limit` most recent messages across the rooms `user` has joined.
+
+    Reads are served by merging per-room buffers from the cache; rooms whose
+    buffer is missing are loaded from the database and cached. Buffers are keyed
+    by the room's RoomActivity version: a new message or a rename moves the
+    version on. Messages saved through this process carry its buffers over to the
+    new version; otherwise the next read loads a fresh buffer.
+    The version is read before the buffer, so a buffer is never cached under a
+    version newer than its contents. Requests larger than the buffer size go
+    straight to the database.
+    """
+    config = get_feed_settings()
+    keys = {room_id: _key(room_id, version) for room_id, version in _joined_rooms(user)}
+    if not keys:
+        return []
+
+    if limit > config['ROOM_BUFFER_SIZE']:
+        return [_entry(message, message.room.name) for message in _latest_messages(list(keys), limit)]
+
+    cached = cache.get_many(list(keys.values()))
+    buffers, missing = _split(keys, cached)
+    if missing:
+        loaded = _load_buffers(missing, config['ROOM_BUFFER_SIZE'])
+        cache.set_many({keys[room_id]: buffer for room_id, buffer in loaded.items()}, timeout=config['TTL'])
+        buffers.extend(loaded.values())
+    return _merge(buffers, limit)
+
+
+async def arecent_activity(user, limit):
+    """
+    `recent_activity` for async views, using the async ORM and cache APIs.
+    """
+    config = get_feed_settings()
+    keys = {room_id: _key(room_id, version) async for room_id, version in _joined_rooms(user)}
+    if not keys:
+        return []
+
+    if limit > config['ROOM_BUFFER_SIZE']:
+        return [_entry(message, message.room.name) async for message in _latest_messages(list(keys), limit)]
+
+    cached = await cache.aget_many(list(keys.values()))
+    buffers, missing = _split(keys, cached)
+    if missing:
+        loaded = await _aload_buffers(missing, config['ROOM_BUFFER_SIZE'])
+        await cache.aset_many({keys[room_id]: buffer for room_id, buffer in loaded.items()}, timeout=config['TTL'])
+        buffers.extend(loaded.values())
+    return _merge(buffers, limit)
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_search_indexes(sender, using='default', **kwargs):
+    from .search import ensure_trigram_indexes
+    ensure_trigram_indexes(using)
 
 
 class RoomsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rooms'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(create_search_indexes, sender=self)
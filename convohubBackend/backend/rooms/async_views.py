@@ -0,0 +1,170 @@
+from django.db.models import Count
+from rest_framework.exceptions import NotFound
+from .models import Room
+from .views import wants_summary
+from .search_room import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from .search import asearch_rooms
+from .activity_feed import arecent_activity
+from .serializers import RoomSerializer, RoomSummarySerializer
+from chat.pagination import aget_message_page, DEFAULT_PAGE_SIZE
+from chat.read_receipts import with_unread_counts
+from chat.serializers import MessageSerializer
+from authentication.async_views import AsyncReadView
+from authentication.decorators import json_response, json_return_class
+from authentication.constants import (
+    SUCCESS_RESPONSE_CODE,
+    BAD_REQUEST_CODE,
+    INTERNAL_SERVER_ERROR_CODE,
+)
+
+
+class AsyncRoomListView(AsyncReadView):
+    """
+    Async version of RoomListView (same queries and response).
+    """
+
+    async def get(self, request):
+        user = request.user
+        rooms = Room.objects.with_member_summary() if wants_summary(request) else Room.objects.with_members()
+        joined_rooms = rooms.filter(pk__in=user.joined_rooms.values('pk')).order_by('-created_at')
+
+        if await joined_rooms.aexists():
+            queryset = with_unread_counts(joined_rooms, user)
+        else:
+            queryset = rooms.annotate(members_total=Count('members', distinct=True)).order_by('-members_total', '-created_at')
+
+        serializer_class = RoomSummarySerializer if wants_summary(request) else RoomSerializer
+        serializer = serializer_class([room async for room in queryset], many=True)
+        return json_response({
+            'data': serializer.data,
+            'message': "Rooms fetched successfully",
+            'status': SUCCESS_RESPONSE_CODE
+        })
+
+
+class AsyncRoomDetailView(AsyncReadView):
+    """
+    Async version of RoomDetailView's GET; updates and deletes go to RoomDetailView.
+    """
+
+    async def get(self, request, pk):
+        rooms = Room.objects.with_member_summary() if wants_summary(request) else Room.objects.with_members()
+        room = await with_unread_counts(rooms, request.user).filter(pk=pk).afirst()
+        if room is None:
+            # The same body RoomDetailView's get_object_or_404 produces
+            raise NotFound(f"No {Room._meta.object_name} matches the given query.")
+
+        serializer_class = RoomSummarySerializer if wants_summary(request) else RoomSerializer
+        # Only the latest page is embedded; older history is paged via rooms/<pk>/messages/
+        page = await aget_message_page(room.id, limit=DEFAULT_PAGE_SIZE)
+        return json_response({
+            'data': {
+                'room': serializer_class(room).data,
+                'messages': MessageSerializer(page['messages'], many=True).data,
+                'before_cursor': page['before_cursor'],
+            },
+            'message': "Room details and messages fetched successfully",
+            'status': "success",
+        })
+
+
+class AsyncSearchRoomView(AsyncReadView):
+    """
+    Async version of SearchRoomView.
+    """
+
+    async def get(self, request):
+        try:
+            query = request.GET.get('query', '').strip()
+            if not query:
+                return json_return_class({
+                    "data": {},
+                    "message": "Query parameter is required.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            try:
+                limit = int(request.GET.get('limit', DEFAULT_SEARCH_LIMIT))
+                offset = int(request.GET.get('offset', 0))
+            except ValueError:
+                limit = offset = -1
+            if limit <= 0 or offset < 0:
+                return json_return_class({
+                    "data": {},
+                    "message": "'limit' must be greater than 0 and 'offset' must not be negative.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            rooms = await asearch_rooms(query, limit=min(limit, MAX_SEARCH_LIMIT), offset=offset)
+
+            if not rooms:
+                return json_return_class({
+                    "data": {},
+                    "message": "No rooms found matching the query.",
+                    "status": SUCCESS_RESPONSE_CODE
+                })
+
+            data = [
+                {
+                    "room_id": room.id,
+                    "room_name": room.name,
+                    "topic": room.topic,
+                    "description": room.description,
+                    "host": room.host.username,
+                    "members_count": room.members_count,
+                    "rank": round(room.rank, 4),
+                    "created_at": room.created_at
+                }
+                for room in rooms
+            ]
+
+            return json_return_class({
+                "data": data,
+                "message": f"{len(data)} room(s) found.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+
+        except Exception as e:
+            return json_return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while searching for rooms.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
+
+
+class AsyncRecentActivitiesView(AsyncReadView):
+    """
+    Async version of RecentActivitiesAPIView.
+    """
+
+    async def get(self, request):
+        try:
+            limit = int(request.GET.get('limit', 50))
+            if limit <= 0:
+                return json_return_class({
+                    "data": {},
+                    "message": "Limit parameter must be greater than 0.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            data = await arecent_activity(request.user, limit)
+
+            if not data:
+                return json_return_class({
+                    "data": {},
+                    "message": "No recent activities found.",
+                    "status": SUCCESS_RESPONSE_CODE
+                })
+
+            return json_return_class({
+                "data": data,
+                "message": f"{len(data)} recent activities found.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+
+        except Exception as e:
+            return json_return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while fetching recent activities.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
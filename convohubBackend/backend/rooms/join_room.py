@@ -1,6 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from .models import Room
+from chat.read_receipts import mark_read
 from authentication.decorators import return_class
 from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
 
@@ -30,6 +31,8 @@ class JoinRoomView(APIView):
 
             # Add the user to the room's members
             room.members.add(request.user)
+            # New members start with the existing history already read
+            mark_read(request.user.id, room.id)
             return return_class({
                 "data": {
                     "room_id": room.id,
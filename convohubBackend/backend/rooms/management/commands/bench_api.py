@@ -0,0 +1,125 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+from chat.benchmarking import benchmark_database, create_users, environment, latency_ms, write_report
+from chat.models import Message
+from review.models import Course, Teacher
+from rooms.models import Room
+
+WORDS = ['python', 'django', 'music', 'gaming', 'study', 'physics', 'startup', 'design', 'travel', 'movies']
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the REST hot paths (room list/detail/search, teacher list) at configurable "
+        "data sizes, reporting query counts and latency. Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--rooms', type=int, default=100)
+        parser.add_argument('--members', type=int, default=20, help="Members per room")
+        parser.add_argument('--messages', type=int, default=100, help="Messages per room")
+        parser.add_argument('--joined', type=int, default=10, help="Rooms the benchmark user has joined")
+        parser.add_argument('--teachers', type=int, default=100)
+        parser.add_argument('--courses', type=int, default=30)
+        parser.add_argument('--iterations', type=int, default=50, help="Requests per endpoint")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            started = time.perf_counter()
+            user, room_id = self.seed(options)
+            seed_seconds = time.perf_counter() - started
+
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            endpoints = {
+                'room_list': ('/rooms/', {}),
+                'room_list_summary': ('/rooms/', {'summary': 'true'}),
+                'room_detail': (f'/rooms/{room_id}/', {}),
+                'room_search': ('/rooms/search/', {'query': 'pyth'}),
+                'teacher_list': ('/review/teachers/', {}),
+                'teacher_list_ratings': ('/review/teachers/', {'include_ratings': 'true'}),
+            }
+            results = {
+                name: self.measure(client, path, params, options['iterations'])
+                for name, (path, params) in endpoints.items()
+            }
+
+        report = {
+            'benchmark': 'rest_api',
+            'environment': environment(),
+            'data': {key: options[key] for key in (
+                'users', 'rooms', 'members', 'messages', 'joined', 'teachers', 'courses'
+            )},
+            'iterations': options['iterations'],
+            'seed_seconds': round(seed_seconds, 3),
+            'endpoints': results,
+        }
+        write_report(self, report, options['output'])
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        users = create_users(max(options['users'], options['members'], 1), prefix='apibench')
+        rooms = Room.objects.bulk_create([
+            Room(
+                name=f'{rng.choice(WORDS)} room {i}',
+                topic=rng.choice(WORDS),
+                description=' '.join(rng.choices(WORDS, k=8)),
+                host=rng.choice(users),
+            )
+            for i in range(options['rooms'])
+        ])
+        Membership = Room.members.through
+        Membership.objects.bulk_create([
+            Membership(room_id=room.id, user_id=member.id)
+            for room in rooms
+            for member in rng.sample(users, min(options['members'], len(users)))
+        ], ignore_conflicts=True)
+        Message.objects.bulk_create([
+            Message(room_id=room.id, user=rng.choice(users), content=' '.join(rng.choices(WORDS, k=12)))
+            for room in rooms
+            for _ in range(options['messages'])
+        ], batch_size=1000)
+
+        # The benchmark user joins a fixed number of rooms regardless of the random memberships
+        user = users[0]
+        user.joined_rooms.set(rooms[:options['joined']])
+
+        courses = Course.objects.bulk_create([Course(name=f'Course {i}') for i in range(options['courses'])])
+        teachers = Teacher.objects.bulk_create([Teacher(name=f'Teacher {i}') for i in range(options['teachers'])])
+        Teaching = Teacher.courses.through
+        Teaching.objects.bulk_create([
+            Teaching(teacher_id=teacher.id, course_id=course.id)
+            for teacher in teachers
+            for course in rng.sample(courses, min(3, len(courses)))
+        ])
+        return user, rooms[0].id if rooms else 0
+
+    def measure(self, client, path, params, iterations):
+        """
+        Issues `iterations` GETs; the first is reported separately as the cold request.
+        """
+        durations, queries, statuses = [], [], set()
+        for _ in range(max(iterations, 1)):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, params)
+                durations.append(time.perf_counter() - started)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+        warm = queries[1:] or queries
+        return {
+            'path': path,
+            'params': params,
+            'status_codes': sorted(statuses),
+            'queries': {'cold': queries[0], 'warm_min': min(warm), 'warm_max': max(warm)},
+            'cold_ms': round(durations[0] * 1000, 3),
+            'latency_ms': latency_ms(durations[1:] or durations),
+        }
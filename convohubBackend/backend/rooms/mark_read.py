@@ -0,0 +1,53 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from .models import Room
+from chat.read_receipts import latest_seq, mark_read
+from authentication.decorators import return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
+
+
+class MarkRoomReadView(APIView):
+    """
+    Moves the user's read pointer in a room forward, clearing its unread badge.
+
+    Body (optional): {"seq": <int>} — the last message read; defaults to the latest message.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            seq = request.data.get('seq')
+            if seq is not None:
+                try:
+                    seq = int(seq)
+                except (TypeError, ValueError):
+                    return return_class({
+                        "data": {},
+                        "message": "seq must be an integer.",
+                        "status": BAD_REQUEST_CODE
+                    })
+
+            if not Room.members.through.objects.filter(room_id=pk, user_id=request.user.id).exists():
+                return return_class({
+                    "data": {},
+                    "message": "You are not a member of this room.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            last_read_seq = mark_read(request.user.id, pk, seq)
+            return return_class({
+                "data": {
+                    "room_id": pk,
+                    "last_read_seq": last_read_seq,
+                    "unread_count": max(latest_seq(pk) - last_read_seq, 0),
+                },
+                "message": "Room marked as read.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+        except Exception as e:
+            print(f"Error marking room as read: {e}")
+            return return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while marking the room as read.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
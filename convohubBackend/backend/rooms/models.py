@@ -1,5 +1,29 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Prefetch
+
+MEMBER_PREVIEW_SIZE = 5
+
+
+class RoomQuerySet(models.QuerySet):
+    def with_members(self):
+        """
+        Loads the host, every member and their profiles in a fixed number of queries.
+        """
+        return self.select_related('host__profile').prefetch_related(
+            Prefetch('members', queryset=User.objects.select_related('profile'))
+        )
+
+    def with_member_summary(self):
+        """
+        Annotates `member_count` and prefetches only the first few members into `member_preview`.
+        """
+        preview = User.objects.select_related('profile').order_by('id')[:MEMBER_PREVIEW_SIZE]
+        return self.select_related('host__profile').annotate(
+            member_count=Count('members', distinct=True)
+        ).prefetch_related(
+            Prefetch('members', queryset=preview, to_attr='member_preview')
+        )
 
 
 class Room(models.Model):
@@ -10,6 +34,8 @@ class Room(models.Model):
     description = models.TextField(default='')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = RoomQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} (Host: {self.host.username})"
     
@@ -18,3 +44,43 @@ class Room(models.Model):
         super().save(*args, **kwargs)
         # Ensure the host is added as a member
         self.members.add(self.host)
+
+
+class RoomActivity(models.Model):
+    """
+    Counts changes to a room's latest messages and name. Cached activity feed buffers are
+    keyed by it, so a change made through any worker process retires them in all of them.
+    """
+    room = models.OneToOneField(Room, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls, room_ids):
+        """
+        Moves the version of every room in `room_ids` forward; deleted rooms are skipped.
+
+        One statement on PostgreSQL (an upsert); elsewhere an update, plus an insert for
+        rooms that have no row yet.
+
+        Returns:
+            dict: The new version of each room, by room id.
+        """
+        room_ids = sorted({int(room_id) for room_id in room_ids})
+        if not room_ids:
+            return {}
+        if connection.vendor == 'postgresql':
+            table = connection.ops.quote_name(cls._meta.db_table)
+            rooms = connection.ops.quote_name(Room._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} (room_id, version) SELECT id, 1 FROM {rooms} WHERE id = ANY(%s) "
+                    f"ON CONFLICT (room_id) DO UPDATE SET version = {table}.version + 1 "
+                    f"RETURNING room_id, version",
+                    [room_ids],
+                )
+                return dict(cursor.fetchall())
+        with transaction.atomic():
+            if cls.objects.filter(room_id__in=room_ids).update(version=F('version') + 1) < len(room_ids):
+                new = Room.objects.filter(id__in=room_ids, activity__isnull=True).values_list('id', flat=True)
+                cls.objects.bulk_create([cls(room_id=room_id, version=1) for room_id in new])
+            return dict(cls.objects.filter(room_id__in=room_ids).values_list('room_id', 'version'))
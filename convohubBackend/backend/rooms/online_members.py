@@ -0,0 +1,35 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from chat.presence import online_users
+from authentication.decorators import return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, INTERNAL_SERVER_ERROR_CODE
+
+
+class OnlineMembersView(APIView):
+    """
+    Lists the users with an open chat socket in a room.
+
+    Served from the presence table in one indexed query, so clients can poll it
+    cheaply instead of re-fetching rooms/<pk>/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            users = online_users(pk)
+            return return_class({
+                "data": {
+                    "room_id": pk,
+                    "online_count": len(users),
+                    "users": users
+                },
+                "message": "Online members retrieved successfully.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+        except Exception as e:
+            print(f"Error retrieving online members: {e}")
+            return return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while retrieving online members.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
@@ -1,6 +1,6 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from chat.models import Message
+from .activity_feed import recent_activity
 from authentication.decorators import return_class
 from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
 
@@ -19,34 +19,16 @@ class RecentActivitiesAPIView(APIView):
                     "status": BAD_REQUEST_CODE
                 })
 
-            # Fetch recent messages ordered by created_at
-            messages = Message.objects.select_related('room', 'user').order_by('-created_at')[:limit]
+            # Merge the per-room activity buffers of the rooms the user has joined
+            data = recent_activity(request.user, limit)
 
-            if not messages.exists():
+            if not data:
                 return return_class({
                     "data": {},
                     "message": "No recent activities found.",
                     "status": SUCCESS_RESPONSE_CODE
                 })
 
-            # Prepare the response data
-            data = [
-                {
-                    "message_id": message.id,
-                    "content": message.content,
-                    "room": {
-                        "room_id": message.room.id,
-                        "room_name": message.room.name
-                    },
-                    "user": {
-                        "user_id": message.user.id,
-                        "username": message.user.username
-                    },
-                    "created_at": message.created_at
-                }
-                for message in messages
-            ]
-
             return return_class({
                 "data": data,
                 "message": f"{len(data)} recent activities found.",
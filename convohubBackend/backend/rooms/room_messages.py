@@ -0,0 +1,68 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from .models import Room
+from chat.pagination import get_message_page, parse_page_size
+from chat.serializers import MessageSerializer
+from authentication.decorators import return_class
+from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
+
+
+class RoomMessagesView(APIView):
+    """
+    Pages through a room's message history with `before`/`after` cursors.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            before = request.query_params.get('before')
+            after = request.query_params.get('after')
+
+            if before and after:
+                return return_class({
+                    "data": {},
+                    "message": "Only one of 'before' or 'after' can be provided.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            try:
+                limit = parse_page_size(request.query_params.get('limit'))
+            except ValueError as e:
+                return return_class({
+                    "data": {},
+                    "message": str(e),
+                    "status": BAD_REQUEST_CODE
+                })
+
+            if not Room.objects.filter(pk=pk).exists():
+                return return_class({
+                    "data": {},
+                    "message": "Room not found.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            try:
+                page = get_message_page(pk, before=before, after=after, limit=limit)
+            except ValueError as e:
+                return return_class({
+                    "data": {},
+                    "message": str(e),
+                    "status": BAD_REQUEST_CODE
+                })
+
+            return return_class({
+                "data": {
+                    "messages": MessageSerializer(page['messages'], many=True).data,
+                    "before_cursor": page['before_cursor'],
+                    "after_cursor": page['after_cursor'],
+                },
+                "message": f"{len(page['messages'])} message(s) fetched.",
+                "status": SUCCESS_RESPONSE_CODE
+            })
+
+        except Exception as e:
+            return return_class({
+                "data": {"error": str(e)},
+                "message": "An error occurred while fetching messages.",
+                "status": INTERNAL_SERVER_ERROR_CODE
+            })
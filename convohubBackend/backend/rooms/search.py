@@ -0,0 +1,258 @@
+import bisect
+import re
+import threading
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection, connections
+from django.db.models import Count, Q
+from django.db.models.functions import Greatest
+from .models import Room
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Relative weight of a match in each searchable Room field
+FIELD_WEIGHTS = {'name': 1.0, 'topic': 0.8, 'description': 0.5}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def within_one_edit(a, b):
+    """
+    True if `a` and `b` differ by at most one insertion, deletion or substitution.
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+        else:
+            i += 1
+        j += 1
+    return edits + (len(b) - j) + (len(a) - i) <= 1
+
+
+class InvertedIndex:
+    """
+    Thread-safe in-process inverted index: token -> {doc_id: weight}.
+
+    Query terms match indexed tokens exactly, by prefix, or (for terms of four
+    or more characters) within one edit, with decreasing scores. Used when the
+    database has no trigram support (SQLite test runs).
+    """
+
+    EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.5
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_tokens = {}
+        self._doc_meta = {}
+        self._vocabulary = []
+        self._lock = threading.Lock()
+        self.built = False
+
+    def add(self, doc_id, fields, meta=None):
+        """
+        Indexes (or re-indexes) a document.
+
+        Args:
+            doc_id: The document's primary key.
+            fields (list): (text, weight) pairs.
+            meta (optional): Extra data kept with the document, returned by `get_meta`.
+        """
+        with self._lock:
+            self._remove(doc_id)
+            if meta is not None:
+                self._doc_meta[doc_id] = meta
+            weights = {}
+            for text, weight in fields:
+                for token in tokenize(text):
+                    weights[token] = max(weights.get(token, 0), weight)
+            for token, weight in weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._vocabulary, token)
+                postings[doc_id] = weight
+            self._doc_tokens[doc_id] = list(weights)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def get_meta(self, doc_id):
+        return self._doc_meta.get(doc_id)
+
+    def _remove(self, doc_id):
+        self._doc_meta.pop(doc_id, None)
+        for token in self._doc_tokens.pop(doc_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._doc_meta.clear()
+            self._vocabulary.clear()
+            self.built = False
+
+    def _matches(self, term):
+        yield term, self.EXACT
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                yield token, self.PREFIX
+        if len(term) >= 4:
+            for token in self._vocabulary:
+                if token != term and not token.startswith(term) and within_one_edit(term, token):
+                    yield token, self.FUZZY
+
+    def search(self, query, match_all=False):
+        """
+        Returns matching doc ids ordered by descending score.
+
+        Args:
+            query (str): Free-text query.
+            match_all (bool): Require every query term to match (AND) instead of any (OR).
+
+        Returns:
+            list: (doc_id, score) pairs.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = {}
+        with self._lock:
+            per_term = []
+            for term in terms:
+                term_scores = {}
+                for token, quality in self._matches(term):
+                    for doc_id, weight in self._postings.get(token, {}).items():
+                        term_scores[doc_id] = max(term_scores.get(doc_id, 0), quality * weight)
+                per_term.append(term_scores)
+        candidates = set.intersection(*(set(s) for s in per_term)) if match_all else set().union(*per_term)
+        for doc_id in candidates:
+            scores[doc_id] = sum(s.get(doc_id, 0) for s in per_term) / len(terms)
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+room_index = InvertedIndex()
+
+
+def index_room(room):
+    room_index.add(room.id, [(getattr(room, field), weight) for field, weight in FIELD_WEIGHTS.items()])
+
+
+def build_room_index():
+    room_index.clear()
+    for room in Room.objects.only(*FIELD_WEIGHTS).iterator():
+        index_room(room)
+    room_index.built = True
+
+
+def uses_trigram_search():
+    return connection.vendor == 'postgresql'
+
+
+def search_rooms(query, limit, offset=0):
+    """
+    Ranked room search over name, topic and description.
+
+    On PostgreSQL this uses pg_trgm word similarity (typo and prefix tolerant)
+    backed by GIN trigram indexes; elsewhere it uses the in-process `room_index`.
+
+    Returns:
+        list: Rooms with `host` loaded and `members_count` / `rank` annotated, best match first.
+    """
+    if uses_trigram_search():
+        return list(_trigram_search(query, limit, offset))
+
+    if not room_index.built:
+        build_room_index()
+    ranked = room_index.search(query)[offset:offset + limit]
+    return _in_rank_order(_ranked_rooms(ranked), ranked)
+
+
+async def asearch_rooms(query, limit, offset=0):
+    """
+    `search_rooms` for async views, fetched with the async ORM.
+    """
+    if uses_trigram_search():
+        return [room async for room in _trigram_search(query, limit, offset)]
+
+    if not room_index.built:
+        await sync_to_async(build_room_index)()
+    ranked = room_index.search(query)[offset:offset + limit]
+    return _in_rank_order([room async for room in _ranked_rooms(ranked)], ranked)
+
+
+def _search_base():
+    return Room.objects.select_related('host').annotate(members_count=Count('members', distinct=True))
+
+
+def _trigram_search(query, limit, offset):
+    rank = Greatest(*[
+        TrigramWordSimilarity(query, field) * weight for field, weight in FIELD_WEIGHTS.items()
+    ])
+    match = Q()
+    for field in FIELD_WEIGHTS:
+        match |= Q(**{f'{field}__trigram_word_similar': query}) | Q(**{f'{field}__icontains': query})
+    return _search_base().filter(match).annotate(rank=rank).order_by('-rank', '-created_at')[offset:offset + limit]
+
+
+def _ranked_rooms(ranked):
+    return _search_base().filter(id__in=[doc_id for doc_id, _ in ranked])
+
+
+def _in_rank_order(rooms, ranked):
+    by_id = {room.id: room for room in rooms}
+    results = []
+    for doc_id, score in ranked:
+        room = by_id.get(doc_id)
+        if room is not None:
+            room.rank = score
+            results.append(room)
+    return results
+
+
+def ensure_trigram_indexes(using='default'):
+    """
+    Creates the pg_trgm extension and GIN trigram indexes used by `search_rooms`.
+
+    Migrations are generated per deployment, so these are applied after migrate.
+    """
+    conn = connections[using]
+    if conn.vendor != 'postgresql':
+        return
+    table = Room._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for field in FIELD_WEIGHTS:
+            # One index serves the %> similarity operator, the other Django's
+            # icontains, which compiles to UPPER(field::text) LIKE UPPER(...)
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{field}_trgm "
+                f"ON {table} USING gin ({field} gin_trgm_ops)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{field}_upper_trgm "
+                f"ON {table} USING gin ((UPPER({field}::text)) gin_trgm_ops)"
+            )
@@ -1,10 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Room
-from django.db.models import Q
+from .search import search_rooms
 from authentication.decorators import return_class
 from authentication.constants import SUCCESS_RESPONSE_CODE, BAD_REQUEST_CODE, INTERNAL_SERVER_ERROR_CODE
 
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
 
 class SearchRoomView(APIView):
     permission_classes = [IsAuthenticated]
@@ -19,12 +21,21 @@ class SearchRoomView(APIView):
                     "status": BAD_REQUEST_CODE
                 })
 
-            
-            rooms = Room.objects.filter(
-                Q(name__icontains=query) | Q(topic__icontains=query)
-            )
+            try:
+                limit = int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+                offset = int(request.query_params.get('offset', 0))
+            except ValueError:
+                limit = offset = -1
+            if limit <= 0 or offset < 0:
+                return return_class({
+                    "data": {},
+                    "message": "'limit' must be greater than 0 and 'offset' must not be negative.",
+                    "status": BAD_REQUEST_CODE
+                })
+
+            rooms = search_rooms(query, limit=min(limit, MAX_SEARCH_LIMIT), offset=offset)
 
-            if not rooms.exists():
+            if not rooms:
                 return return_class({
                     "data": {},
                     "message": "No rooms found matching the query.",
@@ -39,7 +50,8 @@ class SearchRoomView(APIView):
                     "topic": room.topic,
                     "description": room.description,
                     "host": room.host.username,
-                    "members_count": room.members.count(),
+                    "members_count": room.members_count,
+                    "rank": round(room.rank, 4),
                     "created_at": room.created_at
                 }
                 for room in rooms
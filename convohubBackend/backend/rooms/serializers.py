@@ -11,16 +11,47 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_profile_image(self, obj):
         
-        user_profile = obj.profile  
+        user_profile = getattr(obj, 'profile', None)
         return user_profile.profile_image.url if user_profile and user_profile.profile_image else None
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class UnreadCountMixin(serializers.Serializer):
+    """
+    `unread_count` / `last_read_seq` for rooms annotated with `chat.read_receipts.with_unread_counts`; null otherwise.
+    """
+    unread_count = serializers.SerializerMethodField()
+    last_read_seq = serializers.SerializerMethodField()
+
+    def get_unread_count(self, obj):
+        return getattr(obj, 'unread_count', None)
+
+    def get_last_read_seq(self, obj):
+        return getattr(obj, 'last_read_seq', None)
+
+
+class RoomSerializer(UnreadCountMixin, serializers.ModelSerializer):
     host = UserSerializer(read_only=True)  
     members = UserSerializer(many=True, read_only=True) 
     class Meta:
         model = Room
-        fields = ['id', 'name','topic','description', 'host', 'members', 'created_at']
+        fields = ['id', 'name','topic','description', 'host', 'members', 'created_at', 'unread_count', 'last_read_seq']
+
+
+class RoomSummarySerializer(UnreadCountMixin, serializers.ModelSerializer):
+    """
+    Compact room representation: member count and a small member preview instead of every member.
+    Expects a queryset built with `Room.objects.with_member_summary()`.
+    """
+    host = UserSerializer(read_only=True)
+    member_count = serializers.IntegerField(read_only=True)
+    members_preview = UserSerializer(source='member_preview', many=True, read_only=True)
+
+    class Meta:
+        model = Room
+        fields = [
+            'id', 'name', 'topic', 'description', 'host', 'member_count', 'members_preview', 'created_at',
+            'unread_count', 'last_read_seq',
+        ]
 
 class RoomCreateSerializer(serializers.ModelSerializer):
     class Meta:
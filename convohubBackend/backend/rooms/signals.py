@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .activity_feed import invalidate_room
+from .models import Room
+from .search import index_room, room_index
+
+
+@receiver(post_save, sender=Room)
+def on_room_saved(sender, instance, **kwargs):
+    if room_index.built:
+        index_room(instance)
+    # Feed entries carry the room name; a new room has no buffer to retire
+    if not kwargs.get('created'):
+        invalidate_room(instance.id)
+
+
+@receiver(post_delete, sender=Room)
+def on_room_deleted(sender, instance, **kwargs):
+    room_index.remove(instance.id)
@@ -1,3 +1,81 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from chat.models import Message
+from .activity_feed import record_messages, recent_activity
+from .models import Room
+from .search import InvertedIndex, within_one_edit
 
-# Create your tests here.
+
+class InvertedIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add(1, [('Physics study group', 1.0), ('Exam prep', 0.5)], meta='a')
+        self.index.add(2, [('Physical chemistry', 1.0)], meta='b')
+        self.index.add(3, [('Phisics help', 1.0)])
+
+    def ids(self, query, **kwargs):
+        return [doc_id for doc_id, _ in self.index.search(query, **kwargs)]
+
+    def test_exact_ranks_above_prefix_and_fuzzy_matches(self):
+        results = dict(self.index.search('physics'))
+        self.assertEqual(self.ids('physics'), [1, 3])
+        self.assertEqual(results[1], InvertedIndex.EXACT)
+        self.assertEqual(results[3], InvertedIndex.FUZZY)
+        self.assertEqual(self.ids('phys'), [2, 1])
+
+    def test_field_weight_scales_the_score(self):
+        self.assertEqual(self.index.search('exam'), [(1, 0.5)])
+
+    def test_match_all_requires_every_term(self):
+        self.assertEqual(sorted(self.ids('physics chemistry')), [1, 2, 3])
+        self.assertEqual(self.ids('physical chemistry', match_all=True), [2])
+
+    def test_reindexing_replaces_a_document(self):
+        self.index.add(1, [('Biology', 1.0)], meta='c')
+        self.assertEqual(self.ids('physics'), [3])
+        self.assertEqual(self.ids('biology'), [1])
+        self.assertEqual(self.index.get_meta(1), 'c')
+
+    def test_removed_documents_are_not_returned(self):
+        self.index.remove(2)
+        self.assertEqual(self.ids('chemistry'), [])
+        self.assertIsNone(self.index.get_meta(2))
+
+    def test_empty_query_matches_nothing(self):
+        self.assertEqual(self.index.search('  '), [])
+
+    def test_within_one_edit(self):
+        self.assertTrue(within_one_edit('physics', 'phisics'))
+        self.assertTrue(within_one_edit('exam', 'exams'))
+        self.assertFalse(within_one_edit('exam', 'team'))
+
+
+@override_settings(ACTIVITY_FEED={'ROOM_BUFFER_SIZE': 3, 'TTL': 300})
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.rooms = [Room.objects.create(name=f'r{i}', host=self.user) for i in range(2)]
+        for i in range(5):
+            for room in self.rooms:
+                Message.objects.create(room=room, user=self.user, content=f'{room.name}-{i}')
+
+    def contents(self, limit):
+        return [entry['content'] for entry in recent_activity(self.user, limit)]
+
+    def test_merges_the_latest_messages_of_each_room(self):
+        self.assertEqual(self.contents(4), ['r1-4', 'r0-4', 'r1-3', 'r0-3'])
+        # Beyond the buffer size the feed reads the database directly
+        self.assertEqual(len(self.contents(10)), 10)
+
+    def test_new_messages_extend_the_cached_buffer(self):
+        self.contents(3)
+        message = Message(room=self.rooms[0], user=self.user, content='fresh')
+        with self.captureOnCommitCallbacks(execute=True):
+            # Saved without the signal, as the message buffer does
+            Message.objects.bulk_create([message])
+            record_messages([message])
+        # Only the membership query: both buffers are cached under the new versions
+        with self.assertNumQueries(1):
+            self.assertEqual(self.contents(3), ['fresh', 'r1-4', 'r0-4'])
@@ -3,11 +3,19 @@ from .views import RoomListView, RoomDetailView, RoomCreateView
 from .join_room import JoinRoomView
 from .search_room import SearchRoomView
 from .recent_activity import RecentActivitiesAPIView
+from .room_messages import RoomMessagesView
+from .online_members import OnlineMembersView
+from .mark_read import MarkRoomReadView
+from .async_views import AsyncRecentActivitiesView, AsyncRoomDetailView, AsyncRoomListView, AsyncSearchRoomView
+from authentication.async_views import read_view
 urlpatterns = [
     path('create/', RoomCreateView.as_view(), name='room-create'),
-    path('', RoomListView.as_view(), name='room-list'),
-    path('<int:pk>/', RoomDetailView.as_view(), name='room-detail'),
+    path('', read_view('room-list', RoomListView.as_view(), AsyncRoomListView), name='room-list'),
+    path('<int:pk>/', read_view('room-detail', RoomDetailView.as_view(), AsyncRoomDetailView), name='room-detail'),
     path('<int:pk>/join/', JoinRoomView.as_view(), name='join-room'),
-    path('search/',SearchRoomView.as_view(),name='search-room'),
-    path('recent/',RecentActivitiesAPIView.as_view(),name='recent-activity')
+    path('<int:pk>/messages/', RoomMessagesView.as_view(), name='room-messages'),
+    path('<int:pk>/online/', OnlineMembersView.as_view(), name='room-online'),
+    path('<int:pk>/read/', MarkRoomReadView.as_view(), name='room-read'),
+    path('search/', read_view('search-room', SearchRoomView.as_view(), AsyncSearchRoomView), name='search-room'),
+    path('recent/', read_view('recent-activity', RecentActivitiesAPIView.as_view(), AsyncRecentActivitiesView), name='recent-activity')
 ]
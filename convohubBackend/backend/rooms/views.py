@@ -3,9 +3,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db.models import Count
 from .models import Room
-from chat.models import Message
+from chat.pagination import get_message_page, DEFAULT_PAGE_SIZE
+from chat.read_receipts import with_unread_counts
 from chat.serializers import MessageSerializer
-from .serializers import RoomSerializer, RoomCreateSerializer
+from .serializers import RoomSerializer, RoomSummarySerializer, RoomCreateSerializer
 from authentication.decorators import return_class
 from authentication.constants import (
     SUCCESS_RESPONSE_CODE,
@@ -13,6 +14,14 @@ from authentication.constants import (
     UNAUTHORIZED,
     )
 
+
+def wants_summary(request):
+    """
+    True when the client asked for the compact room representation (`?summary=true`).
+    """
+    return request.query_params.get('summary', '').lower() in ('1', 'true', 'yes')
+
+
 class RoomListView(generics.ListAPIView):
     """
     Lists rooms joined by the user, or rooms sorted by member count if the user has not joined any.
@@ -25,12 +34,18 @@ class RoomListView(generics.ListAPIView):
         Returns rooms joined by the user or rooms sorted by member count if the user has not joined any.
         """
         user = self.request.user
-        joined_rooms = Room.objects.filter(members=user).order_by('-created_at')
+        rooms = Room.objects.with_member_summary() if wants_summary(self.request) else Room.objects.with_members()
+        # Filter through a subquery so the members join doesn't constrain member_count
+        joined_rooms = rooms.filter(pk__in=user.joined_rooms.values('pk')).order_by('-created_at')
 
         if joined_rooms.exists():
-            return joined_rooms
+            # Unread badges come back in the same query
+            return with_unread_counts(joined_rooms, user)
         
-        return Room.objects.annotate(member_count=Count('members')).order_by('-member_count', '-created_at')
+        return rooms.annotate(members_total=Count('members', distinct=True)).order_by('-members_total', '-created_at')
+
+    def get_serializer_class(self):
+        return RoomSummarySerializer if wants_summary(self.request) else RoomSerializer
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -47,23 +62,34 @@ class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieves, updates, or deletes a single room's details.
     """
-    queryset = Room.objects.all()
     serializer_class = RoomSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            rooms = Room.objects.with_member_summary() if wants_summary(self.request) else Room.objects.with_members()
+            return with_unread_counts(rooms, self.request.user)
+        return Room.objects.with_members()
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET' and wants_summary(self.request):
+            return RoomSummarySerializer
+        return RoomSerializer
+
     def retrieve(self, request, *args, **kwargs):
             instance = self.get_object()
             room_serializer = self.get_serializer(instance)
 
-            
-            messages = Message.objects.filter(room=instance).order_by('-created_at')  
-            message_serializer = MessageSerializer(messages, many=True)
+            # Only the latest page is embedded; older history is paged via rooms/<pk>/messages/
+            page = get_message_page(instance.id, limit=DEFAULT_PAGE_SIZE)
+            message_serializer = MessageSerializer(page['messages'], many=True)
 
             
             return Response({
                 'data': {
                     'room': room_serializer.data,
                     'messages': message_serializer.data,
+                    'before_cursor': page['before_cursor'],
                 },
                 'message': "Room details and messages fetched successfully",
                 'status': "success",